@@ -0,0 +1,166 @@
+"""
+Benchmarks for project.thread_pool.parallel_cartesian_sum.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_cartesian
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Set
+
+from project.thread_pool.chunked_map import chunked_map
+from project.thread_pool.parallel_cartesian_sum import (
+    cartesian_count_if,
+    cartesian_max,
+    get_default_executor,
+    parallel_cartesian_sum,
+    warm_up,
+)
+from project.thread_pool.thread_pool import process_context
+from project.thread_pool.vectorized_cartesian import vectorized_cartesian_reduce
+import numpy as np
+
+
+def measure(label: str, function: Callable[[], int]) -> float:
+    start_time = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start_time
+    print(f"{label:>40}: {elapsed * 1000:10.3f} ms (result {result})")
+    return elapsed
+
+
+def closed_form() -> None:
+    """
+    Compares the closed-form sum with enumeration of the product.
+    """
+
+    small: List[Set[int]] = [set(range(8)) for _ in range(4)]
+    executor = get_default_executor()
+    measure(
+        "enumerate 8^4 = 4096 tuples",
+        lambda: parallel_cartesian_sum(small, sum, executor),
+    )
+    measure("closed form 8^4 = 4096 tuples", lambda: parallel_cartesian_sum(small))
+
+    huge: List[Set[int]] = [set(range(1000)) for _ in range(3)]
+    measure("closed form 1000^3 = 10^9 tuples", lambda: parallel_cartesian_sum(huge))
+
+
+def is_even(combination: tuple[int, ...]) -> bool:
+    return sum(combination) % 2 == 0
+
+
+def streaming() -> None:
+    """
+    Reduces products that are enumerated range by range in the worker processes.
+    """
+
+    sets: List[Set[int]] = [set(range(100)) for _ in range(3)]
+    executor = get_default_executor()
+    measure(
+        "max over 100^3 = 10^6 tuples",
+        lambda: cartesian_max(sets, executor=executor),
+    )
+    measure(
+        "count_if over 100^3 = 10^6 tuples", lambda: cartesian_count_if(sets, is_even)
+    )
+
+
+def fresh_executor(sets: List[Set[int]]) -> int:
+    with ProcessPoolExecutor(mp_context=process_context()) as executor:
+        return cartesian_max(sets, executor=executor)
+
+
+def latency(repeat: int = 3) -> None:
+    """
+    Compares the mean latency of a pool created per call with the shared warmed-up pool
+    and, for small inputs, with the serial path.
+    """
+
+    warm_up()
+    warm_pool = ProcessPoolExecutor(mp_context=process_context())
+    small: List[Set[int]] = [set(range(10)) for _ in range(3)]
+    large: List[Set[int]] = [set(range(40)) for _ in range(4)]
+
+    for label, sets in (("10^3 tuples", small), ("40^4 tuples", large)):
+        runs = {
+            "new executor per call": lambda: fresh_executor(sets),
+            "shared pool": lambda: cartesian_max(sets, executor=warm_pool),
+            "default (serial or numpy)": lambda: cartesian_max(sets),
+        }
+        for name, function in runs.items():
+            elapsed = sum(measure_quietly(function) for _ in range(repeat)) / repeat
+            print(f"{label + ', ' + name:>40}: {elapsed * 1000:10.3f} ms")
+
+    warm_pool.shutdown()
+
+
+def measure_quietly(function: Callable[[], int]) -> float:
+    start_time = time.perf_counter()
+    function()
+    return time.perf_counter() - start_time
+
+
+def vectorized() -> None:
+    """
+    Compares the NumPy backend with the worker processes and shows the effect of the block size.
+    """
+
+    sets: List[Set[int]] = [set(range(100)) for _ in range(3)]
+    measure(
+        "processes, max over 10^6 tuples",
+        lambda: cartesian_max(sets, executor=get_default_executor()),
+    )
+    measure("numpy, max over 10^6 tuples", lambda: cartesian_max(sets))
+
+    huge: List[Set[int]] = [set(range(100)) for _ in range(4)]
+    for block_size in (1 << 10, 1 << 16, 1 << 20, 1 << 24):
+        measure(
+            f"numpy, max over 10^8 tuples, block 2^{block_size.bit_length() - 1}",
+            lambda: vectorized_cartesian_reduce(
+                huge, np.maximum, block_size=block_size
+            ),
+        )
+
+    big: List[Set[int]] = [{2**62, 1}, set(range(1000)), set(range(1000))]
+    measure(
+        "numpy, sum near int64 limit (object dtype)",
+        lambda: vectorized_cartesian_reduce(big),
+    )
+
+
+def cube(x: int) -> int:
+    return x * x * x
+
+
+def chunksizes() -> None:
+    """
+    Measures the throughput of chunked_map over cheap calls for various chunk sizes.
+    """
+
+    items = 50000
+    executor = get_default_executor()
+    warm_up()
+    for chunksize in (1, 16, 256, 4096, None):
+        label = "auto" if chunksize is None else str(chunksize)
+        elapsed = measure_quietly(
+            lambda: sum(chunked_map(cube, range(items), executor, chunksize))
+        )
+        print(
+            f"{'chunksize ' + label:>40}: {items / elapsed:12.0f} calls/s"
+            f" ({elapsed * 1000:.1f} ms)"
+        )
+
+
+def main() -> None:
+    closed_form()
+    streaming()
+    latency()
+    vectorized()
+    chunksizes()
+
+
+if __name__ == "__main__":
+    main()
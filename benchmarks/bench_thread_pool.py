@@ -0,0 +1,168 @@
+"""
+Benchmarks for project.thread_pool.thread_pool.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_thread_pool
+"""
+
+import os
+import time
+import tracemalloc
+from threading import Thread
+
+from project.thread_pool.metrics import ThreadPoolMetrics
+from project.thread_pool.thread_pool import Backend, ThreadPool
+
+
+def slow_task(delay: float) -> None:
+    time.sleep(delay)
+
+
+def overload(
+    max_queue_size: int, producers: int = 4, per_producer: int = 20000
+) -> None:
+    """
+    Floods a pool of slow consumers with tasks and reports peak memory of the queue.
+    """
+
+    pool = ThreadPool(4, max_queue_size=max_queue_size)
+
+    def produce() -> None:
+        for _ in range(per_producer):
+            pool.enqueue(slow_task, 0.00001)
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    threads = [Thread(target=produce) for _ in range(producers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.dispose()
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    label = "unbounded" if max_queue_size <= 0 else f"max_queue_size={max_queue_size}"
+    print(f"{label:>22}: peak {peak / 1024:10.1f} KiB, {elapsed:6.2f} s")
+
+
+def task_memory(n: int = 100000) -> None:
+    """
+    Reports the memory held by queued tasks, compared with lambdas wrapping the same call.
+    """
+
+    pool = ThreadPool(0)
+
+    tracemalloc.start()
+    for i in range(n):
+        pool.enqueue(slow_task, i)
+    queued, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pool.tasks.clear()
+
+    tracemalloc.start()
+    lambdas = [lambda i=i: slow_task(i) for i in range(n)]
+    wrapped, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del lambdas
+
+    print(f"{'enqueue(fn, *args)':>22}: {queued / n:6.1f} B/task")
+    print(f"{'lambda':>22}: {wrapped / n:6.1f} B/task")
+    pool.dispose()
+
+
+def shutdown(n: int = 1000000) -> None:
+    """
+    Measures dispose with cancel_pending=True on a pool with n queued tasks.
+    """
+
+    pool = ThreadPool(4)
+    for _ in range(n):
+        pool.enqueue(slow_task, 0.001)
+
+    start_time = time.perf_counter()
+    pool.dispose(cancel_pending=True)
+    elapsed = time.perf_counter() - start_time
+    print(f"{n} queued tasks: {elapsed * 1000:.1f} ms")
+
+
+def noop() -> None:
+    pass
+
+
+def metrics_overhead(n: int = 200000) -> None:
+    """
+    Measures the time per task of a single worker running empty tasks with and without metrics.
+    """
+
+    configurations: list[tuple[str, ThreadPoolMetrics | None]] = [
+        ("disabled", None),
+        ("sample_rate=0.01", ThreadPoolMetrics(sample_rate=0.01)),
+        ("sample_rate=1", ThreadPoolMetrics()),
+    ]
+    for label, metrics in configurations:
+        pool = ThreadPool(0, metrics=metrics)
+        for _ in range(n):
+            pool.enqueue(noop)
+
+        start_time = time.perf_counter()
+        pool.is_active = False
+        pool.worker()
+        elapsed = time.perf_counter() - start_time
+        print(f"{label:>22}: {elapsed / n * 1e6:.3f} us/task")
+
+
+def cpu_task(n: int) -> int:
+    total = 0
+    for i in range(n):
+        total += i * i % 7
+    return total
+
+
+def backends(tasks: int = 64, n: int = 200000) -> None:
+    """
+    Compares the thread and process backends on CPU-bound tasks.
+    """
+
+    workers = os.cpu_count() or 1
+    timings = {}
+    names: tuple[Backend, ...] = ("thread", "process")
+    for backend in names:
+        with ThreadPool(workers, backend=backend) as pool:
+            # Start the worker processes before measuring.
+            for task in [pool.enqueue(cpu_task, 1) for _ in range(workers)]:
+                task.result()
+
+            start_time = time.perf_counter()
+            for task in [pool.enqueue(cpu_task, n) for _ in range(tasks)]:
+                task.result()
+            timings[backend] = time.perf_counter() - start_time
+
+        print(f"{backend:>22}: {timings[backend]:.2f} s")
+    print(
+        f"{'speedup':>22}: {timings['thread'] / timings['process']:.2f}x on {workers} cores"
+    )
+
+
+def main() -> None:
+    print("Sustained overload (4 producers, 4 slow consumers)")
+    for max_queue_size in (0, 1000, 100):
+        overload(max_queue_size)
+
+    print("Memory per queued task")
+    task_memory()
+
+    print("Worker time per task")
+    metrics_overhead()
+
+    print("Shutdown with cancel_pending=True")
+    shutdown()
+
+    print("CPU-bound tasks")
+    backends()
+
+
+if __name__ == "__main__":
+    main()
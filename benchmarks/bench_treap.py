@@ -0,0 +1,334 @@
+"""
+Benchmarks for project.treap.treap.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_treap
+"""
+
+import gc
+import math
+import operator
+import os
+import random
+import time
+import tempfile
+import tracemalloc
+from itertools import islice
+from statistics import mean
+from threading import Lock
+from typing import Any, Callable
+
+from project.thread_pool.thread_pool import ThreadPool
+from project.treap.array_treap import ArrayTreap
+from project.treap.persistent_treap import PersistentTreap
+from project.treap.storage import MappedTreap, dump, load
+from project.treap.treap import Treap
+
+
+def measure(label: str, function: Callable[[], object]) -> float:
+    start_time = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start_time
+    print(f"{label:>40}: {elapsed * 1000:10.3f} ms")
+    return elapsed
+
+
+def inserts_and_scans(size: int = 10**6) -> None:
+    """
+    Measures inserting random keys, a full scan in both directions, lookups and deletes.
+    """
+
+    keys = random.sample(range(size * 10), size)
+    treap = Treap()
+
+    def insert() -> None:
+        for key in keys:
+            treap[key] = key
+
+    def delete() -> None:
+        for key in keys[: size // 10]:
+            del treap[key]
+
+    measure(f"insert {size} keys", insert)
+    measure("scan ascending", lambda: sum(1 for _ in treap))
+    measure("scan descending", lambda: sum(1 for _ in reversed(treap)))
+    measure(f"lookup {size} keys", lambda: sum(treap[key] for key in keys))
+    measure(f"delete {size // 10} keys", delete)
+
+
+def bulk(size: int = 10**6, small: int = 1000) -> None:
+    """
+    Compares bulk construction and set operations with inserting keys one by one.
+    """
+
+    items = [(key, key) for key in range(0, size * 2, 2)]
+    measure(f"from_sorted {size} keys", lambda: Treap.from_sorted(items))
+    treap = Treap.from_sorted(items)
+
+    other = Treap.from_sorted(
+        (key, key) for key in sorted(random.sample(range(size * 2), small))
+    )
+
+    def insert_one_by_one() -> None:
+        copy = treap.copy()
+        for key in other:
+            copy[key] = other[key]
+
+    measure("copy", treap.copy)
+    measure(f"copy + insert {small} keys", insert_one_by_one)
+    measure(f"union with {small} keys", lambda: treap.union(other))
+    measure(f"intersection with {small} keys", lambda: treap.intersection(other))
+    measure(f"difference with {small} keys", lambda: treap.difference(other))
+    measure(f"update with {small} keys", lambda: treap.update(other))
+    measure("split in the middle", lambda: treap.split(size))
+
+
+def queries(size: int = 10**5, repeat: int = 100) -> None:
+    """
+    Compares order-statistics and range queries with scanning the keys.
+    """
+
+    treap = Treap.from_sorted(((key, key) for key in range(size)), operator.add)
+    probes = [random.randrange(size) for _ in range(repeat)]
+    bounds = [(key, key + size // 10) for key in probes]
+
+    for label, fast, scan in [
+        (
+            "rank",
+            lambda: [treap.rank(key) for key in probes],
+            lambda: [sum(1 for k in treap if k < key) for key in probes],
+        ),
+        (
+            "select",
+            lambda: [treap.select(key) for key in probes],
+            lambda: [next(islice(treap, key, None)) for key in probes],
+        ),
+        (
+            "range of n/10 keys",
+            lambda: [sum(1 for _ in treap.range(low, high)) for low, high in bounds],
+            lambda: [sum(1 for k in treap if low <= k < high) for low, high in bounds],
+        ),
+        (
+            "count",
+            lambda: [treap.count(low, high) for low, high in bounds],
+            lambda: [sum(1 for k in treap if low <= k < high) for low, high in bounds],
+        ),
+        (
+            "range_aggregate",
+            lambda: [treap.range_aggregate(low, high) for low, high in bounds],
+            lambda: [
+                sum(treap[k] for k in treap if low <= k < high) for low, high in bounds
+            ],
+        ),
+    ]:
+        measure(f"{label} x{repeat}", fast)
+        measure(f"{label} x{repeat} by scan", scan)
+
+
+def memory(size: int = 2 * 10**5) -> None:
+    """
+    Reports memory per key and the time of random inserts for the node-based
+    and the array-based Treap, with a dict as a reference.
+    """
+
+    keys = random.sample(range(size * 10), size)
+    for label, factory in [
+        ("dict", dict),
+        ("Treap", Treap),
+        ("ArrayTreap", ArrayTreap),
+    ]:
+        gc.collect()
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        mapping = factory()
+        for key in keys:
+            mapping[key] = key
+        elapsed = time.perf_counter() - start_time
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{label:>40}: {current / size:8.1f} bytes/key, "
+            f"{elapsed * 1000:10.3f} ms to insert, "
+            f"{len(gc.get_objects()):9d} objects tracked by gc"
+        )
+        del mapping
+
+
+def heights(trials: int = 5) -> None:
+    """
+    Reports the distribution of tree heights for the old narrow priorities
+    (random.randint(0, 100)), wide random priorities and hash-derived priorities.
+    Ties of narrow priorities do not rotate, so sorted input degenerates the tree.
+    """
+
+    modes: list[tuple[str, Callable[[int], Treap]]] = [
+        ("randint(0, 100)", lambda seed: narrow_treap()),
+        ("random 63-bit", lambda seed: Treap(seed=seed)),
+        ("hash", lambda seed: Treap(priorities="hash", seed=seed)),
+    ]
+    for size, ordered in [
+        (10**3, False),
+        (10**5, False),
+        (10**3, True),
+        (10**4, True),
+    ]:
+        order = "ascending" if ordered else "random"
+        print(f"{size} keys in {order} order, log2(n) = {math.log2(size):.1f}")
+        for label, factory in modes:
+            results = []
+            start_time = time.perf_counter()
+            for seed in range(trials):
+                treap = factory(seed)
+                keys = random.Random(seed).sample(range(size * 10), size)
+                for key in sorted(keys) if ordered else keys:
+                    treap[key] = key
+                results.append(treap.height())
+            elapsed = (time.perf_counter() - start_time) / trials
+            print(
+                f"{label:>40}: height min {min(results):6d}, mean {mean(results):8.1f},"
+                f" max {max(results):6d}, {elapsed * 1000:10.3f} ms to build"
+            )
+
+
+def narrow_treap() -> Treap:
+    treap = Treap()
+    treap._priority = lambda key: random.randint(0, 100)
+    return treap
+
+
+def mixed_workload(
+    treap: Treap,
+    lock: "Lock | None",
+    write_ratio: float,
+    seed: int,
+    operations: int,
+    size: int,
+) -> None:
+    """
+    Runs lookups, writes and scans of 100 keys on a shared Treap. With a lock, every operation
+    holds it. Without one, only the writes of the PersistentTreap are serialized.
+    """
+
+    rng = random.Random(seed)
+    for step in range(operations):
+        key = rng.randrange(size * 2)
+        if step % 100 == 0:
+            if lock is None:
+                sum(1 for _ in islice(treap.range(key), 100))
+            else:
+                with lock:
+                    sum(1 for _ in islice(treap.range(key), 100))
+        elif rng.random() < write_ratio:
+            if lock is None:
+                treap[key] = key
+            else:
+                with lock:
+                    treap[key] = key
+        elif lock is None:
+            treap.get(key)
+        else:
+            with lock:
+                treap.get(key)
+
+
+def concurrency(
+    size: int = 10**5, workers: int = 4, tasks: int = 16, operations: int = 5000
+) -> None:
+    """
+    Compares the throughput of a Treap guarded by a single lock with a PersistentTreap
+    shared by ThreadPool workers, for several fractions of writes.
+    """
+
+    for write_ratio in (0.01, 0.1, 0.5):
+        for label, treap, lock in [
+            (
+                "Treap + Lock",
+                Treap.from_sorted((k, k) for k in range(0, size * 2, 2)),
+                Lock(),
+            ),
+            (
+                "PersistentTreap",
+                PersistentTreap.from_sorted((k, k) for k in range(0, size * 2, 2)),
+                None,
+            ),
+        ]:
+            start_time = time.perf_counter()
+            with ThreadPool(workers) as pool:
+                for seed in range(tasks):
+                    pool.enqueue(
+                        mixed_workload, treap, lock, write_ratio, seed, operations, size
+                    )
+            elapsed = time.perf_counter() - start_time
+            print(
+                f"{label + f', {write_ratio:.0%} writes':>40}: "
+                f"{tasks * operations / elapsed:12.0f} ops/s"
+            )
+
+
+def restart(size: int = 10**6, lookups: int = 10**4) -> None:
+    """
+    Compares rebuilding a Treap by inserts with loading a dump and with mapping it lazily.
+    """
+
+    keys = random.sample(range(size * 10), size)
+    probes = random.sample(keys, lookups)
+    treap = Treap.from_sorted((key, str(key)) for key in sorted(keys))
+
+    def insert() -> None:
+        rebuilt = Treap()
+        for key in keys:
+            rebuilt[key] = str(key)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "treap.bin")
+        with open(path, "wb") as file:
+            measure(f"dump {size} keys", lambda: dump(treap, file))
+        print(f"{'file size':>40}: {os.path.getsize(path) / size:10.1f} bytes/key")
+
+        measure(f"insert {size} keys", insert)
+        with open(path, "rb") as source:
+            measure("load", lambda: load(source))
+
+        def open_and_lookup() -> None:
+            with MappedTreap(path) as mapped:
+                for key in probes:
+                    mapped[key]
+
+        measure(f"mmap and {lookups} lookups", open_and_lookup)
+
+
+def key_types(size: int = 2 * 10**5, batch: int = 10**4) -> None:
+    """
+    Compares lookups of int, str and tuple keys and of a key function, one by one and in batches.
+    """
+
+    numbers = random.sample(range(size * 10), size)
+    cases: list[tuple[str, list[Any], Callable[[Any], Any] | None]] = [
+        ("int", numbers, None),
+        ("str", [f"{key:012d}" for key in numbers], None),
+        ("tuple", [divmod(key, 1000) for key in numbers], None),
+        ("negated int", numbers, operator.neg),
+    ]
+    for label, keys, key_function in cases:
+        treap = Treap(key=key_function)
+        measure(f"insert {size} {label} keys", lambda: treap.update(zip(keys, keys)))
+        probes = random.sample(keys, batch)
+        measure(f"{batch} lookups of {label} keys", lambda: [treap[k] for k in probes])
+        measure(f"get_many of {batch} {label} keys", lambda: treap.get_many(probes))
+    print()
+
+
+def main() -> None:
+    inserts_and_scans()
+    bulk()
+    queries()
+    key_types()
+    memory()
+    heights()
+    concurrency()
+    restart()
+
+
+if __name__ == "__main__":
+    main()
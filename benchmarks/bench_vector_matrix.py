@@ -0,0 +1,277 @@
+"""
+Benchmarks for project.vector_matrix_operations.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_vector_matrix
+"""
+
+import os
+import time
+from fractions import Fraction
+from math import acos, sqrt
+from typing import Callable
+
+import numpy as np
+
+from project.thread_pool.thread_pool import ThreadPool
+from project.vector_matrix_operations.Matrix import Matrix
+from project.vector_matrix_operations.SparseMatrix import SparseMatrix
+from project.vector_matrix_operations.Vector import Vector
+from project.vector_matrix_operations.VectorBatch import VectorBatch
+
+# Python loops over longer vectors take too long to be worth measuring.
+LOOP_LIMIT = 10**6
+# The largest numbers of multiply-adds measured for the element-wise loop,
+# for integer np.matmul and for the blocked integer product.
+MATMUL_LOOP_LIMIT = 64**3
+MATMUL_NUMPY_LIMIT = 1024**3
+MATMUL_BLOCKED_LIMIT = 2048**3
+
+
+def measure(label: str, function: Callable[[], object], repeat: int = 1) -> float:
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    elapsed = (time.perf_counter() - start_time) / repeat
+    print(f"{label:>40}: {elapsed * 1000:10.3f} ms")
+    return elapsed
+
+
+def loop_dot(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    The dot product as a Python loop over the elements, for comparison.
+    """
+    return sum([x * y for x, y in zip(a, b)])
+
+
+def loop_angle(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    The angle with two norms recomputed by Python loops, for comparison.
+    """
+    return acos(loop_dot(a, b) / (sqrt(loop_dot(a, a)) * sqrt(loop_dot(b, b))))
+
+
+def vectors(repeat: int = 10) -> None:
+    """
+    Compares the dot product, the norm and the angle with Python loops for lengths 10 to 10^7.
+    """
+
+    rng = np.random.default_rng(44)
+    for exponent in range(1, 8):
+        length = 10**exponent
+        a, b = rng.random(length), rng.random(length)
+        u, v = Vector(a), Vector(b)
+        times = max(1, repeat * 10**5 // length)
+        if length <= LOOP_LIMIT:
+            measure(f"loop dot, n=10^{exponent}", lambda: loop_dot(a, b), times)
+        measure(f"dot, n=10^{exponent}", lambda: u * v, times)
+
+        def norm() -> float:
+            u[0] = a[0]
+            return u.norm()
+
+        measure(f"uncached norm, n=10^{exponent}", norm, times)
+        measure(f"cached norm, n=10^{exponent}", u.norm, times)
+        if length <= LOOP_LIMIT:
+            measure(f"loop angle, n=10^{exponent}", lambda: loop_angle(a, b), times)
+        measure(f"angle with cached norms, n=10^{exponent}", lambda: u ^ v, times)
+        print()
+
+
+def loop_matmul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    The product as a triple Python loop over the elements, for comparison.
+    """
+    result = np.zeros((a.shape[0], b.shape[1]))
+    for i in range(a.shape[0]):
+        for j in range(b.shape[1]):
+            result[i][j] = sum([a[i][k] * b[k][j] for k in range(a.shape[1])])
+    return result
+
+
+def matmul() -> None:
+    """
+    Compares the product of float and integer matrices with the loop and with plain np.matmul
+    for square and rectangular shapes up to 4096 x 4096.
+    """
+
+    rng = np.random.default_rng(45)
+    shapes = [(n, n, n) for n in (16, 64, 256, 1024, 2048, 4096)]
+    shapes += [(4096, 64, 4096), (64, 4096, 64), (4096, 4096, 64), (2048, 512, 1024)]
+    for rows, inner, columns in shapes:
+        label = f"{rows}x{inner} @ {inner}x{columns}"
+        work = rows * inner * columns
+        a = rng.integers(0, 100, (rows, inner))
+        b = rng.integers(0, 100, (inner, columns))
+        fa, fb = Matrix(a.astype(float)), Matrix(b.astype(float))
+        if work <= MATMUL_LOOP_LIMIT:
+            measure(f"loop {label}", lambda: loop_matmul(a, b))
+        measure(f"float {label}", lambda: fa @ fb)
+        if work <= MATMUL_NUMPY_LIMIT:
+            measure(f"np.matmul int {label}", lambda: np.matmul(a, b))
+        if work <= MATMUL_BLOCKED_LIMIT:
+            ia, ib = Matrix(a), Matrix(b)
+            measure(f"blocked int {label}", lambda: ia @ ib)
+        print()
+
+
+def views(size: int = 2048) -> None:
+    """
+    Compares the transpose, the sum and a chained expression with loops and with new buffers.
+    """
+
+    rng = np.random.default_rng(46)
+    a, b, c = (Matrix(rng.random((size, size))) for _ in range(3))
+    small = rng.random((size // 8, size // 8))
+
+    def loop_transpose() -> np.ndarray:
+        result = np.zeros((small.shape[1], small.shape[0]))
+        for i in range(small.shape[1]):
+            for j in range(small.shape[0]):
+                result[i][j] = small[j][i]
+        return result
+
+    measure(f"loop transpose {size // 8}^2", loop_transpose)
+    measure(f"copied transpose {size}^2", lambda: Matrix(a.T().matrix))
+    measure(f"view transpose {size}^2", a.T)
+    measure(f"sum {size}^2", lambda: a + b)
+
+    buffer = Matrix(np.empty((size, size)))
+
+    def chained() -> Matrix:
+        return (a @ b + c).T() @ a
+
+    def inplace() -> Matrix:
+        result = a.matmul(b, out=buffer)
+        result += c
+        return result.T().matmul(a)
+
+    measure(f"(a @ b + c).T() @ a, {size}^2", chained)
+    measure(f"same with out= and +=, {size}^2", inplace)
+    print()
+
+
+def batches(count: int = 10**6, dimension: int = 3, looped: int = 10**5) -> None:
+    """
+    Compares operations on a million small vectors in a batch with loops over Vector objects.
+    """
+
+    rng = np.random.default_rng(47)
+    a, b = rng.random((count, dimension)), rng.random((count, dimension))
+    matrix = Matrix(rng.random((dimension, dimension)))
+    us, vs = [Vector(row) for row in a[:looped]], [Vector(row) for row in b[:looped]]
+    first, second = VectorBatch(a), VectorBatch(b)
+
+    measure(f"loop dot x{looped}", lambda: [u * v for u, v in zip(us, vs)])
+    measure(f"batch dot x{count}", lambda: first * second)
+    measure(f"loop angle x{looped}", lambda: [u ^ v for u, v in zip(us, vs)])
+    measure(f"batch angle x{count}", lambda: first ^ second)
+    measure(
+        f"loop matrix @ vector x{looped}",
+        lambda: [matrix.matrix @ u.vector for u in us],
+    )
+    measure(f"matrix @ batch x{count}", lambda: matrix @ first)
+    few, many = VectorBatch(a[:1000]), VectorBatch(b[: 10**5])
+    measure("pairwise angles 1000 x 10^5", lambda: few.pairwise_angles(many))
+    print()
+
+
+def sparse(size: int = 4000, columns: int = 64) -> None:
+    """
+    Compares the memory and the operations of sparse and dense matrices at several densities.
+    """
+
+    rng = np.random.default_rng(48)
+    for density in (0.001, 0.005, 0.02):
+        arrays = []
+        for _ in range(2):
+            array = rng.random((size, size))
+            array[rng.random((size, size)) >= density] = 0
+            arrays.append(array)
+        a, b = (Matrix(array) for array in arrays)
+        sa, sb = (SparseMatrix.from_dense(array) for array in arrays)
+        block = Matrix(rng.random((size, columns)))
+
+        label = f"{size}^2, density {density}"
+        sparse_bytes = sa.data.nbytes + sa.indices.nbytes + sa.indptr.nbytes
+        print(f"{'dense memory, ' + label:>40}: {a.matrix.nbytes / 2**20:10.3f} MiB")
+        print(f"{'sparse memory, ' + label:>40}: {sparse_bytes / 2**20:10.3f} MiB")
+        measure(f"dense +, {label}", lambda: a + b)
+        measure(f"sparse +, {label}", lambda: sa + sb)
+        measure(f"dense @ {columns} columns, {label}", lambda: a @ block)
+        measure(f"sparse @ {columns} columns, {label}", lambda: sa @ block)
+        measure(f"dense @ dense, {label}", lambda: a @ b)
+        measure(f"sparse @ sparse, {label}", lambda: sa @ sb)
+        measure(f"dense transpose copy, {label}", lambda: Matrix(a.T().matrix))
+        measure(f"sparse transpose, {label}", sa.T)
+        print()
+
+
+def lazy(size: int = 2048) -> None:
+    """
+    Compares eager and lazy evaluation of expressions with matrix chains, sums and transposes.
+    """
+
+    rng = np.random.default_rng(49)
+    a, b, c = (Matrix(rng.random((size, size))) for _ in range(3))
+    tall, wide = Matrix(rng.random((size, 16))), Matrix(rng.random((16, size)))
+    v = Vector(rng.random(size))
+
+    measure("eager a @ b @ c @ v", lambda: a @ b @ c @ Matrix(v.vector[:, None]))
+    measure("lazy a @ b @ c @ v", lambda: (a.lazy() @ b @ c @ v).evaluate())
+    measure("eager tall @ wide @ a", lambda: tall @ wide @ a)
+    measure("lazy tall @ wide @ a", lambda: (tall.lazy() @ wide @ a).evaluate())
+    measure(
+        "eager (a @ b + c).T() @ v", lambda: (a @ b + c).T() @ Matrix(v.vector[:, None])
+    )
+    measure("lazy (a @ b + c).T() @ v", lambda: ((a.lazy() @ b + c).T() @ v).evaluate())
+    measure("eager a + b + c + a.T()", lambda: a + b + c + a.T())
+    measure("lazy a + b + c + a.T()", lambda: (a.lazy() + b + c + a.T()).evaluate())
+    print()
+
+
+def parallel(size: int = 2048, object_size: int = 96) -> None:
+    """
+    Measures the scaling of the integer product over 1 to N threads of a ThreadPool, and of
+    the object product over 1 to N worker processes, where N is the number of CPUs.
+    """
+
+    rng = np.random.default_rng(50)
+    a = Matrix(rng.integers(0, 100, (size, size)))
+    b = Matrix(rng.integers(0, 100, (size, size)))
+    small = rng.integers(0, 100, (object_size, object_size))
+    fa = Matrix(np.vectorize(lambda x: Fraction(int(x), 7), otypes=[object])(small))
+    fb = Matrix(small.astype(object))
+    cpus = os.cpu_count() or 1
+
+    measure(f"blocked int {size}x{size}", lambda: a @ b)
+    for workers in range(1, cpus + 1):
+        with ThreadPool(workers) as pool:
+            measure(
+                f"{workers} threads int {size}x{size}", lambda: a.matmul(b, pool=pool)
+            )
+    measure(f"blocked Fraction {object_size}x{object_size}", lambda: fa @ fb)
+    for workers in range(1, cpus + 1):
+        with ThreadPool(workers, backend="process") as pool:
+            # The first product starts the worker processes.
+            fa.matmul(fb, pool=pool)
+            measure(
+                f"{workers} processes Fraction {object_size}x{object_size}",
+                lambda: fa.matmul(fb, pool=pool),
+            )
+    print()
+
+
+def main() -> None:
+    vectors()
+    matmul()
+    views()
+    batches()
+    sparse()
+    lazy()
+    parallel()
+
+
+if __name__ == "__main__":
+    main()
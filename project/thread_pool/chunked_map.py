@@ -0,0 +1,121 @@
+from concurrent.futures import Executor
+from functools import partial
+from itertools import islice
+from queue import SimpleQueue
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+import os
+
+from project.thread_pool.thread_pool import ThreadPool
+
+# The number of items run in the calling process to estimate the cost of a call.
+SAMPLE_SIZE = 8
+# The running time a chunk is sized for. It keeps the overhead of a round trip to a worker
+# small compared to the useful work, while leaving enough chunks to balance the load.
+TARGET_CHUNK_TIME = 0.02
+MAX_CHUNKSIZE = 65536
+
+
+def _apply_chunk(function: Callable[[Any], Any], chunk: List[Any]) -> List[Any]:
+    """
+    Applies the function to every item of a chunk. Runs in a worker.
+    """
+    return [function(item) for item in chunk]
+
+
+def _put_completed(
+    completed: "SimpleQueue[Tuple[int, Any]]", index: int, task: Any
+) -> None:
+    """
+    Reports a completed chunk to the consuming generator.
+    """
+    completed.put((index, task))
+
+
+def tune_chunksize(cost: float, target: float = TARGET_CHUNK_TIME) -> int:
+    """
+    Chooses the number of items per chunk from the cost of a single call.
+
+    Arguments:
+        cost (float): The time of a single call in seconds.
+        target (float): The desired running time of a chunk in seconds.
+
+    Returns:
+        int: The chunk size between 1 and MAX_CHUNKSIZE.
+    """
+    if cost <= 0:
+        return MAX_CHUNKSIZE
+    return max(1, min(MAX_CHUNKSIZE, round(target / cost)))
+
+
+def chunked_map(
+    function: Callable[[Any], Any],
+    iterable: Iterable[Any],
+    executor: Executor | ThreadPool,
+    chunksize: int | None = None,
+    ordered: bool = True,
+    prefetch: int | None = None,
+) -> Iterator[Any]:
+    """
+    Applies a function to every item of an iterable in an executor, sending the items in chunks.
+
+    Without an explicit chunksize, the first SAMPLE_SIZE items are run in the calling process
+    to measure the cost of a call, and the chunk size is tuned by tune_chunksize. The items are
+    consumed lazily and at most prefetch chunks are in flight at once. Results are streamed back
+    as soon as their chunk completes.
+
+    Arguments:
+        function (callable): The function to apply. It has to be picklable for process executors.
+        iterable (iterable): The items.
+        executor (Executor or ThreadPool): Where to run the chunks. It is not shut down.
+        chunksize (int, optional): The number of items per chunk. Tuned by sampling by default.
+        ordered (bool): Whether to yield results in the order of the items or in the order of completion.
+        prefetch (int, optional): The maximum number of chunks in flight. Twice the number of CPUs by default.
+
+    Returns:
+        iterator: The results of the function.
+    """
+    iterator = iter(iterable)
+
+    if chunksize is None:
+        sample = list(islice(iterator, SAMPLE_SIZE))
+        start_time = perf_counter()
+        results = [function(item) for item in sample]
+        elapsed = perf_counter() - start_time
+        chunksize = tune_chunksize(elapsed / len(sample)) if sample else 1
+        yield from results
+
+    if prefetch is None:
+        prefetch = 2 * (os.cpu_count() or 1)
+    prefetch = max(1, prefetch)
+
+    submit = executor.enqueue if isinstance(executor, ThreadPool) else executor.submit
+    completed: SimpleQueue[Tuple[int, Any]] = SimpleQueue()
+    finished: Dict[int, Any] = {}
+    submitted = 0
+    next_index = 0
+    exhausted = False
+
+    while True:
+        while not exhausted and submitted - next_index < prefetch:
+            chunk = list(islice(iterator, chunksize))
+            if not chunk:
+                exhausted = True
+                break
+            task = submit(_apply_chunk, function, chunk)
+            task.add_done_callback(partial(_put_completed, completed, submitted))
+            submitted += 1
+
+        if next_index == submitted:
+            return
+
+        index, task = completed.get()
+        if not ordered:
+            next_index += 1
+            yield from task.result()
+            continue
+
+        finished[index] = task
+        while next_index in finished:
+            yield from finished.pop(next_index).result()
+            next_index += 1
@@ -0,0 +1,253 @@
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+
+class Histogram:
+    """
+    A histogram of durations with logarithmic buckets.
+
+    Bucket i holds durations in [2^(i-1), 2^i) microseconds, bucket 0 holds durations
+    below one microsecond. Percentiles are reported as the upper bound of the bucket.
+
+    Attributes:
+        buckets : List[int]
+            The number of recorded values per bucket.
+        count : int
+            The number of recorded values.
+        total : float
+            The sum of recorded values in seconds.
+        max : float
+            The largest recorded value in seconds.
+    """
+
+    NUM_BUCKETS = 40
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty histogram.
+        """
+
+        self.buckets: List[int] = [0] * self.NUM_BUCKETS
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def record(self, value: float) -> None:
+        """
+        Adds a duration to the histogram.
+
+        Parameters:
+        ----------
+        value : float
+            The duration in seconds.
+        """
+
+        index = min(int(value * 1e6).bit_length(), self.NUM_BUCKETS - 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns an upper estimate of the q-th percentile.
+
+        Parameters:
+        ----------
+        q : float
+            The percentile in the range [0, 100].
+
+        Returns:
+        -------
+        float
+            The percentile in seconds, or 0 if the histogram is empty.
+        """
+
+        if self.count == 0:
+            return 0.0
+
+        rank = q / 100 * self.count
+        seen = 0
+        for index, amount in enumerate(self.buckets):
+            seen += amount
+            if seen >= rank and amount:
+                return min((1 << index) / 1e6, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Returns the summary of the histogram.
+
+        Returns:
+        -------
+        Dict[str, float]
+            The count, mean, p50, p90, p99 and max of the recorded durations.
+        """
+
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class ThreadPoolMetrics:
+    """
+    Counters, timing histograms and hooks of a ThreadPool.
+
+    Counters are updated for every task. Wait and run times are measured for every
+    sample_every-th task only, which keeps the overhead on short tasks low. Utilization is
+    estimated from the sampled run times.
+
+    Attributes:
+        submitted : int
+            The number of enqueued tasks.
+        rejected : int
+            The number of tasks refused because the queue was full.
+        started : int
+            The number of tasks taken by the workers.
+        completed : int
+            The number of tasks finished without an exception.
+        failed : int
+            The number of tasks that raised an exception.
+        wait_time : Histogram
+            The time sampled tasks spent in the queue.
+        run_time : Histogram
+            The execution time of sampled tasks.
+        sample_every : int
+            Every sample_every-th task is timed.
+        on_task_start : Callable | None
+            Called as on_task_start(task) in the worker thread right before a task runs.
+        on_task_finish : Callable | None
+            Called as on_task_finish(task, run_time, error) right after a task has run.
+            run_time is None for tasks that are not sampled, error is None on success.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        on_task_start: Callable[[Any], None] | None = None,
+        on_task_finish: Callable[[Any, float | None, BaseException | None], None]
+        | None = None,
+    ) -> None:
+        """
+        Initializes empty metrics.
+
+        Parameters:
+        ----------
+        sample_rate : float
+            The fraction of tasks whose wait and run times are measured, in the range (0, 1].
+        on_task_start : Callable | None
+            A hook called before each task.
+        on_task_finish : Callable | None
+            A hook called after each task.
+
+        Raises:
+        -------
+        ValueError
+            If the sample rate is not in the range (0, 1].
+        """
+
+        if not 0 < sample_rate <= 1:
+            raise ValueError("Sample rate must be in the range (0, 1]")
+
+        self.sample_every: int = max(1, round(1 / sample_rate))
+        self.on_task_start = on_task_start
+        self.on_task_finish = on_task_finish
+        self.submitted: int = 0
+        self.rejected: int = 0
+        self.started: int = 0
+        self.completed: int = 0
+        self.failed: int = 0
+        self.wait_time: Histogram = Histogram()
+        self.run_time: Histogram = Histogram()
+        self.created_at: float = perf_counter()
+        self.lock: Lock = Lock()
+
+    def task_started(self) -> bool:
+        """
+        Counts a started task.
+
+        Returns:
+        -------
+        bool
+            True if the task has to be timed.
+        """
+
+        with self.lock:
+            self.started += 1
+            return self.started % self.sample_every == 0
+
+    def task_finished(
+        self, wait_time: float | None, run_time: float | None, failed: bool
+    ) -> None:
+        """
+        Counts a finished task and records its timings if it was sampled.
+
+        Parameters:
+        ----------
+        wait_time : float | None
+            The time the task spent in the queue.
+        run_time : float | None
+            The execution time of the task.
+        failed : bool
+            Whether the task raised an exception.
+        """
+
+        with self.lock:
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+            if wait_time is not None:
+                self.wait_time.record(wait_time)
+            if run_time is not None:
+                self.run_time.record(run_time)
+
+    def snapshot(self, num_threads: int, queue_depth: int) -> Dict[str, Any]:
+        """
+        Returns a consistent copy of all metrics.
+
+        Parameters:
+        ----------
+        num_threads : int
+            The number of workers in the pool, used for utilization.
+        queue_depth : int
+            The current number of queued tasks.
+
+        Returns:
+        -------
+        Dict[str, Any]
+            Counters, histogram summaries, the number of running tasks and the utilization
+            of the workers (estimated busy time divided by the available worker time).
+        """
+
+        with self.lock:
+            finished = self.completed + self.failed
+            busy_time = (
+                self.run_time.total * finished / self.run_time.count
+                if self.run_time.count
+                else 0.0
+            )
+            elapsed = perf_counter() - self.created_at
+            return {
+                "queue_depth": queue_depth,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "started": self.started,
+                "running": self.started - finished,
+                "completed": self.completed,
+                "failed": self.failed,
+                "wait_time": self.wait_time.snapshot(),
+                "run_time": self.run_time.snapshot(),
+                "utilization": (
+                    min(1.0, busy_time / (elapsed * num_threads))
+                    if num_threads and elapsed
+                    else 0.0
+                ),
+            }
@@ -1,17 +1,376 @@
-from typing import List, Set
-from concurrent.futures import ProcessPoolExecutor
-from itertools import product
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial, reduce
+from itertools import chain, product
+from math import prod
+from operator import add
+from time import perf_counter
+from threading import Lock
+import atexit
+import os
+import numpy as np
 
+from project.thread_pool.chunked_map import TARGET_CHUNK_TIME, chunked_map
+from project.thread_pool.thread_pool import ThreadPool, process_context
+from project.thread_pool.vectorized_cartesian import (
+    INT64_MAX,
+    INT64_MIN,
+    vectorized_cartesian_reduce,
+)
 
-def parallel_cartesian_sum(sets: List[Set[int]]) -> int:
+
+Box = Tuple[Tuple[int, int], ...]
+
+# Products with fewer tuples are reduced in the calling process, where it is faster
+# than sending them to worker processes.
+SERIAL_THRESHOLD = 50000
+# The number of tuples reduced in the calling process to estimate the cost of a tuple.
+SAMPLE_TUPLES = 1024
+
+# Combiners of tuple sums that the NumPy backend evaluates as ufunc reductions.
+_UFUNCS: Dict[Callable[[Any, Any], Any], np.ufunc] = {
+    add: np.add,
+    max: np.maximum,
+    min: np.minimum,
+}
+
+_default_executor: ProcessPoolExecutor | None = None
+_default_workers: int | None = None
+_default_lock = Lock()
+
+
+def get_default_executor() -> ProcessPoolExecutor:
     """
-    Computes the sum of the Cartesian product of multiple sets of integers in parallel.
+    Returns the module-level process pool shared by the Cartesian product functions.
+    The pool is created on the first call and shut down at interpreter exit.
+
+    Returns:
+        ProcessPoolExecutor: The shared process pool.
+    """
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None:
+            _default_executor = ProcessPoolExecutor(
+                max_workers=_default_workers, mp_context=process_context()
+            )
+        return _default_executor
+
+
+def set_default_workers(workers: int | None) -> None:
+    """
+    Sets the number of processes of the module-level pool. The current pool, if any,
+    is shut down and a new one is created lazily with the given size.
 
     Arguments:
-        sets (list of list of int): A list of sets of integers for which the Cartesian product and sum need to be computed.
+        workers (int, optional): The number of processes. The number of CPUs by default.
+    """
+    global _default_executor, _default_workers
+    with _default_lock:
+        executor, _default_executor = _default_executor, None
+        _default_workers = workers
+    if executor is not None:
+        executor.shutdown()
+
+
+def warm_up() -> None:
+    """
+    Starts all processes of the module-level pool, so the first calls do not pay for spawning them.
+    """
+    executor = get_default_executor()
+    workers = _default_workers or os.cpu_count() or 1
+    for future in [executor.submit(os.getpid) for _ in range(workers)]:
+        future.result()
+
+
+@atexit.register
+def _shutdown_default_executor() -> None:
+    set_default_workers(_default_workers)
+
+
+def cartesian_sum(sets: List[Set[int]]) -> int:
+    """
+    Computes the sum of the Cartesian product of multiple sets of integers in closed form.
+
+    Every element of the i-th set appears in the product once per combination of the
+    other sets, so the total is the sum of sum(S_i) * prod(|S_j| for j != i).
+    This takes O(sum(|S_i|)) time and does not enumerate the product.
+
+    Arguments:
+        sets (list of set of int): A list of sets of integers.
 
     Returns:
         int: The sum of all elements in the Cartesian product of the input sets.
+    """
+    sizes = [len(set) for set in sets]
+    total_size = prod(sizes)
+    return sum(sum(set) * (total_size // size) for set, size in zip(sets, sizes))
+
+
+def _boxes(sizes: Sequence[int], start: int, stop: int) -> List[Box]:
+    """
+    Splits the index range [start, stop) of a Cartesian product into boxes.
+
+    Indices are mixed-radix numbers whose last digit changes fastest, as in itertools.product.
+    Each box is a product of index ranges, one per set, and the boxes cover the range in order.
+    At most 2 * len(sizes) boxes are produced.
+
+    Arguments:
+        sizes (sequence of int): The sizes of the sets.
+        start (int): The first index of the range.
+        stop (int): The index after the last one.
+
+    Returns:
+        list of box: The (low, high) index ranges of every box.
+    """
+    if start >= stop:
+        return []
+    if not sizes:
+        return [()]
+
+    inner = prod(sizes[1:])
+    first, first_rest = divmod(start, inner)
+    last, last_rest = divmod(stop, inner)
+
+    if first == last:
+        return [
+            ((first, first + 1),) + box
+            for box in _boxes(sizes[1:], first_rest, last_rest)
+        ]
+
+    boxes = []
+    if first_rest:
+        boxes += [
+            ((first, first + 1),) + box for box in _boxes(sizes[1:], first_rest, inner)
+        ]
+        first += 1
+    if first < last:
+        boxes.append(((first, last),) + tuple((0, size) for size in sizes[1:]))
+    if last_rest:
+        boxes += [((last, last + 1),) + box for box in _boxes(sizes[1:], 0, last_rest)]
+    return boxes
+
+
+def _product_range(
+    sets: Sequence[Sequence[Any]], start: int, stop: int
+) -> Iterator[Tuple[Any, ...]]:
+    """
+    Iterates over the tuples of a Cartesian product with indices in [start, stop),
+    without enumerating the preceding tuples.
+
+    Arguments:
+        sets (sequence of sequence): The sets of the product.
+        start (int): The first index of the range.
+        stop (int): The index after the last one.
+
+    Returns:
+        iterator of tuple: The tuples of the range in the order of itertools.product.
+    """
+    sizes = [len(set) for set in sets]
+    return chain.from_iterable(
+        product(*(set[low:high] for set, (low, high) in zip(sets, box)))
+        for box in _boxes(sizes, start, stop)
+    )
+
+
+def _reduce_range(
+    sets: Sequence[Sequence[Any]],
+    start: int,
+    stop: int,
+    function: Callable[[Tuple[Any, ...]], Any],
+    combiner: Callable[[Any, Any], Any],
+) -> Any:
+    """
+    Maps and reduces a range of a Cartesian product. Runs in a worker process.
+    """
+    return reduce(combiner, map(function, _product_range(sets, start, stop)))
+
+
+def _reduce_bounds(
+    sets: Sequence[Sequence[Any]],
+    function: Callable[[Tuple[Any, ...]], Any],
+    combiner: Callable[[Any, Any], Any],
+    bounds: Tuple[int, int],
+) -> Any:
+    """
+    Maps and reduces the range given by a (start, stop) pair. Runs in a worker process.
+    """
+    return _reduce_range(sets, bounds[0], bounds[1], function, combiner)
+
+
+def _split(start: int, stop: int, chunks: int) -> List[Tuple[int, int]]:
+    """
+    Splits the range [start, stop) into at most chunks contiguous ranges of almost equal size.
+    """
+    total = stop - start
+    chunks = max(1, min(chunks, total))
+    return [
+        (start + total * i // chunks, start + total * (i + 1) // chunks)
+        for i in range(chunks)
+    ]
+
+
+def cartesian_reduce(
+    sets: Sequence[Iterable[Any]],
+    combiner: Callable[[Any, Any], Any],
+    function: Callable[[Tuple[Any, ...]], Any] = sum,
+    chunks: int | None = None,
+    executor: Executor | ThreadPool | None = None,
+) -> Any:
+    """
+    Reduces the Cartesian product of multiple sets in parallel without materializing it.
+
+    The index space of the product is split into contiguous mixed-radix ranges. Each worker
+    process receives only the sets and its range, maps every tuple of the range with function
+    and folds the values with combiner. The partial results are folded in the order of the ranges,
+    so combiner has to be associative but not necessarily commutative.
+
+    Products smaller than SERIAL_THRESHOLD are reduced in the calling process unless
+    an executor is given explicitly. Without an executor, the sum, maximum or minimum of
+    tuple sums over sets of integers is computed by the NumPy backend in vectorized_cartesian.
+
+    Arguments:
+        sets (sequence of iterable): The sets of the product.
+        combiner (callable): A picklable associative function of two values.
+        function (callable): A picklable function mapping a tuple of the product to a value. Sums the tuple by default.
+        chunks (int, optional): The number of ranges. By default, the first tuples are reduced
+            in the calling process to measure their cost, and the ranges are sized to run for
+            about TARGET_CHUNK_TIME seconds each, with at least two ranges per CPU.
+        executor (Executor or ThreadPool, optional): Where to run the ranges. The module-level
+            process pool by default. The executor is not shut down.
+
+    Returns:
+        The reduced value.
+
+    Raises:
+        ValueError: When provided a set of zero length
+    """
+    items = [tuple(set) for set in sets]
+    if not all([len(set) != 0 for set in items]):
+        raise ValueError("You should provide sets of non-zero length")
+
+    if executor is None and function is sum and combiner in _UFUNCS:
+        # Larger integers would be converted to float64 by NumPy and lose their exact value.
+        if all(
+            isinstance(item, int) and INT64_MIN <= item <= INT64_MAX
+            for set in items
+            for item in set
+        ):
+            return vectorized_cartesian_reduce(items, _UFUNCS[combiner])
+
+    total = prod(len(set) for set in items)
+    if executor is None and total < SERIAL_THRESHOLD:
+        return _reduce_range(items, 0, total, function, combiner)
+
+    if executor is None:
+        executor = get_default_executor()
+
+    start = 0
+    sample: List[Any] = []
+    if chunks is None:
+        start = min(total, SAMPLE_TUPLES)
+        start_time = perf_counter()
+        sample.append(_reduce_range(items, 0, start, function, combiner))
+        cost = (perf_counter() - start_time) / start
+        tuples_per_chunk = max(1, round(TARGET_CHUNK_TIME / cost)) if cost else total
+        chunks = max(2 * (os.cpu_count() or 1), -(-(total - start) // tuples_per_chunk))
+
+    ranges = _split(start, total, chunks) if start < total else []
+    partials = chunked_map(
+        partial(_reduce_bounds, items, function, combiner),
+        ranges,
+        executor,
+        chunksize=1,
+    )
+    return reduce(combiner, chain(sample, partials))
+
+
+def _indicator(
+    predicate: Callable[[Tuple[Any, ...]], bool], item: Tuple[Any, ...]
+) -> int:
+    """
+    Returns 1 if the predicate holds for the tuple and 0 otherwise.
+    """
+    return 1 if predicate(item) else 0
+
+
+def cartesian_max(
+    sets: Sequence[Iterable[Any]],
+    function: Callable[[Tuple[Any, ...]], Any] = sum,
+    executor: Executor | ThreadPool | None = None,
+) -> Any:
+    """
+    Finds the maximum of function over the Cartesian product of multiple sets.
+
+    Arguments:
+        sets (sequence of iterable): The sets of the product.
+        function (callable): A picklable function of a tuple. Sums the tuple by default.
+        executor (Executor or ThreadPool, optional): Where to run the reduction.
+
+    Returns:
+        The maximum value.
+    """
+    return cartesian_reduce(sets, max, function, executor=executor)
+
+
+def cartesian_min(
+    sets: Sequence[Iterable[Any]],
+    function: Callable[[Tuple[Any, ...]], Any] = sum,
+    executor: Executor | ThreadPool | None = None,
+) -> Any:
+    """
+    Finds the minimum of function over the Cartesian product of multiple sets.
+
+    Arguments:
+        sets (sequence of iterable): The sets of the product.
+        function (callable): A picklable function of a tuple. Sums the tuple by default.
+        executor (Executor or ThreadPool, optional): Where to run the reduction.
+
+    Returns:
+        The minimum value.
+    """
+    return cartesian_reduce(sets, min, function, executor=executor)
+
+
+def cartesian_count_if(
+    sets: Sequence[Iterable[Any]],
+    predicate: Callable[[Tuple[Any, ...]], bool],
+    executor: Executor | ThreadPool | None = None,
+) -> int:
+    """
+    Counts the tuples of the Cartesian product of multiple sets that satisfy a predicate.
+
+    Arguments:
+        sets (sequence of iterable): The sets of the product.
+        predicate (callable): A picklable function of a tuple.
+        executor (Executor or ThreadPool, optional): Where to run the reduction.
+
+    Returns:
+        int: The number of matching tuples.
+    """
+    return cartesian_reduce(
+        sets, add, partial(_indicator, predicate), executor=executor
+    )
+
+
+def parallel_cartesian_sum(
+    sets: List[Set[int]],
+    reducer: Callable[[Tuple[int, ...]], int] | None = None,
+    executor: Executor | ThreadPool | None = None,
+) -> int:
+    """
+    Computes the sum of the Cartesian product of multiple sets of integers.
+
+    By default, the sum is computed in closed form by cartesian_sum. If a reducer is given,
+    the reducer values of all tuples are summed in parallel by cartesian_reduce.
+
+    Arguments:
+        sets (list of set of int): A list of sets of integers for which the Cartesian product and sum need to be computed.
+        reducer (callable, optional): A picklable function mapping a tuple of the product to an integer.
+        executor (Executor or ThreadPool, optional): Where to run the reducer. The module-level process pool by default.
+
+    Returns:
+        int: The sum of all elements in the Cartesian product of the input sets,
+             or the sum of the reducer values if a reducer is given.
 
     Raises:
         ValueError: When provided a set of zero length
@@ -19,7 +378,7 @@ def parallel_cartesian_sum(sets: List[Set[int]]) -> int:
     if not all([len(set) != 0 for set in sets]):
         raise ValueError("You should provide sets of non-zero length")
 
-    with ProcessPoolExecutor() as executor:
-        cartesian_product = list(product(*sets))
-        partial_sums = executor.map(sum, cartesian_product)
-    return sum(partial_sums)
+    if reducer is None:
+        return cartesian_sum(sets)
+
+    return cartesian_reduce(sets, add, reducer, executor=executor)
@@ -0,0 +1,116 @@
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Tuple
+
+
+class SharedArray:
+    """
+    A NumPy array placed in shared memory, which can be passed to tasks of a ThreadPool
+    with the "process" backend without copying its data into the task message.
+
+    Only the name of the memory block, the shape and the dtype are pickled. A worker process
+    attaches to the same block, so writes made by tasks are visible to the owner.
+
+    Attributes:
+        shm : SharedMemory
+            The shared memory block holding the data.
+        array : np.ndarray
+            The array backed by the shared memory block.
+        owner : bool
+            Whether this object created the block and is responsible for unlinking it.
+    """
+
+    def __init__(self, data: Any) -> None:
+        """
+        Copies the data into a new shared memory block.
+
+        Parameters:
+        ----------
+        data : array-like
+            The data to share.
+        """
+
+        source = np.ascontiguousarray(data)
+        shm = SharedMemory(create=True, size=max(1, source.nbytes))
+        # The array is stored first, so it is released before the block it points to.
+        self.array: np.ndarray = np.ndarray(
+            source.shape, dtype=source.dtype, buffer=shm.buf
+        )
+        self.array[...] = source
+        self.shm: SharedMemory = shm
+        self.owner: bool = True
+
+    @classmethod
+    def attach(cls, name: str, shape: Tuple[int, ...], dtype: str) -> "SharedArray":
+        """
+        Attaches to an existing shared memory block.
+
+        Parameters:
+        ----------
+        name : str
+            The name of the block.
+        shape : Tuple[int, ...]
+            The shape of the array.
+        dtype : str
+            The dtype of the array.
+
+        Returns:
+        -------
+        SharedArray
+            The array that is not the owner of the block.
+        """
+
+        shm = SharedMemory(name=name)
+        shared = cls.__new__(cls)
+        shared.array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        shared.shm = shm
+        shared.owner = False
+        return shared
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str, Tuple[int, ...], str]]:
+        """
+        Pickles the array as a reference to its shared memory block.
+        """
+
+        return SharedArray.attach, (
+            self.shm.name,
+            self.array.shape,
+            self.array.dtype.str,
+        )
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        """
+        Allows the SharedArray object to be treated as a NumPy array directly.
+
+        Returns:
+        -------
+        np.ndarray
+            The array backed by the shared memory block.
+        """
+
+        return self.array if dtype is None else self.array.astype(dtype)
+
+    def close(self) -> None:
+        """
+        Releases the shared memory block. The owner also unlinks it, so the block is destroyed
+        once every process has closed it.
+        """
+
+        del self.array
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> "SharedArray":
+        """
+        Returns the array itself to be used in a with statement.
+        """
+
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        """
+        Closes the array on exit from the with statement.
+        """
+
+        self.close()
@@ -1,45 +1,403 @@
-from threading import Thread, Lock, Event
-from typing import List, Callable, Set
-from concurrent.futures import ThreadPoolExecutor
-from itertools import product
+import asyncio
+from threading import Thread, Lock, Condition, Event, current_thread
+from typing import Any, Callable, Deque, Dict, Iterable, List, Literal, Tuple
+from collections import deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.context import BaseContext
+from queue import Full
+from time import monotonic, perf_counter
+from traceback import print_exc
+
+from project.thread_pool.metrics import ThreadPoolMetrics
+
+
+OverflowPolicy = Literal["block", "timeout", "reject"]
+Backend = Literal["thread", "process"]
+
+
+PENDING = 0
+RUNNING = 1
+FINISHED = 2
+CANCELLED = 3
+
+
+def process_context() -> BaseContext:
+    """
+    Returns the multiprocessing context for worker processes. Forking a process that
+    already runs threads may deadlock the child, so the forkserver start method is
+    preferred and spawn is used where it is not available.
+    """
+
+    start_method = "forkserver" if "forkserver" in get_all_start_methods() else "spawn"
+    return get_context(start_method)
+
+
+def _release(tasks: Deque["Task"]) -> None:
+    """
+    Drops the tasks one by one, so other threads are not blocked on the GIL
+    for the whole time it takes to free a long queue. Tasks that have done callbacks
+    are notified about their cancellation.
+    """
+
+    while tasks:
+        task = tasks.pop()
+        if task.callbacks:
+            task.notify()
+
+
+def _execute_batch(
+    calls: List[Tuple[Callable, Tuple[Any, ...], Dict[str, Any] | None]]
+) -> List[Tuple[Any, BaseException | None]]:
+    """
+    Runs a batch of calls in a worker process of the process backend.
+
+    Parameters:
+    ----------
+    calls : List[Tuple[Callable, tuple, dict | None]]
+        The callables with their positional and keyword arguments.
+
+    Returns:
+    -------
+    List[Tuple[Any, BaseException | None]]
+        The value and the exception of each call.
+    """
+
+    outcomes: List[Tuple[Any, BaseException | None]] = []
+    for function, args, kwargs in calls:
+        try:
+            outcomes.append((function(*args, **(kwargs or {})), None))
+        except BaseException as error:
+            # SystemExit would otherwise stop the worker process and break the executor.
+            outcomes.append((None, error))
+    return outcomes
+
+
+def _resolve_future(future: "asyncio.Future[Any]", task: "Task") -> None:
+    """
+    Transfers the outcome of a task to an asyncio future. Runs in the event loop thread.
+    """
+
+    if future.cancelled():
+        return
+    if task.cancelled():
+        future.cancel()
+    elif task.error is not None:
+        future.set_exception(task.error)
+    else:
+        future.set_result(task.value)
+
+
+_standalone_lock = Lock()
+
+
+class Task:
+    """
+    A unit of work stored in the ThreadPool queue. It is returned by ThreadPool.enqueue
+    and serves as the cancellation token and the future of the task.
+
+    The callable and its arguments are kept as plain references instead of being wrapped
+    into a closure, so a queued task costs a single small object.
+
+    Attributes:
+        function : Callable
+            The callable to execute.
+        args : tuple
+            Positional arguments for the callable.
+        kwargs : dict | None
+            Keyword arguments for the callable, or None if there are none.
+        state : int
+            One of PENDING, RUNNING, FINISHED or CANCELLED.
+        pool : ThreadPool | None
+            The pool the task was enqueued to.
+        value : Any
+            The value returned by the callable.
+        error : BaseException | None
+            The exception raised by the callable, or None.
+        callbacks : List[Callable] | None
+            The callbacks to call once the task is done.
+        enqueued_at : float
+            The time the task was enqueued. It is set only when the pool collects metrics.
+    """
+
+    __slots__ = (
+        "function",
+        "args",
+        "kwargs",
+        "state",
+        "pool",
+        "value",
+        "error",
+        "callbacks",
+        "enqueued_at",
+    )
+
+    enqueued_at: float
+
+    def __init__(
+        self,
+        function: Callable,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any] | None = None,
+        pool: "ThreadPool | None" = None,
+    ) -> None:
+        """
+        Initializes the task with a callable and its arguments.
+
+        Parameters:
+        ----------
+        function : Callable
+            The callable to execute.
+        args : tuple
+            Positional arguments for the callable.
+        kwargs : dict | None
+            Keyword arguments for the callable.
+        pool : ThreadPool | None
+            The pool the task is enqueued to. Its lock guards the state changes.
+        """
+
+        self.function: Callable = function
+        self.args: Tuple[Any, ...] = args
+        self.kwargs: Dict[str, Any] | None = kwargs
+        self.state: int = PENDING
+        self.pool: ThreadPool | None = pool
+        self.value: Any = None
+        self.error: BaseException | None = None
+        self.callbacks: List[Callable[["Task"], Any]] | None = None
+
+    @property
+    def lock(self) -> Lock:
+        """
+        The lock guarding the state of the task.
+        """
+
+        return self.pool.lock if self.pool is not None else _standalone_lock
+
+    def run(self) -> None:
+        """
+        Executes the callable with the stored arguments and stores its outcome.
+        """
+
+        try:
+            if self.kwargs:
+                value = self.function(*self.args, **self.kwargs)
+            else:
+                value = self.function(*self.args)
+        except BaseException as error:
+            # KeyboardInterrupt and SystemExit finish the task too, so result() does not hang.
+            # They are not raised again, which would stop the worker thread without a trace.
+            self.set_outcome(None, error)
+        else:
+            self.set_outcome(value, None)
+
+    def set_outcome(self, value: Any, error: BaseException | None) -> None:
+        """
+        Stores the outcome of the task, marks it finished and calls the done callbacks.
+
+        Parameters:
+        ----------
+        value : Any
+            The value returned by the callable.
+        error : BaseException | None
+            The exception raised by the callable, or None.
+        """
+
+        self.value = value
+        self.error = error
+        self.state = FINISHED
+        self.notify()
+
+    def notify(self) -> None:
+        """
+        Calls the registered done callbacks, each of them exactly once.
+        """
+
+        callbacks = self.callbacks
+        while callbacks:
+            try:
+                callback = callbacks.pop(0)
+            except IndexError:
+                break
+            try:
+                callback(self)
+            except Exception:
+                print_exc()
+
+    def add_done_callback(self, callback: Callable[["Task"], Any]) -> None:
+        """
+        Registers a callback called with the task once it finishes or is cancelled.
+        The callback is called right away if the task is already done.
+
+        Parameters:
+        ----------
+        callback : Callable[[Task], Any]
+            The callback. It runs in the thread that completes the task.
+        """
+
+        with self.lock:
+            if self.callbacks is None:
+                self.callbacks = []
+            self.callbacks.append(callback)
+
+        if self.done():
+            self.notify()
+
+    def result(self, timeout: float | None = None) -> Any:
+        """
+        Waits for the task and returns the value of the callable.
+
+        Parameters:
+        ----------
+        timeout : float | None
+            The maximum time in seconds to wait. By default, waits indefinitely.
+
+        Returns:
+        -------
+        Any
+            The value returned by the callable.
+
+        Raises:
+        -------
+        TimeoutError
+            If the task is not done within the timeout.
+        concurrent.futures.CancelledError
+            If the task was cancelled.
+        Exception
+            The exception raised by the callable.
+        """
+
+        if not self.done():
+            finished = Event()
+            self.add_done_callback(lambda _: finished.set())
+            if not finished.wait(timeout):
+                raise TimeoutError("Task is not done yet.")
+
+        if self.cancelled():
+            raise CancelledError()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def cancel(self) -> bool:
+        """
+        Cancels the task if it has not started yet.
+
+        Returns:
+        -------
+        bool
+            True if the task is cancelled, False if it is already running or finished.
+        """
+
+        with self.lock:
+            if self.state != PENDING:
+                return self.state == CANCELLED
+            self.state = CANCELLED
+
+        self.notify()
+        return True
+
+    def cancelled(self) -> bool:
+        """
+        Returns True if the task was cancelled before it started, either by itself
+        or by disposing of the pool with cancel_pending=True.
+        """
+
+        if self.state == PENDING:
+            return self.pool is not None and self.pool.pending_cancelled
+        return self.state == CANCELLED
+
+    def done(self) -> bool:
+        """
+        Returns True if the task has finished or was cancelled.
+        """
+
+        return self.state >= FINISHED or self.cancelled()
 
 
 class ThreadPool:
     """
     A class for managing a pool of threads that can execute tasks concurrently.
 
+    With the "process" backend, tasks run in a pool of worker processes instead, so CPU-bound
+    tasks are not limited by the GIL. Each worker thread then takes a batch of tasks from the
+    queue and sends it to a process as a single message, which amortizes the pickling costs.
+    Such tasks, their arguments and results must be picklable, and the callables must be
+    importable by worker processes. NumPy payloads can be handed off through
+    project.thread_pool.shared_memory.SharedArray without copying them into the message.
+
     Attributes:
         num_threads : int
-            The number of worker threads in the pool.
-        tasks : List
-            A list that holds tasks (functions) to be executed by the worker threads.
+            The number of worker threads in the pool, and of worker processes for the "process" backend.
+        backend : str
+            Where tasks run: "thread" or "process".
+        batch_size : int
+            The maximum number of tasks sent to a worker process at once.
+        executor : ProcessPoolExecutor | None
+            The worker processes of the "process" backend.
+        tasks : Deque[Task]
+            A queue that holds tasks to be executed by the worker threads.
         threads : List[Thread]
             A list of the threads in the pool.
+        running_workers : int
+            The number of worker threads that have not terminated yet.
         is_active : bool
             A flag indicating if the thread pool is active and can accept new tasks.
-        task_event : threading.Event
-            An event used to signal when new tasks are available for worker threads to process.
-            The event is set whenever a new task is enqueued and cleared when there are no tasks to process.
-
+        pending_cancelled : bool
+            A flag indicating that the tasks left in the queue were cancelled by dispose.
+        max_queue_size : int
+            The maximum number of queued tasks. Zero or a negative value means the queue is unbounded.
+        overflow_policy : str
+            What enqueue does when the queue is full: "block" waits for a free slot,
+            "timeout" waits at most enqueue_timeout seconds, "reject" fails immediately.
+        enqueue_timeout : float | None
+            The waiting time used by the "timeout" policy.
         lock : threading.Lock
-            A lock to ensure thread-safe access to the task list, preventing race conditions
+            A lock to ensure thread-safe access to the task queue, preventing race conditions
             when tasks are being added, removed, or accessed by worker threads.
+        not_empty : threading.Condition
+            A condition used to wake up worker threads when a new task is enqueued.
+        not_full : threading.Condition
+            A condition used to wake up producers blocked on a full queue.
+        metrics : ThreadPoolMetrics | None
+            Counters, timings and hooks of the pool, or None if metrics are disabled.
 
     Methods:
-        __init__(num_threads: int) -> None:
+        __init__(num_threads: int, max_queue_size: int, overflow_policy: str, enqueue_timeout: float | None,
+                 metrics: ThreadPoolMetrics | None, backend: str, batch_size: int) -> None:
             Initializes the ThreadPool with a fixed number of worker threads and starts them.
 
         worker() -> None:
             A worker thread that processes tasks from the queue. Runs in a loop until the thread pool is disposed.
 
-        enqueue(task: Callable) -> None:
+        enqueue(task: Callable, *args, **kwargs) -> Task:
             Adds a new task to the queue to be executed by an available worker thread.
 
-        dispose() -> None:
-            Signals all worker threads to finish their current tasks and terminate. Prevents new tasks from being added.
+        run(function: Callable, *args, **kwargs) -> Any:
+            A coroutine that runs a callable in the pool and returns its value.
+
+        map_async(function: Callable, iterable: Iterable, limit: int | None) -> List:
+            A coroutine that applies a callable to every item with a concurrency limit.
+
+        dispose(wait: bool, cancel_pending: bool, timeout: float | None) -> bool:
+            Signals all worker threads to terminate. Prevents new tasks from being added.
+
+        snapshot() -> Dict[str, Any]:
+            Returns the current metrics of the pool.
+
+        __enter__() -> ThreadPool, __exit__(...) -> None:
+            Allow the pool to be used as a context manager that disposes of it on exit.
     """
 
-    def __init__(self, num_threads: int) -> None:
+    def __init__(
+        self,
+        num_threads: int,
+        max_queue_size: int = 0,
+        overflow_policy: OverflowPolicy = "block",
+        enqueue_timeout: float | None = None,
+        metrics: ThreadPoolMetrics | None = None,
+        backend: Backend = "thread",
+        batch_size: int = 16,
+    ) -> None:
         """
         Initializes the ThreadPool with a given number of threads and starts each one.
 
@@ -47,15 +405,54 @@ class ThreadPool:
         ----------
         num_threads : int
             The number of worker threads to be created and managed by the pool.
+        max_queue_size : int
+            The capacity of the task queue. By default (0), the queue is unbounded.
+        overflow_policy : str
+            The behaviour of enqueue on a full queue: "block", "timeout" or "reject".
+        enqueue_timeout : float | None
+            The maximum waiting time in seconds for the "timeout" policy.
+        metrics : ThreadPoolMetrics | None
+            The metrics to collect. By default, metrics are disabled and cost nothing.
+        backend : str
+            "thread" runs tasks in the worker threads, "process" runs them in worker processes.
+        batch_size : int
+            The maximum number of tasks sent to a worker process at once. Used by the "process" backend.
+
+        Raises:
+        -------
+        ValueError
+            If the overflow policy or the backend is unknown, or the "timeout" policy is used without a timeout.
         """
 
+        if overflow_policy not in ("block", "timeout", "reject"):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Unknown backend: {backend}")
+        if overflow_policy == "timeout" and enqueue_timeout is None:
+            raise ValueError("The 'timeout' policy requires enqueue_timeout")
+
         self.num_threads: int = num_threads
-        self.tasks: List[Callable | None] = []
+        self.max_queue_size: int = max_queue_size
+        self.overflow_policy: OverflowPolicy = overflow_policy
+        self.enqueue_timeout: float | None = enqueue_timeout
+        self.tasks: Deque[Task] = deque()
         self.threads: List[Thread] = []
         self.is_active: bool = True
+        self.pending_cancelled: bool = False
         self.lock: Lock = Lock()
-        self.task_event: Event = Event()
+        self.not_empty: Condition = Condition(self.lock)
+        self.not_full: Condition = Condition(self.lock)
+        self.metrics: ThreadPoolMetrics | None = metrics
+        self.backend: Backend = backend
+        self.batch_size: int = max(1, batch_size)
+        self.executor: ProcessPoolExecutor | None = None
+
+        if backend == "process":
+            self.executor = ProcessPoolExecutor(
+                max_workers=max(1, num_threads), mp_context=process_context()
+            )
 
+        self.running_workers: int = num_threads
         for _ in range(num_threads):
             thread = Thread(target=self.worker)
             thread.start()
@@ -66,58 +463,425 @@ class ThreadPool:
         Worker method run by each thread.
 
         Continuously waits for tasks from the queue and executes them. Terminates when
-        the thread pool is disposed and the shutdown signal (None) is received.
+        the thread pool is disposed and the queue is drained.
         """
 
-        while self.is_active or self.tasks:
-            with self.lock:
-                if self.tasks:
-                    task = self.tasks.pop(0)
-                else:
-                    task = None
+        run = self._run_in_thread if self.executor is None else self._run_in_process
 
-            if task:
-                try:
-                    task()
-                finally:
-                    self.task_event.clear()
+        while True:
+            batch = self._take()
+            if batch is None:
+                self._exit_worker()
+                return
+
+            metrics = self.metrics
+            if metrics is None:
+                run(batch)
             else:
-                if self.is_active:
-                    self.task_event.wait()
+                self._run_measured(batch, run, metrics)
+
+    def _take(self) -> List[Task] | None:
+        """
+        Waits for tasks and takes the next batch of them from the queue. The thread backend
+        takes one task at a time, the process backend takes up to batch_size tasks while
+        leaving a share of the queue to the other workers.
 
-    def enqueue(self, task: Callable) -> None:
+        Returns:
+        -------
+        List[Task] | None
+            The tasks marked as running, or None if the pool is disposed and the queue is drained.
+        """
+
+        with self.lock:
+            while True:
+                while not self.tasks and self.is_active:
+                    self.not_empty.wait()
+                if not self.tasks:
+                    return None
+
+                count = 1
+                if self.executor is not None:
+                    count = min(self.batch_size, len(self.tasks) // self.num_threads)
+
+                batch: List[Task] = []
+                while self.tasks and len(batch) < max(1, count):
+                    task = self.tasks.popleft()
+                    self.not_full.notify()
+                    if task.state == PENDING:
+                        task.state = RUNNING
+                        batch.append(task)
+                if batch:
+                    return batch
+
+    def _exit_worker(self) -> None:
+        """
+        Counts a terminated worker thread. The last one shuts down the worker processes.
+        """
+
+        with self.lock:
+            self.running_workers -= 1
+            is_last = self.running_workers == 0
+
+        if is_last and self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    def _run_in_thread(self, batch: List[Task]) -> None:
+        """
+        Runs the tasks in the current worker thread.
+
+        Parameters:
+        ----------
+        batch : List[Task]
+            The tasks to run.
+        """
+
+        for task in batch:
+            task.run()
+
+    def _run_in_process(self, batch: List[Task]) -> None:
+        """
+        Sends the tasks to a worker process as a single batch and waits for their outcomes.
+
+        Parameters:
+        ----------
+        batch : List[Task]
+            The tasks to run.
+        """
+
+        assert self.executor is not None
+        calls = [(task.function, task.args, task.kwargs) for task in batch]
+        try:
+            outcomes = self.executor.submit(_execute_batch, calls).result()
+        except Exception as exception:
+            outcomes = [(None, exception)] * len(batch)
+
+        for task, (value, error) in zip(batch, outcomes):
+            task.set_outcome(value, error)
+
+    def _run_measured(
+        self,
+        batch: List[Task],
+        run: Callable[[List[Task]], None],
+        metrics: ThreadPoolMetrics,
+    ) -> None:
+        """
+        Runs the tasks, updating the metrics and calling the hooks around them.
+        The run time of a batch is split evenly between its tasks.
+
+        Parameters:
+        ----------
+        batch : List[Task]
+            The tasks to run.
+        run : Callable[[List[Task]], None]
+            The backend-specific function running the tasks.
+        metrics : ThreadPoolMetrics
+            The metrics of the pool.
+        """
+
+        sampled = [metrics.task_started() for _ in batch]
+        if metrics.on_task_start is not None:
+            for task in batch:
+                metrics.on_task_start(task)
+
+        start = perf_counter()
+        run(batch)
+        batch_run_time = (perf_counter() - start) / len(batch)
+
+        for task, is_sampled in zip(batch, sampled):
+            run_time = batch_run_time if is_sampled else None
+            wait_time = start - task.enqueued_at if is_sampled else None
+            metrics.task_finished(wait_time, run_time, task.error is not None)
+            if metrics.on_task_finish is not None:
+                metrics.on_task_finish(task, run_time, task.error)
+
+    def enqueue(self, task: Callable, /, *args: Any, **kwargs: Any) -> Task:
         """
         Adds a task to the queue to be executed by a worker thread.
 
+        If the queue is full, the call blocks, waits at most enqueue_timeout seconds
+        or fails right away, depending on the overflow policy of the pool.
+
         Parameters:
         ----------
         task : Callable
             A callable function representing the task to be executed.
+        *args, **kwargs
+            Arguments the callable is invoked with.
+
+        Returns:
+        -------
+        Task
+            The handle of the queued task, which can be used to cancel it and to get its result.
 
         Raises:
         -------
         RuntimeError
             If the thread pool is inactive and cannot accept new tasks.
+        queue.Full
+            If the queue is full and the policy is "reject", or the "timeout" policy ran out of time.
         """
 
         if not self.is_active:
             raise RuntimeError("ThreadPool is inactive. Cannot enqueue new tasks.")
 
+        item = Task(task, args, kwargs or None, self)
+        self._put(item, blocking=True)
+        return item
+
+    def _put(self, item: Task, blocking: bool) -> bool:
+        """
+        Appends a task to the queue according to the overflow policy.
+
+        Parameters:
+        ----------
+        item : Task
+            The task to append.
+        blocking : bool
+            If False, gives up instead of waiting for the lock or for a free slot.
+
+        Returns:
+        -------
+        bool
+            True if the task was appended, False if it would have to wait.
+
+        Raises:
+        -------
+        RuntimeError
+            If the thread pool is inactive and cannot accept new tasks.
+        queue.Full
+            If the queue is full and the policy is "reject", or the "timeout" policy ran out of time.
+        """
+
+        if not self.is_active:
+            raise RuntimeError("ThreadPool is inactive. Cannot enqueue new tasks.")
+        if not self.lock.acquire(blocking):
+            return False
+
+        metrics = self.metrics
+        try:
+            if 0 < self.max_queue_size <= len(self.tasks):
+                if self.overflow_policy == "reject":
+                    if metrics is not None:
+                        metrics.rejected += 1
+                    raise Full("ThreadPool queue is full.")
+                if not blocking:
+                    return False
+
+                timeout = (
+                    self.enqueue_timeout if self.overflow_policy == "timeout" else None
+                )
+                has_slot = self.not_full.wait_for(
+                    lambda: not self.is_active or len(self.tasks) < self.max_queue_size,
+                    timeout,
+                )
+                if not has_slot:
+                    if metrics is not None:
+                        metrics.rejected += 1
+                    raise Full("ThreadPool queue is full.")
+
+            if not self.is_active:
+                raise RuntimeError("ThreadPool is inactive. Cannot enqueue new tasks.")
+
+            if metrics is not None:
+                metrics.submitted += 1
+                item.enqueued_at = perf_counter()
+            self.tasks.append(item)
+            self.not_empty.notify()
+            return True
+        finally:
+            self.lock.release()
+
+    async def run(self, function: Callable, /, *args: Any, **kwargs: Any) -> Any:
+        """
+        Runs a callable in the pool and waits for it without blocking the event loop.
+
+        The task is enqueued without waiting for the lock of the pool. If the lock is busy or
+        the queue is full, the blocking enqueue is moved to the default executor of the loop.
+        The result is delivered to the loop with loop.call_soon_threadsafe. Cancelling the
+        coroutine cancels the task if it has not started yet.
+
+        Parameters:
+        ----------
+        function : Callable
+            The callable to execute.
+        *args, **kwargs
+            Arguments the callable is invoked with.
+
+        Returns:
+        -------
+        Any
+            The value returned by the callable.
+
+        Raises:
+        -------
+        RuntimeError
+            If the thread pool is inactive and cannot accept new tasks.
+        queue.Full
+            If the queue is full and the policy is "reject", or the "timeout" policy ran out of time.
+        asyncio.CancelledError
+            If the task was cancelled.
+        Exception
+            The exception raised by the callable.
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        item = Task(function, args, kwargs or None, self)
+        # The task is not shared with other threads yet, so the callback is set without the lock.
+        item.callbacks = [
+            lambda task: loop.call_soon_threadsafe(_resolve_future, future, task)
+        ]
+
+        try:
+            if not self._put(item, blocking=False):
+                await loop.run_in_executor(None, self._put, item, True)
+            return await future
+        except asyncio.CancelledError:
+            # A blocked enqueue still completes in the executor, so the task is cancelled
+            # right away and the worker skips it once it is queued.
+            if not item.done():
+                item.cancel()
+            raise
+
+    async def map_async(
+        self, function: Callable, iterable: Iterable[Any], limit: int | None = None
+    ) -> List[Any]:
+        """
+        Applies a callable to every item of an iterable in the pool, keeping at most limit
+        calls in flight, and returns the results in the order of the items.
+
+        Parameters:
+        ----------
+        function : Callable
+            The callable to apply.
+        iterable : Iterable[Any]
+            The items. They are consumed lazily.
+        limit : int | None
+            The maximum number of concurrent calls. By default, the number of worker threads.
+
+        Returns:
+        -------
+        List[Any]
+            The values returned by the callable.
+
+        Raises:
+        -------
+        ValueError
+            If the limit is not positive.
+        Exception
+            The first exception raised by the callable. The remaining calls are cancelled.
+        """
+
+        if limit is None:
+            limit = max(1, self.num_threads)
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+
+        results: Dict[int, Any] = {}
+        items = enumerate(iterable)
+
+        async def consume() -> None:
+            for index, item in items:
+                results[index] = await self.run(function, item)
+
+        consumers = [asyncio.ensure_future(consume()) for _ in range(limit)]
+        try:
+            await asyncio.gather(*consumers)
+        except BaseException:
+            for consumer in consumers:
+                consumer.cancel()
+            raise
+
+        return [results[index] for index in range(len(results))]
+
+    def dispose(
+        self,
+        wait: bool = True,
+        cancel_pending: bool = False,
+        timeout: float | None = None,
+    ) -> bool:
+        """
+        Disposes of the thread pool by signaling all worker threads to terminate.
+        It also prevents new tasks from being added to the pool and releases producers blocked on a full queue.
+        Running tasks are never interrupted.
+
+        Parameters:
+        ----------
+        wait : bool
+            Whether to wait for the worker threads to terminate.
+        cancel_pending : bool
+            If True, the queued tasks are cancelled instead of being executed.
+        timeout : float | None
+            The maximum time in seconds to wait for the worker threads. By default, waits indefinitely.
+
+        Returns:
+        -------
+        bool
+            True if all worker threads have terminated.
+        """
+
         with self.lock:
-            self.tasks.append(task)
+            self.is_active = False
+            if cancel_pending and self.tasks:
+                # Tasks left in the queue are reported as cancelled through
+                # pending_cancelled, and the queue itself is released in the
+                # background, so shutdown does not depend on the queue length.
+                self.pending_cancelled = True
+                Thread(target=_release, args=(self.tasks,), daemon=True).start()
+                self.tasks = deque()
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
+
+        if wait:
+            deadline = None if timeout is None else monotonic() + timeout
+            for thread in self.threads:
+                if thread is current_thread():
+                    continue
+                thread.join(
+                    None if deadline is None else max(0, deadline - monotonic())
+                )
+
+        terminated = not any(
+            thread.is_alive() and thread is not current_thread()
+            for thread in self.threads
+        )
+        if self.executor is not None and terminated:
+            self.executor.shutdown(wait=wait)
 
-        self.task_event.set()
+        return terminated
 
-    def dispose(self) -> None:
+    def snapshot(self) -> Dict[str, Any]:
         """
-        Disposes of the thread pool by signaling all worker threads to finish their tasks and terminate.
-        It also prevents new tasks from being added to the pool.
+        Returns the current metrics of the pool: queue depth, task counters,
+        wait and run time histograms and worker utilization.
+
+        Returns:
+        -------
+        Dict[str, Any]
+            A copy of the metrics that is not affected by later updates.
+
+        Raises:
+        -------
+        RuntimeError
+            If the pool was created without metrics.
+        """
+
+        if self.metrics is None:
+            raise RuntimeError("ThreadPool metrics are disabled.")
+
+        return self.metrics.snapshot(self.num_threads, len(self.tasks))
+
+    def __enter__(self) -> "ThreadPool":
+        """
+        Returns the pool itself to be used in a with statement.
         """
-        if self.is_active == False:
-            return
 
-        self.task_event.set()
-        self.is_active = False
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        """
+        Disposes of the pool, waiting for the workers. Pending tasks are cancelled
+        if the with block was left because of an exception.
+        """
 
-        for thread in self.threads:
-            thread.join()
+        self.dispose(cancel_pending=exc_type is not None)
@@ -0,0 +1,229 @@
+import numpy as np
+from itertools import product
+from math import prod
+from operator import add, mul
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence
+
+# Python counterparts of the supported ufuncs, used to fold the block results exactly.
+_COMBINERS: Dict[np.ufunc, Callable[[Any, Any], Any]] = {
+    np.add: add,
+    np.multiply: mul,
+    np.maximum: max,
+    np.minimum: min,
+}
+
+INT64_MIN = np.iinfo(np.int64).min
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def _to_arrays(sets: Sequence[Iterable[Any]]) -> List[np.ndarray]:
+    """
+    Converts the sets to one-dimensional arrays.
+
+    Raises:
+        ValueError: When provided a set of zero length
+    """
+    arrays = [np.array(tuple(set)) for set in sets]
+    if not all([len(array) != 0 for array in arrays]):
+        raise ValueError("You should provide sets of non-zero length")
+    return arrays
+
+
+def _bound(arrays: List[np.ndarray], function: np.ufunc) -> int | None:
+    """
+    Returns an upper bound of the absolute value of function over the product,
+    or None if the function is not one of the supported ufuncs.
+    """
+    # Python integers, since the absolute value of the smallest int64 overflows in NumPy.
+    maxima = [max(abs(int(array.min())), abs(int(array.max()))) for array in arrays]
+    if function is np.add:
+        return sum(maxima)
+    if function is np.multiply:
+        return prod(maxima)
+    if function is np.maximum or function is np.minimum:
+        return max(maxima)
+    return None
+
+
+def safe_dtype(
+    arrays: List[np.ndarray],
+    function: np.ufunc,
+    reduction: np.ufunc | None,
+    block_size: int,
+) -> np.dtype:
+    """
+    Chooses a dtype that evaluates function and reduces a block without overflow.
+
+    Floating point inputs are evaluated as float64. Integer inputs are evaluated as int64
+    if the values and the reduced blocks provably fit into it, and as Python integers
+    (object dtype) otherwise.
+
+    Arguments:
+        arrays (list of np.ndarray): The sets of the product.
+        function (np.ufunc): The function combining the elements of a tuple.
+        reduction (np.ufunc, optional): The ufunc reducing a block, or None if blocks are not reduced arithmetically.
+        block_size (int): The maximum number of elements in a block.
+
+    Returns:
+        np.dtype: The dtype to evaluate the blocks in.
+
+    Raises:
+        ValueError: If the inputs are not numeric, or the function is not supported and the bound is unknown.
+    """
+    if any(array.dtype.kind == "f" for array in arrays):
+        return np.dtype(np.float64)
+    if not all(array.dtype.kind in "iub" for array in arrays):
+        raise ValueError("Sets must contain numbers")
+
+    bound = _bound(arrays, function)
+    if bound is None:
+        raise ValueError(f"Cannot choose a safe dtype for {function}; pass dtype")
+    if reduction is np.add:
+        bound *= block_size
+    elif reduction is np.multiply:
+        return np.dtype(object)
+    return np.dtype(np.int64) if bound <= INT64_MAX else np.dtype(object)
+
+
+def cartesian_blocks(
+    arrays: List[np.ndarray], function: np.ufunc, block_size: int
+) -> Iterator[np.ndarray]:
+    """
+    Evaluates function over the tuples of the Cartesian product in blocks of at most
+    block_size elements, in the order of itertools.product.
+
+    The trailing sets that fit into a block are combined once with function.outer.
+    The set before them is cut into slices, each combined with that precomputed block,
+    and the leading sets are folded into a scalar for every combination of their elements.
+    The function has to be associative, as the tuples are folded from the right.
+
+    Arguments:
+        arrays (list of np.ndarray): The sets of the product, already of the evaluation dtype.
+        function (np.ufunc): A binary associative ufunc combining the elements of a tuple.
+        block_size (int): The maximum number of elements in a block.
+
+    Returns:
+        iterator of np.ndarray: The values of consecutive blocks. A yielded array may be
+        overwritten once the next block is requested.
+    """
+    block_size = max(1, block_size)
+    if not arrays:
+        # The product of no sets consists of the empty tuple.
+        if function.identity is None:
+            raise ValueError(f"{function} has no value for the empty tuple")
+        yield np.array([function.identity])
+        return
+
+    inner = arrays[-1]
+    split = len(arrays) - 1
+    while split > 0 and len(arrays[split - 1]) * len(inner) <= block_size:
+        split -= 1
+        inner = function.outer(arrays[split], inner).ravel()
+
+    if len(inner) > block_size:
+        # The last set alone does not fit into a block, so it is sliced itself.
+        chunked, inner_block, split = arrays[-1], None, len(arrays) - 1
+    elif split > 0:
+        chunked, inner_block, split = arrays[split - 1], inner, split - 1
+    else:
+        yield inner
+        return
+
+    rows = block_size if inner_block is None else max(1, block_size // len(inner_block))
+    buffer = np.empty(
+        rows * (1 if inner_block is None else len(inner_block)), dtype=inner.dtype
+    )
+
+    for prefix in product(*arrays[:split]):
+        scalar = None
+        for value in prefix:
+            scalar = value if scalar is None else function(scalar, value)
+
+        for start in range(0, len(chunked), rows):
+            part = chunked[start : start + rows]
+            if inner_block is None:
+                block = buffer[: len(part)]
+                block[...] = part
+            else:
+                block = buffer[: len(part) * len(inner_block)]
+                function.outer(
+                    part, inner_block, out=block.reshape(len(part), len(inner_block))
+                )
+            if scalar is not None:
+                function(scalar, block, out=block)
+            yield block
+
+
+def vectorized_cartesian_reduce(
+    sets: Sequence[Iterable[Any]],
+    reduction: np.ufunc = np.add,
+    function: np.ufunc = np.add,
+    block_size: int = 1 << 20,
+    dtype: Any = None,
+) -> Any:
+    """
+    Reduces function over the Cartesian product of multiple sets of numbers with NumPy.
+
+    The product is evaluated in memory-bounded blocks of broadcasted arrays, each block
+    is reduced with reduction.reduce, and the block results are folded as Python numbers,
+    so the total does not overflow.
+
+    Arguments:
+        sets (sequence of iterable): The sets of numbers.
+        reduction (np.ufunc): np.add, np.multiply, np.maximum or np.minimum.
+        function (np.ufunc): A binary associative ufunc combining the elements of a tuple. Sums the tuple by default.
+        block_size (int): The maximum number of elements evaluated at once.
+        dtype (optional): The evaluation dtype. Chosen by safe_dtype by default.
+
+    Returns:
+        The reduced value.
+
+    Raises:
+        ValueError: When provided a set of zero length, non-numeric sets or an unsupported reduction.
+    """
+    if reduction not in _COMBINERS:
+        raise ValueError(f"Unsupported reduction: {reduction}")
+
+    arrays = _to_arrays(sets)
+    if dtype is None:
+        dtype = safe_dtype(arrays, function, reduction, block_size)
+    arrays = [array.astype(dtype) for array in arrays]
+
+    combiner = _COMBINERS[reduction]
+    result = None
+    for block in cartesian_blocks(arrays, function, block_size):
+        value = reduction.reduce(block)
+        value = value.item() if isinstance(value, np.generic) else value
+        result = value if result is None else combiner(result, value)
+    return result
+
+
+def vectorized_cartesian_count_if(
+    sets: Sequence[Iterable[Any]],
+    predicate: Callable[[np.ndarray], np.ndarray],
+    function: np.ufunc = np.add,
+    block_size: int = 1 << 20,
+    dtype: Any = None,
+) -> int:
+    """
+    Counts the tuples of the Cartesian product whose function value satisfies a predicate.
+
+    Arguments:
+        sets (sequence of iterable): The sets of numbers.
+        predicate (callable): A vectorized function mapping an array of values to a boolean array.
+        function (np.ufunc): A binary associative ufunc combining the elements of a tuple. Sums the tuple by default.
+        block_size (int): The maximum number of elements evaluated at once.
+        dtype (optional): The evaluation dtype. Chosen by safe_dtype by default.
+
+    Returns:
+        int: The number of matching tuples.
+    """
+    arrays = _to_arrays(sets)
+    if dtype is None:
+        dtype = safe_dtype(arrays, function, None, block_size)
+    arrays = [array.astype(dtype) for array in arrays]
+
+    return sum(
+        int(np.count_nonzero(predicate(block)))
+        for block in cartesian_blocks(arrays, function, block_size)
+    )
@@ -0,0 +1,341 @@
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Generator
+
+from project.treap.treap import PriorityMode, priority_source
+
+# The index of a missing child.
+NIL = -1
+
+
+class ArrayTreap(MutableMapping):
+    """
+    A Treap that stores its nodes as a struct of arrays instead of Node objects.
+
+    The keys, the priorities and the child indices of all nodes are kept in typed arrays of
+    64-bit integers, and the values in a parallel list. A node is an index into these arrays.
+    Slots of deleted nodes are chained into a free list through the left child array and reused
+    by later insertions, so a Treap of n keys allocates no per-node Python objects.
+
+    Keys must be integers that fit into 64 bits. Priorities are chosen as in Treap.
+
+    Attributes:
+        root (int): The index of the root node, or NIL if the Treap is empty.
+        node_keys (array): The key of every node.
+        priorities (array): The priority of every node.
+        lefts (array): The index of the left child of every node, or NIL.
+        rights (array): The index of the right child of every node, or NIL.
+        node_values (list): The value of every node.
+        free (int): The first slot of the free list, or NIL.
+        priority_mode (PriorityMode): How priorities of new keys are chosen.
+        seed (int | None): The seed of the priorities.
+        __size (int): The number of elements in the Treap.
+    """
+
+    def __init__(
+        self, priorities: PriorityMode = "random", seed: int | None = None
+    ) -> None:
+        """
+        Initialize an empty Treap.
+
+        Args:
+            priorities (PriorityMode): "random" for priorities from a seedable generator, or "hash"
+                                       for priorities derived from the keys.
+            seed (int | None): The seed of the priorities, which makes the shape reproducible.
+        """
+
+        self.root: int = NIL
+        self.node_keys: array = array("q")
+        self.priorities: array = array("q")
+        self.lefts: array = array("q")
+        self.rights: array = array("q")
+        self.node_values: list[Any] = []
+        self.free: int = NIL
+        self.priority_mode = priorities
+        self.seed = seed
+        self._priority = priority_source(priorities, seed)
+        self.__size: int = 0
+
+    def _allocate(self, key: int, value: Any) -> int:
+        """
+        Create a leaf node, reusing a free slot if there is one.
+
+        Args:
+            key (int): The key of the node.
+            value (Any): The value associated with the key.
+
+        Returns:
+            int: The index of the node.
+        """
+        index = self.free
+        if index == NIL:
+            index = len(self.node_values)
+            self.node_keys.append(key)
+            self.priorities.append(self._priority(key))
+            self.lefts.append(NIL)
+            self.rights.append(NIL)
+            self.node_values.append(value)
+            return index
+
+        self.free = self.lefts[index]
+        try:
+            self.node_keys[index] = key
+        except OverflowError:
+            # The key does not fit into the key array, so the slot goes back to the free list.
+            self._release(index)
+            raise
+        self.priorities[index] = self._priority(key)
+        self.lefts[index] = self.rights[index] = NIL
+        self.node_values[index] = value
+        return index
+
+    def _release(self, index: int) -> None:
+        """
+        Put the slot of a detached node on the free list.
+
+        Args:
+            index (int): The index of the node.
+        """
+        self.node_values[index] = None
+        self.lefts[index] = self.free
+        self.free = index
+
+    def _rotate_right(self, index: int) -> int:
+        """
+        Perform a right rotation on the given node.
+
+        Args:
+            index (int): The node with a left child.
+
+        Returns:
+            int: The new root of the subtree after rotation.
+        """
+        lefts, rights = self.lefts, self.rights
+        new_root = lefts[index]
+        lefts[index] = rights[new_root]
+        rights[new_root] = index
+        return new_root
+
+    def _rotate_left(self, index: int) -> int:
+        """
+        Perform a left rotation on the given node.
+
+        Args:
+            index (int): The node with a right child.
+
+        Returns:
+            int: The new root of the subtree after rotation.
+        """
+        lefts, rights = self.lefts, self.rights
+        new_root = rights[index]
+        rights[index] = lefts[new_root]
+        lefts[new_root] = index
+        return new_root
+
+    def _attach(self, parent: int, key: int, child: int) -> None:
+        """
+        Make the given node the child of parent on the side where key belongs.
+
+        Args:
+            parent (int): The parent node, or NIL to replace the root.
+            key (int): A key of the subtree of the child, used to choose the side.
+            child (int): The new child.
+        """
+        if parent == NIL:
+            self.root = child
+        elif key < self.node_keys[parent]:
+            self.lefts[parent] = child
+        else:
+            self.rights[parent] = child
+
+    def _find(self, key: int) -> int:
+        """
+        Find the node with the given key.
+
+        Args:
+            key (int): The key to search for.
+
+        Returns:
+            int: The index of the node, or NIL if the key is not found.
+        """
+        node_keys, lefts, rights = self.node_keys, self.lefts, self.rights
+        index = self.root
+        while index != NIL:
+            node_key = node_keys[index]
+            if key < node_key:
+                index = lefts[index]
+            elif key > node_key:
+                index = rights[index]
+            else:
+                return index
+        return NIL
+
+    def __getitem__(self, key: int) -> Any:
+        """
+        Retrieve the value associated with the given key from the Treap.
+
+        Args:
+            key (int): The key of the node to retrieve.
+
+        Returns:
+            Any: The value associated with the key.
+
+        Raises:
+            KeyError: If the key is not found in the Treap.
+        """
+        index = self._find(key)
+        if index == NIL:
+            raise KeyError(f"Key {key} not found.")
+        return self.node_values[index]
+
+    def __setitem__(self, key: int, value: Any) -> None:
+        """
+        Insert a new key-value pair or update the value of an existing key in the Treap.
+
+        Args:
+            key (int): The key of the node to insert or update.
+            value (Any): The value to associate with the key.
+        """
+        node_keys, lefts, rights = self.node_keys, self.lefts, self.rights
+        path: list[int] = []
+        index = self.root
+        while index != NIL:
+            node_key = node_keys[index]
+            if key < node_key:
+                path.append(index)
+                index = lefts[index]
+            elif key > node_key:
+                path.append(index)
+                index = rights[index]
+            else:
+                self.node_values[index] = value
+                return
+
+        index = self._allocate(key, value)
+        self.__size += 1
+        priorities = self.priorities
+        priority = priorities[index]
+        self._attach(path[-1] if path else NIL, key, index)
+        while path and priorities[path[-1]] < priority:
+            parent = path.pop()
+            if lefts[parent] == index:
+                self._rotate_right(parent)
+            else:
+                self._rotate_left(parent)
+            self._attach(path[-1] if path else NIL, key, index)
+
+    def __delitem__(self, key: int) -> None:
+        """
+        Delete the node with the given key from the Treap.
+
+        Args:
+            key (int): The key of the node to delete.
+
+        Raises:
+            KeyError: If the key is not found in the Treap.
+        """
+        node_keys, lefts, rights = self.node_keys, self.lefts, self.rights
+        parent = NIL
+        index = self.root
+        while index != NIL:
+            node_key = node_keys[index]
+            if key < node_key:
+                parent, index = index, lefts[index]
+            elif key > node_key:
+                parent, index = index, rights[index]
+            else:
+                break
+        if index == NIL:
+            raise KeyError(f"Key {key} not found.")
+
+        priorities = self.priorities
+        while lefts[index] != NIL and rights[index] != NIL:
+            if priorities[lefts[index]] < priorities[rights[index]]:
+                new_root = self._rotate_left(index)
+            else:
+                new_root = self._rotate_right(index)
+            self._attach(parent, key, new_root)
+            parent = new_root
+
+        child = lefts[index] if lefts[index] != NIL else rights[index]
+        self._attach(parent, key, child)
+        self._release(index)
+        self.__size -= 1
+
+    def __contains__(self, key: Any) -> bool:
+        """
+        Check if a key exists in the Treap.
+
+        Args:
+            key (int): The key to check.
+
+        Returns:
+            bool: True if the key is in the Treap, False otherwise.
+        """
+        return self._find(key) != NIL
+
+    def __iter__(self) -> Generator[int, None, None]:
+        """
+        Iterate over the keys of the Treap in ascending order.
+
+        Returns:
+            Generator[int]: A generator yielding keys in ascending order.
+        """
+        return self._in_order(self.lefts, self.rights)
+
+    def __reversed__(self) -> Generator[int, None, None]:
+        """
+        Iterate over the keys of the Treap in descending order.
+
+        Returns:
+            Generator[int]: A generator yielding keys in descending order.
+        """
+        return self._in_order(self.rights, self.lefts)
+
+    def _in_order(self, first: array, second: array) -> Generator[int, None, None]:
+        """
+        Helper method for the traversal of the Treap with an explicit stack.
+
+        Args:
+            first (array): The children visited before a node.
+            second (array): The children visited after a node.
+
+        Returns:
+            Generator[int]: A generator yielding keys in the order of the traversal.
+        """
+        node_keys = self.node_keys
+        stack: list[int] = []
+        index = self.root
+        while stack or index != NIL:
+            while index != NIL:
+                stack.append(index)
+                index = first[index]
+            index = stack.pop()
+            yield node_keys[index]
+            index = second[index]
+
+    def __len__(self) -> int:
+        """
+        Get the number of nodes in the Treap.
+
+        Returns:
+            int: The number of nodes in the Treap.
+        """
+        return self.__size
+
+    def height(self) -> int:
+        """
+        Compute the height of the tree, which is the number of nodes on its longest path.
+
+        Returns:
+            int: The height, 0 for an empty Treap.
+        """
+        height = 0
+        stack = [(self.root, 1)]
+        while stack:
+            index, depth = stack.pop()
+            if index != NIL:
+                height = max(height, depth)
+                stack.append((self.lefts[index], depth + 1))
+                stack.append((self.rights[index], depth + 1))
+        return height
@@ -0,0 +1,290 @@
+from contextlib import AbstractContextManager
+from threading import RLock
+from typing import Any, Callable, cast
+
+from project.treap.treap import Node, PriorityMode, SetOperation, Treap
+
+
+class PersistentTreap(Treap):
+    """
+    A thread-safe Treap whose nodes are never modified once they are reachable from the root.
+
+    Every update copies the nodes on the paths it changes and publishes a new root with a single
+    assignment, sharing all other nodes with the previous version. Writers are serialized by a lock,
+    while readers do not lock at all: each read operation and each iterator works on the root it
+    has seen first, so it observes one consistent version even if writers run concurrently.
+    copy() and snapshot() take O(1) time and return an independent Treap sharing the nodes.
+
+    Attributes:
+        lock (RLock): Serializes the writers.
+    """
+
+    _shares_nodes = True
+
+    def __init__(
+        self,
+        aggregate: Callable[[Any, Any], Any] | None = None,
+        priorities: PriorityMode = "random",
+        seed: int | None = None,
+        key: Callable[[Any], Any] | None = None,
+    ) -> None:
+        """
+        Initialize an empty Treap.
+
+        Args:
+            aggregate (Callable | None): An associative function of two values maintained over subtrees.
+            priorities (PriorityMode): "random" or "hash" priorities, as in Treap.
+            seed (int | None): The seed of the priorities.
+            key (Callable | None): The function mapping keys to the values they are ordered by.
+        """
+
+        super().__init__(aggregate, priorities, seed, key)
+        self.lock = RLock()
+
+    def _clone(self, node: Node) -> Node:
+        """
+        Copy a single node, sharing its children.
+
+        Args:
+            node (Node): The node to copy.
+
+        Returns:
+            Node: A new node with the same fields.
+        """
+        clone = Node(node.key, node.value, node.priority, node.sort_key)
+        clone.left, clone.right = node.left, node.right
+        clone.size, clone.aggregate = node.size, node.aggregate
+        return clone
+
+    def _replace_path(
+        self, path: list[Node], sort_key: Any, subtree: Node | None
+    ) -> None:
+        """
+        Publish a new root where the subtree below the path is replaced.
+
+        Args:
+            path (list[Node]): The nodes from the root down to the parent of the replaced subtree.
+            sort_key (Any): A sort key of the replaced subtree, used to choose the side at every node.
+            subtree (Node | None): The new subtree.
+        """
+        for node in reversed(path):
+            node = self._clone(node)
+            if sort_key < node.sort_key:
+                node.left = subtree
+            else:
+                node.right = subtree
+            self._pull(node)
+            subtree = node
+        self.root = subtree
+
+    def _insert(self, key: Any, value: Any) -> bool:
+        """
+        Insert a key or replace its value by copying the path to it.
+
+        A new node is placed below the last node on the search path with a greater priority,
+        and the subtree it replaces is split at its key.
+
+        Args:
+            key (Any): The key of the node to insert.
+            value (Any): The value of the node to insert.
+
+        Returns:
+            bool: True if a node was added, False if the value of an existing key was replaced.
+        """
+        sort_key = key if self.key is None else self.key(key)
+        path: list[Node] = []
+        node = self.root
+        while node is not None and node.sort_key != sort_key:
+            path.append(node)
+            node = node.left if sort_key < node.sort_key else node.right
+        if node is not None:
+            node = self._clone(node)
+            node.value = value
+            self._pull(node)
+            self._replace_path(path, sort_key, node)
+            return False
+
+        priority = self._priority(key)
+        path = []
+        node = self.root
+        while node is not None and node.priority >= priority:
+            path.append(node)
+            node = node.left if sort_key < node.sort_key else node.right
+        new_node = Node(key, value, priority, sort_key)
+        new_node.left, _, new_node.right = self._split(node, sort_key)
+        self._pull(new_node)
+        self._replace_path(path, sort_key, new_node)
+        return True
+
+    def _delete(self, key: Any) -> bool:
+        """
+        Delete a key by replacing its node with the merge of its children and copying the path.
+
+        Args:
+            key (Any): The key of the node to delete.
+
+        Returns:
+            bool: True if a node was deleted, False if the key was not found.
+        """
+        sort_key = key if self.key is None else self.key(key)
+        path: list[Node] = []
+        node = self.root
+        while node is not None and node.sort_key != sort_key:
+            path.append(node)
+            node = node.left if sort_key < node.sort_key else node.right
+        if node is None:
+            return False
+        self._replace_path(path, sort_key, self._merge(node.left, node.right))
+        return True
+
+    def _split(
+        self, node: Node | None, sort_key: Any
+    ) -> tuple[Node | None, Node | None, Node | None]:
+        """
+        Split a subtree as Treap._split does, copying the nodes on the search path of sort_key
+        instead of modifying them.
+        """
+        left_holder = Node(None, None, 0)
+        right_holder = Node(None, None, 0)
+        left_tail, right_tail = left_holder, right_holder
+        changed: list[Node] = []
+        middle = None
+        while node is not None:
+            node = self._clone(node)
+            changed.append(node)
+            if node.sort_key < sort_key:
+                left_tail.right = node
+                left_tail, node = node, node.right
+            elif node.sort_key > sort_key:
+                right_tail.left = node
+                right_tail, node = node, node.left
+            else:
+                middle = node
+                left_tail.right, right_tail.left = middle.left, middle.right
+                middle.left = middle.right = None
+                break
+        else:
+            left_tail.right = right_tail.left = None
+        for node in reversed(changed):
+            self._pull(node)
+        return left_holder.right, middle, right_holder.left
+
+    def _merge(self, left: Node | None, right: Node | None) -> Node | None:
+        """
+        Merge two subtrees as Treap._merge does, copying the nodes on the merged spines
+        instead of modifying them.
+        """
+        holder = Node(None, None, 0)
+        parent, on_left = holder, False
+        changed: list[Node] = []
+        while left is not None and right is not None:
+            from_left = left.priority >= right.priority
+            child = self._clone(left if from_left else right)
+            changed.append(child)
+            if on_left:
+                parent.left = child
+            else:
+                parent.right = child
+            if from_left:
+                parent, on_left, left = child, False, child.right
+            else:
+                parent, on_left, right = child, True, child.left
+        rest = left if left is not None else right
+        if on_left:
+            parent.left = rest
+        else:
+            parent.right = rest
+        for node in reversed(changed):
+            self._pull(node)
+        return holder.right
+
+    def _copy(self, node: Node | None) -> Node | None:
+        """
+        Return the subtree itself, as published nodes are never modified and can be shared.
+        """
+        return node
+
+    def _combine(
+        self, a: Node | None, b: Node | None, operation: SetOperation
+    ) -> tuple[Node | None, int]:
+        """
+        Combine private copies of both subtrees, since Treap._combine reuses their nodes.
+        """
+        return super()._combine(Treap._copy(self, a), Treap._copy(self, b), operation)
+
+    def _writing(self) -> AbstractContextManager[Any]:
+        """
+        Return the writer lock, so another Treap takes the nodes of a single version.
+        """
+        return self.lock
+
+    def snapshot(self) -> "PersistentTreap":
+        """
+        Take a consistent read-only view of the current version in O(1) time.
+        Later updates of either Treap do not affect the other.
+
+        Returns:
+            PersistentTreap: A Treap sharing the nodes of this one.
+        """
+        with self.lock:
+            return cast(PersistentTreap, self.copy())
+
+    def __len__(self) -> int:
+        """
+        Get the number of nodes in the version published last.
+
+        Returns:
+            int: The number of nodes in the Treap.
+        """
+        root = self.root
+        return root.size if root is not None else 0
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        """
+        Insert or update a key under the writer lock.
+        """
+        with self.lock:
+            super().__setitem__(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        """
+        Delete a key under the writer lock.
+        """
+        with self.lock:
+            super().__delitem__(key)
+
+    def update(self, other: Any = (), /, **kwargs: Any) -> None:
+        """
+        Insert the pairs of a mapping under the writer lock, publishing the result at once
+        if other is a Treap.
+        """
+        with self.lock:
+            super().update(other, **kwargs)
+
+    def intersection_update(self, other: Treap) -> None:
+        """
+        Keep only the keys present in other under the writer lock.
+        """
+        with self.lock:
+            super().intersection_update(other)
+
+    def difference_update(self, other: Treap) -> None:
+        """
+        Remove the keys present in other under the writer lock.
+        """
+        with self.lock:
+            super().difference_update(other)
+
+    def split(self, key: Any) -> Treap:
+        """
+        Move the keys greater than or equal to key into a new Treap under the writer lock.
+        """
+        with self.lock:
+            return super().split(key)
+
+    def merge(self, other: Treap) -> None:
+        """
+        Move all keys of other into this Treap under the writer lock.
+        """
+        with self.lock:
+            super().merge(other)
@@ -0,0 +1,313 @@
+import mmap
+import pickle
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Any, BinaryIO, Generator, Type
+
+from project.treap.treap import Treap
+
+# The file starts with the magic bytes, the format version and the number of keys.
+MAGIC = b"TRP\x00"
+VERSION = 1
+HEADER = struct.Struct("<4sIQ")
+
+
+def _layout(count: int) -> tuple[int, int, int, int]:
+    """
+    Compute the offsets of the sections of a file holding count keys.
+
+    The header is followed by the keys and the priorities as signed 64-bit integers,
+    by count + 1 offsets of the values as unsigned 64-bit integers, and by the pickled values.
+    All sections are in the native byte order and aligned to 8 bytes.
+
+    Returns:
+        tuple[int, int, int, int]: The offsets of the keys, the priorities, the value offsets
+                                   and the values.
+    """
+    keys = HEADER.size
+    priorities = keys + 8 * count
+    offsets = priorities + 8 * count
+    values = offsets + 8 * (count + 1)
+    return keys, priorities, offsets, values
+
+
+def _read_header(buffer: bytes | mmap.mmap) -> int:
+    """
+    Check the header of a dump and return the number of keys.
+
+    Raises:
+        ValueError: If the data is not a dump of a supported version.
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError("Not a Treap dump: the file is too short.")
+    magic, version, count = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Not a Treap dump: wrong magic bytes.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported Treap dump version: {version}.")
+    return count
+
+
+def _check_size(buffer: bytes | mmap.mmap, count: int) -> None:
+    """
+    Check that a dump holding count keys has exactly the size given by its sections.
+
+    Raises:
+        ValueError: If the data is truncated or has trailing bytes.
+    """
+    values_at = _layout(count)[3]
+    if len(buffer) < values_at:
+        raise ValueError("Not a Treap dump: the file is truncated.")
+    (end,) = struct.unpack_from("Q", buffer, values_at - 8)
+    if len(buffer) != values_at + end:
+        raise ValueError("Not a Treap dump: the file is truncated.")
+
+
+def dump(treap: Treap, file: BinaryIO) -> None:
+    """
+    Write the keys, the priorities and the values of a Treap to a binary file in in-order layout.
+
+    Keys and priorities are stored as arrays of 64-bit integers, so they are read back without
+    parsing, and every value is pickled separately, so it can be decoded on demand. Hence only
+    Treaps with integer keys and no key function can be dumped; nothing is written otherwise.
+
+    Args:
+        treap (Treap): The Treap to write.
+        file (BinaryIO): A file opened for writing in binary mode.
+
+    Raises:
+        ValueError: If the Treap orders its keys by a key function.
+        TypeError: If a key is not an integer.
+        OverflowError: If a key does not fit into a signed 64-bit integer.
+    """
+    if treap.key is not None:
+        raise ValueError("Only Treaps without a key function can be dumped.")
+    keys, priorities = array("q"), array("q")
+    offsets = array("Q", [0])
+    values = []
+    end = 0
+    for node in treap._nodes(treap.root):
+        if not isinstance(node.key, int):
+            raise TypeError(
+                f"Only integer keys can be dumped, got {type(node.key).__name__}."
+            )
+        keys.append(node.key)
+        priorities.append(node.priority)
+        value = pickle.dumps(node.value, pickle.HIGHEST_PROTOCOL)
+        values.append(value)
+        end += len(value)
+        offsets.append(end)
+
+    file.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+    file.write(keys.tobytes())
+    file.write(priorities.tobytes())
+    file.write(offsets.tobytes())
+    file.writelines(values)
+
+
+def load(file: BinaryIO, cls: Type[Treap] = Treap, **options: Any) -> Treap:
+    """
+    Read a Treap written by dump in O(n) time.
+
+    The sorted keys are built into a tree with their stored priorities, so the loaded Treap has
+    the same shape as the dumped one and no key is inserted one by one.
+
+    Args:
+        file (BinaryIO): A file opened for reading in binary mode.
+        cls (Type[Treap]): The class of the loaded Treap.
+        **options: The arguments of the class, such as aggregate, priorities or seed.
+
+    Returns:
+        Treap: The loaded Treap.
+
+    Raises:
+        ValueError: If the data is not a Treap dump.
+    """
+    data = file.read()
+    count = _read_header(data)
+    _check_size(data, count)
+    keys_at, priorities_at, offsets_at, values_at = _layout(count)
+
+    keys, priorities, offsets = array("q"), array("q"), array("Q")
+    keys.frombytes(data[keys_at:priorities_at])
+    priorities.frombytes(data[priorities_at:offsets_at])
+    offsets.frombytes(data[offsets_at:values_at])
+
+    view = memoryview(data)
+    values = (
+        pickle.loads(view[values_at + offsets[i] : values_at + offsets[i + 1]])
+        for i in range(count)
+    )
+    treap = cls(**options)
+    treap._build(zip(keys, values, priorities))
+    return treap
+
+
+class MappedTreap(Mapping):
+    """
+    A read-only mapping over a Treap dump that is memory-mapped instead of loaded.
+
+    Opening takes O(1) time and memory regardless of the size of the dump. The keys are stored
+    in ascending order, so a lookup is a binary search over the mapped key array, and a value is
+    unpickled only when it is accessed. Pages are read by the operating system on demand and
+    shared between processes mapping the same file.
+
+    Attributes:
+        file (BinaryIO): The open dump.
+        mmap (mmap.mmap): The read-only mapping of the file.
+        key_array (memoryview): The keys in ascending order.
+        priorities (memoryview): The priorities of the keys.
+        offsets (memoryview): The offsets of the pickled values relative to values_at.
+        values_at (int): The offset of the values section in the file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Map a dump into memory.
+
+        Args:
+            path (str): The path of a file written by dump.
+
+        Raises:
+            ValueError: If the file is not a Treap dump.
+        """
+        self.file = open(path, "rb")
+        try:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be mapped.
+            self.file.close()
+            raise ValueError("Not a Treap dump: the file is empty.")
+
+        try:
+            count = _read_header(self.mmap)
+            _check_size(self.mmap, count)
+        except ValueError:
+            self.mmap.close()
+            self.file.close()
+            raise
+        keys_at, priorities_at, offsets_at, self.values_at = _layout(count)
+        view = memoryview(self.mmap)
+        self.key_array = view[keys_at:priorities_at].cast("q")
+        self.priorities = view[priorities_at:offsets_at].cast("q")
+        self.offsets = view[offsets_at : self.values_at].cast("Q")
+        view.release()
+
+    def _value(self, index: int) -> Any:
+        """
+        Unpickle the value at the given position.
+        """
+        start = self.values_at + self.offsets[index]
+        stop = self.values_at + self.offsets[index + 1]
+        return pickle.loads(self.mmap[start:stop])
+
+    def __getitem__(self, key: int) -> Any:
+        """
+        Retrieve the value associated with the given key in O(log n) time.
+
+        Args:
+            key (int): The key to retrieve.
+
+        Returns:
+            Any: The unpickled value.
+
+        Raises:
+            KeyError: If the key is not found.
+        """
+        index = bisect_left(self.key_array, key)
+        if index == len(self.key_array) or self.key_array[index] != key:
+            raise KeyError(f"Key {key} not found.")
+        return self._value(index)
+
+    def __contains__(self, key: Any) -> bool:
+        """
+        Check if a key exists without unpickling its value.
+        """
+        index = bisect_left(self.key_array, key)
+        return index < len(self.key_array) and self.key_array[index] == key
+
+    def __iter__(self) -> Generator[int, None, None]:
+        """
+        Iterate over the keys in ascending order.
+        """
+        yield from self.key_array
+
+    def __reversed__(self) -> Generator[int, None, None]:
+        """
+        Iterate over the keys in descending order.
+        """
+        yield from reversed(self.key_array)
+
+    def __len__(self) -> int:
+        """
+        Get the number of keys.
+        """
+        return len(self.key_array)
+
+    def rank(self, key: int) -> int:
+        """
+        Count the keys less than the given key.
+        """
+        return bisect_left(self.key_array, key)
+
+    def select(self, index: int) -> int:
+        """
+        Find the key at the given position in ascending order.
+
+        Raises:
+            IndexError: If the position is out of range.
+        """
+        return self.key_array[index]
+
+    def range(
+        self, low: int | None = None, high: int | None = None
+    ) -> Generator[int, None, None]:
+        """
+        Iterate over the keys in the range [low, high) in ascending order.
+        """
+        start = 0 if low is None else bisect_left(self.key_array, low)
+        stop = (
+            len(self.key_array) if high is None else bisect_left(self.key_array, high)
+        )
+        yield from self.key_array[start:stop]
+
+    def to_treap(self, cls: Type[Treap] = Treap, **options: Any) -> Treap:
+        """
+        Load the whole dump into a Treap in O(n) time.
+
+        Args:
+            cls (Type[Treap]): The class of the loaded Treap.
+            **options: The arguments of the class.
+
+        Returns:
+            Treap: A Treap with the same shape as the dumped one.
+        """
+        treap = cls(**options)
+        treap._build(
+            zip(self.key_array, map(self._value, range(len(self))), self.priorities)
+        )
+        return treap
+
+    def close(self) -> None:
+        """
+        Release the views and unmap the file.
+        """
+        self.key_array.release()
+        self.priorities.release()
+        self.offsets.release()
+        self.mmap.close()
+        self.file.close()
+
+    def __enter__(self) -> "MappedTreap":
+        """
+        Returns the mapping itself to be used in a with statement.
+        """
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        """
+        Closes the mapping on exit from the with statement.
+        """
+        self.close()
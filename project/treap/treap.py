@@ -1,36 +1,123 @@
+from bisect import bisect_left
 from collections.abc import MutableMapping
-from typing import Any, Generator
+from contextlib import AbstractContextManager, nullcontext
+from functools import partial
+from typing import Any, Callable, Generator, Iterable, Literal
 import random
 
+SetOperation = Literal["union", "intersection", "difference"]
+PriorityMode = Literal["random", "hash"]
+
+# Priorities are 63-bit, so they fit into signed 64-bit arrays and ties are practically impossible.
+PRIORITY_BITS = 63
+MASK64 = (1 << 64) - 1
+# Marks an omitted argument where None is a valid value.
+MISSING: Any = object()
+
+
+def random_priority() -> int:
+    """
+    Draw a random priority for a new node from the module-level generator.
+
+    Returns:
+        int: The priority.
+    """
+    return random.getrandbits(PRIORITY_BITS)
+
+
+def hash_priority(key: Any, seed: int = 0) -> int:
+    """
+    Derive a priority from the hash of a key with the SplitMix64 finalizer.
+
+    The same key always gets the same priority, so the shape of the Treap depends only on
+    the set of keys and not on the order of operations. Hashes of strings are salted per
+    process unless PYTHONHASHSEED is set.
+
+    Args:
+        key (Any): The key.
+        seed (int): Changes the priorities of all keys.
+
+    Returns:
+        int: The priority.
+    """
+    x = (hash(key) + seed * 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return (x ^ (x >> 31)) >> (64 - PRIORITY_BITS)
+
+
+def priority_source(
+    priorities: PriorityMode = "random", seed: int | None = None
+) -> Callable[[Any], int]:
+    """
+    Create the function assigning priorities to new keys.
+
+    Args:
+        priorities (PriorityMode): "random" draws priorities from a generator seeded with seed,
+                                   "hash" derives them from the keys.
+        seed (int | None): The seed. Random priorities are seeded from the system if None.
+
+    Returns:
+        Callable[[Any], int]: A function of a key returning its priority.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    if priorities == "hash":
+        return partial(hash_priority, seed=seed or 0)
+    if priorities == "random":
+        getrandbits = random.Random(seed).getrandbits
+        return lambda key: getrandbits(PRIORITY_BITS)
+    raise ValueError(f"Unknown priority mode: {priorities}")
+
 
 class Node:
     """
     A node in the Treap, which holds a key, a value, and a priority.
 
     Attributes:
-        key (int): The key used for comparison in the Treap.
+        key (Any): The key of the mapping.
+        sort_key (Any): The key used for comparison in the Treap, cached from the key function.
         value (Any): The value associated with the key.
         priority (int): The priority of the node, used to maintain the heap property.
         left (Node | None): The left child of the node.
         right (Node | None): The right child of the node.
+        size (int): The number of nodes in the subtree rooted at the node.
+        aggregate (Any): The values of the subtree folded by the aggregate function of the Treap.
     """
 
-    def __init__(self, key: int, value: Any, priority: int | None = None) -> None:
+    # Without an instance dictionary a node takes about half the memory.
+    __slots__ = (
+        "key",
+        "sort_key",
+        "value",
+        "priority",
+        "left",
+        "right",
+        "size",
+        "aggregate",
+    )
+
+    def __init__(
+        self, key: Any, value: Any, priority: int | None = None, sort_key: Any = MISSING
+    ) -> None:
         """
         Initialize a new node with a given key, value, and priority.
 
         Args:
-            key (int): The key of the node.
+            key (Any): The key of the node.
             value (Any): The value associated with the key.
             priority (int | None): The priority of the node. If not provided, a random priority is assigned.
+            sort_key (Any): The key used for comparison. The key itself if not provided.
         """
-        self.key: int = key
+        self.key: Any = key
+        self.sort_key: Any = key if sort_key is MISSING else sort_key
         self.value: Any = value
-        self.priority: int = (
-            priority if priority is not None else random.randint(0, 100)
-        )
+        self.priority: int = priority if priority is not None else random_priority()
         self.left: Node | None = None
         self.right: Node | None = None
+        self.size: int = 1
+        self.aggregate: Any = value
 
 
 class Treap(MutableMapping):
@@ -39,10 +126,21 @@ class Treap(MutableMapping):
     and a Max Heap. The Treap maintains the Binary Search Tree property based on the keys,
     and a Max Heap property based on the priorities.
 
-    This class provides efficient insertions, deletions, and lookups.
+    This class provides efficient insertions, deletions, and lookups. Keys may be of any type
+    with a total order, such as numbers, strings or tuples. An optional key function maps keys to
+    the values they are ordered by, as in sorted(); its result is cached on every node, so it is
+    called once per key instead of once per comparison.
+
+    Every node keeps the size of its subtree and, if an aggregate function is given, the fold of
+    the values of its subtree, which answer order-statistics and range queries in O(log n)
+    expected time.
 
     Attributes:
         root (Node | None): The root node of the Treap, or None if the Treap is empty.
+        aggregate (Callable | None): An associative function of two values folded over subtrees.
+        key (Callable | None): The function mapping keys to the values they are ordered by.
+        priorities (PriorityMode): How priorities of new keys are chosen.
+        seed (int | None): The seed of the priorities.
         __size (int): The number of elements in the Treap.
 
     Methods:
@@ -50,19 +148,99 @@ class Treap(MutableMapping):
         __setitem__(key, value): Inserts the given key-value pair into the Treap.
         __delitem__(key): Deletes the key-value pair associated with the given key.
         __contains__(key): Checks whether the key is present in the Treap.
+        get_many(keys): Retrieves the values of many keys in a single walk over the tree.
         __iter__(): Iterates over the keys of the Treap in ascending order.
         __reversed__(): Iterates over the keys of the Treap in descending order.
         __len__(): Returns the number of elements in the Treap.
+        from_sorted(items): Builds a Treap from key-value pairs sorted by key in O(n).
+        split(key): Moves the keys greater than or equal to key into a new Treap.
+        merge(other): Moves all keys of a Treap with greater keys into this one.
+        update(other): Inserts the key-value pairs of a mapping, merging another Treap in bulk.
+        union(other), intersection(other), difference(other): Set operations on the keys.
+        rank(key), select(index): Converts between keys and their positions.
+        floor(key), ceiling(key): Finds the nearest keys.
+        range(low, high), count(low, high), range_aggregate(low, high): Queries key ranges.
+        height(), check_invariants(): Reports the shape of the tree for monitoring.
     """
 
-    def __init__(self) -> None:
+    # Whether the nodes may be shared with other Treaps, so they must not be relinked in place.
+    _shares_nodes = False
+
+    def __init__(
+        self,
+        aggregate: Callable[[Any, Any], Any] | None = None,
+        priorities: PriorityMode = "random",
+        seed: int | None = None,
+        key: Callable[[Any], Any] | None = None,
+    ) -> None:
         """
         Initialize an empty Treap.
+
+        Args:
+            aggregate (Callable | None): An associative function of two values, such as operator.add
+                                         or max, maintained over subtrees for range_aggregate.
+            priorities (PriorityMode): "random" for priorities from a seedable generator, or "hash"
+                                       for priorities derived from the keys.
+            seed (int | None): The seed of the priorities, which makes the shape reproducible.
+            key (Callable | None): A function of a key returning the value it is ordered by.
+                                   Keys are compared directly if None, which is the fast path
+                                   for ints and strings.
         """
 
         self.root: Node | None = None
+        self.aggregate = aggregate
+        self.key = key
+        self.priorities = priorities
+        self.seed = seed
+        self._priority = priority_source(priorities, seed)
         self.__size: int = 0
 
+    def _empty(self) -> "Treap":
+        """
+        Create an empty Treap with the same aggregate function and source of priorities.
+
+        Returns:
+            Treap: A new Treap.
+        """
+        treap = type(self)(self.aggregate, self.priorities, self.seed, self.key)
+        treap._priority = self._priority
+        return treap
+
+    def _sort_key(self, key: Any) -> Any:
+        """
+        Map a key to the value it is ordered by.
+
+        Args:
+            key (Any): The key.
+
+        Returns:
+            Any: The result of the key function, or the key itself without one.
+        """
+        return key if self.key is None else self.key(key)
+
+    def _pull(self, node: Node) -> None:
+        """
+        Recompute the size and the aggregate of a node from its children.
+
+        Args:
+            node (Node): The node whose children have changed.
+        """
+        left, right = node.left, node.right
+        size = 1
+        if left is not None:
+            size += left.size
+        if right is not None:
+            size += right.size
+        node.size = size
+
+        if self.aggregate is not None:
+            value = node.value
+            if left is not None:
+                value = self.aggregate(left.aggregate, value)
+            if right is not None:
+                value = self.aggregate(value, right.aggregate)
+            node.aggregate = value
+
     def _rotate_right(self, node: Node) -> Node:
         """
         Perform a right rotation on the given node to maintain heap property.
@@ -78,6 +256,8 @@ class Treap(MutableMapping):
         new_root = node.left
         node.left = new_root.right
         new_root.right = node
+        self._pull(node)
+        self._pull(new_root)
         return new_root
 
     def _rotate_left(self, node: Node) -> Node:
@@ -95,42 +275,77 @@ class Treap(MutableMapping):
         new_root = node.right
         node.right = new_root.left
         new_root.left = node
+        self._pull(node)
+        self._pull(new_root)
         return new_root
 
-    def _insert(self, root: Node | None, key: int, value: Any) -> Node:
+    def _attach(self, parent: Node | None, sort_key: Any, child: Node | None) -> None:
+        """
+        Make the given node the child of parent on the side where sort_key belongs.
+
+        Args:
+            parent (Node | None): The parent node, or None to replace the root.
+            sort_key (Any): A sort key of the subtree of the child, used to choose the side.
+            child (Node | None): The new child.
+        """
+        if parent is None:
+            self.root = child
+        elif sort_key < parent.sort_key:
+            parent.left = child
+        else:
+            parent.right = child
+
+    def _insert(self, key: Any, value: Any) -> bool:
         """
         Insert a new node with the given key and value into the Treap.
 
+        The path from the root is kept on an explicit stack. The new node is attached as a leaf
+        and rotated up along the path while its priority exceeds the priority of its parent.
+
         Args:
-            root (Node | None): The root of the current subtree.
-            key (int): The key of the node to insert.
+            key (Any): The key of the node to insert.
             value (Any): The value of the node to insert.
 
         Returns:
-            Node: The root of the modified subtree after insertion.
+            bool: True if a node was added, False if the value of an existing key was replaced.
         """
-        if root is None:
-            return Node(key, value)
-
-        if key < root.key:
-            root.left = self._insert(root.left, key, value)
-            if root.left.priority > root.priority:
-                root = self._rotate_right(root)
-        elif key > root.key:
-            root.right = self._insert(root.right, key, value)
-            if root.right.priority > root.priority:
-                root = self._rotate_left(root)
-        else:
-            root.value = value
+        sort_key = key if self.key is None else self.key(key)
+        path: list[Node] = []
+        node = self.root
+        while node is not None:
+            if sort_key < node.sort_key:
+                path.append(node)
+                node = node.left
+            elif sort_key > node.sort_key:
+                path.append(node)
+                node = node.right
+            else:
+                node.value = value
+                if self.aggregate is not None:
+                    self._pull(node)
+                    for parent in reversed(path):
+                        self._pull(parent)
+                return False
 
-        return root
+        node = Node(key, value, self._priority(key), sort_key)
+        self._attach(path[-1] if path else None, sort_key, node)
+        while path and path[-1].priority < node.priority:
+            parent = path.pop()
+            if parent.left is node:
+                self._rotate_right(parent)
+            else:
+                self._rotate_left(parent)
+            self._attach(path[-1] if path else None, sort_key, node)
+        for parent in reversed(path):
+            self._pull(parent)
+        return True
 
-    def __getitem__(self, key: int) -> Any:
+    def __getitem__(self, key: Any) -> Any:
         """
         Retrieve the value associated with the given key from the Treap.
 
         Args:
-            key (int): The key of the node to retrieve.
+            key (Any): The key of the node to retrieve.
 
         Returns:
             Any: The value associated with the key.
@@ -138,84 +353,91 @@ class Treap(MutableMapping):
         Raises:
             KeyError: If the key is not found in the Treap.
         """
+        sort_key = key if self.key is None else self.key(key)
         node = self.root
         while node:
-            if key < node.key:
+            if sort_key < node.sort_key:
                 node = node.left
-            elif key > node.key:
+            elif sort_key > node.sort_key:
                 node = node.right
             else:
                 return node.value
         raise KeyError(f"Key {key} not found.")
 
-    def __setitem__(self, key: int, value: Any) -> None:
+    def __setitem__(self, key: Any, value: Any) -> None:
         """
         Insert a new key-value pair or update the value of an existing key in the Treap.
 
         Args:
-            key (int): The key of the node to insert or update.
+            key (Any): The key of the node to insert or update.
             value (Any): The value to associate with the key.
         """
-        self.root = self._insert(self.root, key, value)
-        self.__size += 1
+        if self._insert(key, value):
+            self.__size += 1
 
-    def __delitem__(self, key: int) -> None:
+    def __delitem__(self, key: Any) -> None:
         """
         Delete the node with the given key from the Treap.
 
         Args:
-            key (int): The key of the node to delete.
+            key (Any): The key of the node to delete.
 
         Raises:
             KeyError: If the key is not found in the Treap.
         """
-        self.root, deleted = self._delete(self.root, key)
-        if deleted:
+        if self._delete(key):
             self.__size -= 1
         else:
             raise KeyError(f"Key {key} not found.")
 
-    def _delete(self, root: Node | None, key: int) -> tuple[Node | None, bool]:
+    def _delete(self, key: Any) -> bool:
         """
         Delete a node with the given key from the Treap.
 
+        The node is rotated down towards the child with the higher priority until it has
+        at most one child, and then replaced by that child.
+
         Args:
-            root (Node | None): The root of the current subtree.
-            key (int): The key of the node to delete.
+            key (Any): The key of the node to delete.
 
         Returns:
-            tuple[Node | None, bool]: A tuple containing the new root of the modified subtree and a boolean indicating
-                                       whether a node was deleted.
+            bool: True if a node was deleted, False if the key was not found.
         """
-        if root is None:
-            return None, False
+        sort_key = key if self.key is None else self.key(key)
+        path: list[Node] = []
+        node = self.root
+        while node is not None:
+            if sort_key < node.sort_key:
+                path.append(node)
+                node = node.left
+            elif sort_key > node.sort_key:
+                path.append(node)
+                node = node.right
+            else:
+                break
+        if node is None:
+            return False
 
-        deleted = False
-        if key < root.key:
-            root.left, deleted = self._delete(root.left, key)
-        elif key > root.key:
-            root.right, deleted = self._delete(root.right, key)
-        else:
-            deleted = True
-            if root.left is None:
-                return root.right, deleted
-            elif root.right is None:
-                return root.left, deleted
-            elif root.left.priority < root.right.priority:
-                root = self._rotate_left(root)
-                root.left, _ = self._delete(root.left, key)
+        while node.left is not None and node.right is not None:
+            if node.left.priority < node.right.priority:
+                new_root = self._rotate_left(node)
             else:
-                root = self._rotate_right(root)
-                root.right, _ = self._delete(root.right, key)
+                new_root = self._rotate_right(node)
+            self._attach(path[-1] if path else None, sort_key, new_root)
+            path.append(new_root)
 
-        return root, deleted
+        child = node.left if node.left is not None else node.right
+        self._attach(path[-1] if path else None, sort_key, child)
+        for parent in reversed(path):
+            self._pull(parent)
+        return True
 
     def __contains__(self, key: Any) -> bool:
         """
         Check if a key exists in the Treap.
 
         Args:
-            key (int): The key to check.
+            key (Any): The key to check.
 
         Returns:
             bool: True if the key is in the Treap, False otherwise.
@@ -226,53 +448,135 @@ class Treap(MutableMapping):
         except KeyError:
             return False
 
-    def __iter__(self) -> Generator[int, None, None]:
+    def get_many(self, keys: Iterable[Any], default: Any = None) -> list[Any]:
+        """
+        Retrieve the values of many keys at once.
+
+        The keys are sorted and the tree is walked once, splitting the sorted keys at every node
+        and descending only into subtrees that some of them fall into. Shared upper parts of the
+        search paths are visited once instead of once per key, so a batch of m keys visits
+        O(m log(n/m + 1)) nodes in expectation instead of O(m log n).
+
+        Args:
+            keys (Iterable[Any]): The keys to retrieve, in any order and possibly repeated.
+            default (Any): The value returned for keys that are not found.
+
+        Returns:
+            list[Any]: The values of the keys in the order of keys.
+        """
+        keys = list(keys)
+        sort_keys = keys if self.key is None else [self.key(key) for key in keys]
+        order = sorted(range(len(keys)), key=sort_keys.__getitem__)
+        queries = [sort_keys[index] for index in order]
+        results = [default] * len(keys)
+
+        # Every entry is a subtree and the slice of the sorted queries that falls into it.
+        stack: list[tuple[Node, int, int]] = []
+        root = self.root
+        if root is not None and queries:
+            stack.append((root, 0, len(queries)))
+        while stack:
+            node, low, high = stack.pop()
+            if high - low == 1:
+                # A single query needs a plain search without splitting.
+                query = queries[low]
+                found: Node | None = node
+                while found is not None:
+                    if query < found.sort_key:
+                        found = found.left
+                    elif query > found.sort_key:
+                        found = found.right
+                    else:
+                        results[order[low]] = found.value
+                        break
+                continue
+            start = stop = bisect_left(queries, node.sort_key, low, high)
+            while stop < high and not node.sort_key < queries[stop]:
+                results[order[stop]] = node.value
+                stop += 1
+            if low < start and node.left is not None:
+                stack.append((node.left, low, start))
+            if stop < high and node.right is not None:
+                stack.append((node.right, stop, high))
+        return results
+
+    def __iter__(self) -> Generator[Any, None, None]:
         """
         Iterate over the keys of the Treap in ascending order.
 
         Returns:
-            Generator[int]: A generator yielding keys in ascending order.
+            Generator[Any]: A generator yielding keys in ascending order.
         """
-        yield from self._in_order(self.root)
+        return self._in_order(self.root)
 
-    def __reversed__(self) -> Generator[int, None, None]:
+    def __reversed__(self) -> Generator[Any, None, None]:
         """
         Iterate over the keys of the Treap in descending order.
 
         Returns:
-            Generator[int]: A generator yielding keys in descending order.
+            Generator[Any]: A generator yielding keys in descending order.
         """
-        yield from self._reverse_in_order(self.root)
+        return self._reverse_in_order(self.root)
 
-    def _in_order(self, node: Node | None) -> Generator[int, None, None]:
+    def _in_order(self, node: Node | None) -> Generator[Any, None, None]:
         """
         Helper method for in-order traversal of the Treap.
 
+        The left spine of the unvisited subtree is kept on an explicit stack,
+        so each key is yielded in O(1) amortized time.
+
         Args:
-            node (Node | None): The current node in the traversal.
+            node (Node | None): The root of the subtree to traverse.
 
         Returns:
-            Generator[int]: A generator yielding keys in ascending order.
+            Generator[Any]: A generator yielding keys in ascending order.
         """
-        if node is not None:
-            yield from self._in_order(node.left)
+        stack: list[Node] = []
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
             yield node.key
-            yield from self._in_order(node.right)
+            node = node.right
 
-    def _reverse_in_order(self, node: Node | None) -> Generator[int, None, None]:
+    def _nodes(self, node: Node | None) -> Generator[Node, None, None]:
+        """
+        Helper method iterating over the nodes of a subtree in ascending order of keys.
+
+        Args:
+            node (Node | None): The root of the subtree to traverse.
+
+        Returns:
+            Generator[Node]: A generator yielding nodes in ascending order of keys.
+        """
+        stack: list[Node] = []
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    def _reverse_in_order(self, node: Node | None) -> Generator[Any, None, None]:
         """
         Helper method for reverse in-order traversal of the Treap.
 
         Args:
-            node (Node | None): The current node in the traversal.
+            node (Node | None): The root of the subtree to traverse.
 
         Returns:
-            Generator[int]: A generator yielding keys in descending order.
+            Generator[Any]: A generator yielding keys in descending order.
         """
-        if node is not None:
-            yield from self._reverse_in_order(node.right)
+        stack: list[Node] = []
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
             yield node.key
-            yield from self._reverse_in_order(node.left)
+            node = node.left
 
     def __len__(self) -> int:
         """
@@ -282,3 +586,739 @@ class Treap(MutableMapping):
             int: The number of nodes in the Treap.
         """
         return self.__size
+
+    @classmethod
+    def from_sorted(
+        cls,
+        items: Iterable[tuple[Any, Any]],
+        aggregate: Callable[[Any, Any], Any] | None = None,
+        priorities: PriorityMode = "random",
+        seed: int | None = None,
+        key: Callable[[Any], Any] | None = None,
+    ) -> "Treap":
+        """
+        Build a Treap from key-value pairs sorted by key in O(n) time.
+
+        Args:
+            items (Iterable[tuple[Any, Any]]): Key-value pairs in strictly increasing order of keys.
+            aggregate (Callable | None): The aggregate function of the new Treap.
+            priorities (PriorityMode): How the priorities of the new Treap are chosen.
+            seed (int | None): The seed of the priorities.
+            key (Callable | None): The key function of the new Treap, by which items are sorted.
+
+        Returns:
+            Treap: A new Treap holding the pairs.
+
+        Raises:
+            ValueError: If the keys are not strictly increasing.
+        """
+        treap = cls(aggregate, priorities, seed, key)
+        priority = treap._priority
+        treap._build((item, value, priority(item)) for item, value in items)
+        return treap
+
+    def _build(self, entries: Iterable[tuple[Any, Any, int]]) -> None:
+        """
+        Replace the contents of the Treap by nodes built from sorted entries in O(n) time.
+
+        The right spine of the tree built so far is kept on a stack. Each new node becomes
+        the right child of the last spine node with a higher priority and adopts the popped
+        part of the spine as its left subtree.
+
+        Args:
+            entries (Iterable[tuple[Any, Any, int]]): Triples of a key, a value and a priority
+                                                      in strictly increasing order of keys.
+
+        Raises:
+            ValueError: If the keys are not strictly increasing.
+        """
+        spine: list[Node] = []
+        size = 0
+        key_function = self.key
+        for key, value, priority in entries:
+            sort_key = key if key_function is None else key_function(key)
+            if spine and not spine[-1].sort_key < sort_key:
+                raise ValueError("Keys must be sorted in strictly increasing order.")
+            node = Node(key, value, priority, sort_key)
+            last = None
+            while spine and spine[-1].priority < priority:
+                last = spine.pop()
+                self._pull(last)
+            node.left = last
+            if spine:
+                spine[-1].right = node
+            spine.append(node)
+            size += 1
+        for node in reversed(spine):
+            self._pull(node)
+        self.root = spine[0] if spine else None
+        self.__size = size
+
+    def copy(self) -> "Treap":
+        """
+        Create a copy of the Treap with the same structure in O(n) time.
+
+        Returns:
+            Treap: A new Treap holding the same key-value pairs.
+        """
+        treap = self._empty()
+        treap.root = self._copy(self.root)
+        treap.__size = self.__size
+        return treap
+
+    def _copy(self, node: Node | None) -> Node | None:
+        """
+        Copy the subtree rooted at the given node, keeping the priorities. The aggregates are
+        recomputed with the aggregate function of this Treap.
+
+        Args:
+            node (Node | None): The root of the subtree to copy.
+
+        Returns:
+            Node | None: The root of the copy.
+        """
+        if node is None:
+            return None
+        root = Node(node.key, node.value, node.priority, node.sort_key)
+        copies = [root]
+        stack = [(node, root)]
+        while stack:
+            source, target = stack.pop()
+            if source.left is not None:
+                target.left = Node(
+                    source.left.key,
+                    source.left.value,
+                    source.left.priority,
+                    source.left.sort_key,
+                )
+                stack.append((source.left, target.left))
+                copies.append(target.left)
+            if source.right is not None:
+                target.right = Node(
+                    source.right.key,
+                    source.right.value,
+                    source.right.priority,
+                    source.right.sort_key,
+                )
+                stack.append((source.right, target.right))
+                copies.append(target.right)
+        # Every node is copied after its parent, so the reversed order pulls children first.
+        for copy in reversed(copies):
+            self._pull(copy)
+        return root
+
+    def _split(
+        self, node: Node | None, sort_key: Any
+    ) -> tuple[Node | None, Node | None, Node | None]:
+        """
+        Split a subtree into the keys less than sort_key, the node with sort_key and the greater keys.
+
+        The subtree is walked down once. Nodes with smaller keys are chained as right children
+        of the left result, nodes with greater keys as left children of the right result.
+
+        Args:
+            node (Node | None): The root of the subtree, which is destroyed.
+            sort_key (Any): The sort key to split at.
+
+        Returns:
+            tuple[Node | None, Node | None, Node | None]: The roots of the smaller and the greater
+                                                         keys, and the detached node with key or None.
+        """
+        left_holder = Node(None, None, 0)
+        right_holder = Node(None, None, 0)
+        left_tail, right_tail = left_holder, right_holder
+        # The nodes whose children change, from the top down.
+        changed: list[Node] = []
+        middle = None
+        while node is not None:
+            changed.append(node)
+            if node.sort_key < sort_key:
+                left_tail.right = node
+                left_tail, node = node, node.right
+            elif node.sort_key > sort_key:
+                right_tail.left = node
+                right_tail, node = node, node.left
+            else:
+                middle = node
+                left_tail.right, right_tail.left = middle.left, middle.right
+                middle.left = middle.right = None
+                break
+        else:
+            left_tail.right = right_tail.left = None
+        for node in reversed(changed):
+            self._pull(node)
+        return left_holder.right, middle, right_holder.left
+
+    def _merge(self, left: Node | None, right: Node | None) -> Node | None:
+        """
+        Merge two subtrees where every key of left is less than every key of right.
+
+        Args:
+            left (Node | None): The root of the subtree with the smaller keys.
+            right (Node | None): The root of the subtree with the greater keys.
+
+        Returns:
+            Node | None: The root of the merged subtree.
+        """
+        holder = Node(0, None, 0)
+        parent, on_left = holder, False
+        changed: list[Node] = []
+        while left is not None and right is not None:
+            child = left if left.priority >= right.priority else right
+            changed.append(child)
+            if on_left:
+                parent.left = child
+            else:
+                parent.right = child
+            if child is left:
+                parent, on_left, left = left, False, left.right
+            else:
+                parent, on_left, right = right, True, right.left
+        rest = left if left is not None else right
+        if on_left:
+            parent.left = rest
+        else:
+            parent.right = rest
+        for node in reversed(changed):
+            self._pull(node)
+        return holder.right
+
+    def _combine(
+        self, a: Node | None, b: Node | None, operation: SetOperation
+    ) -> tuple[Node | None, int]:
+        """
+        Combine two subtrees by a set operation on their keys.
+
+        The root with the higher priority is kept and the other subtree is split at its key,
+        then the left and the right parts are combined independently. For the difference,
+        the root is always taken from a. Pending combinations are kept on an explicit stack.
+        The expected time is O(m log(n/m + 1)) for subtrees of sizes m <= n.
+
+        Both subtrees are destroyed. Values of a win for common keys, except for the union,
+        where values of b win as in dict.update.
+
+        Args:
+            a (Node | None): The root of the first subtree.
+            b (Node | None): The root of the second subtree.
+            operation (SetOperation): "union", "intersection" or "difference".
+
+        Returns:
+            tuple[Node | None, int]: The root of the result and the number of common keys.
+        """
+        common = 0
+        results: list[Node | None] = []
+        # A frame either combines a pair of subtrees, or, if joining is set, attaches the last
+        # two results to root, or merges them if root is None.
+        stack: list[tuple[Node | None, Node | None, Node | None, bool]] = [
+            (a, b, None, False)
+        ]
+        while stack:
+            a, b, root, joining = stack.pop()
+            if joining:
+                right = results.pop()
+                left = results.pop()
+                if root is None:
+                    results.append(self._merge(left, right))
+                else:
+                    root.left, root.right = left, right
+                    self._pull(root)
+                    results.append(root)
+                continue
+
+            if a is None or b is None:
+                if operation == "union":
+                    results.append(a if a is not None else b)
+                else:
+                    results.append(None if operation == "intersection" else a)
+                continue
+
+            if operation != "difference" and b.priority > a.priority:
+                left, middle, right = self._split(a, b.sort_key)
+                root = b
+                if middle is not None:
+                    common += 1
+                    if operation == "intersection":
+                        b.value = middle.value
+                keep = operation == "union" or middle is not None
+                first, second = (left, b.left), (right, b.right)
+            else:
+                left, middle, right = self._split(b, a.sort_key)
+                root = a
+                if middle is not None:
+                    common += 1
+                    if operation == "union":
+                        a.value = middle.value
+                keep = operation == "union" or (middle is not None) == (
+                    operation == "intersection"
+                )
+                first, second = (a.left, left), (a.right, right)
+
+            stack.append((None, None, root if keep else None, True))
+            stack.append((*second, None, False))
+            stack.append((*first, None, False))
+        return results[0], common
+
+    def split(self, key: Any) -> "Treap":
+        """
+        Move the keys greater than or equal to the given key into a new Treap.
+
+        Args:
+            key (Any): The key to split at.
+
+        Returns:
+            Treap: A new Treap holding the moved keys. This Treap keeps the smaller keys.
+        """
+        left, middle, right = self._split(self.root, self._sort_key(key))
+        treap = self._empty()
+        treap.root = self._merge(middle, right)
+        treap.__size = treap.root.size if treap.root is not None else 0
+        self.root = left
+        self.__size -= treap.__size
+        return treap
+
+    def _check_key_function(self, other: "Treap") -> None:
+        """
+        Check that another Treap orders its keys in the same way, so their trees can be combined.
+
+        Raises:
+            ValueError: If the key functions differ.
+        """
+        if other.key is not self.key:
+            raise ValueError("Combined Treaps must have the same key function.")
+
+    def merge(self, other: "Treap") -> None:
+        """
+        Move all keys of another Treap into this one. Every key of other has to be greater than
+        every key of this Treap. The other Treap is left empty.
+
+        Args:
+            other (Treap): The Treap with the greater keys.
+
+        Raises:
+            ValueError: If the key ranges overlap or the aggregate or key functions differ.
+        """
+        if other.aggregate is not self.aggregate:
+            raise ValueError("Merged Treaps must have the same aggregate function.")
+        self._check_key_function(other)
+        with other._writing():
+            other_root = other.root
+            if self.root is not None and other_root is not None:
+                last, first = self.root, other_root
+                while last.right is not None:
+                    last = last.right
+                while first.left is not None:
+                    first = first.left
+                if not last.sort_key < first.sort_key:
+                    raise ValueError(
+                        "Keys of the merged Treap must be greater than existing keys."
+                    )
+            if other._shares_nodes and not self._shares_nodes:
+                # The nodes of other may be shared with its snapshots, which must not see
+                # the links changed by this Treap.
+                other_root = Treap._copy(self, other_root)
+            self.root = self._merge(self.root, other_root)
+            self.__size += len(other)
+            other.root, other.__size = None, 0
+
+    def _writing(self) -> AbstractContextManager[Any]:
+        """
+        Return the context in which the Treap is modified by another Treap. Plain Treaps
+        are not thread-safe and need no lock.
+        """
+        return nullcontext()
+
+    def update(self, other: Any = (), /, **kwargs: Any) -> None:
+        """
+        Insert the key-value pairs of a mapping or an iterable of pairs.
+
+        Another Treap with the same key function is merged in O(m log(n/m + 1)) expected time
+        by a union of the trees, plus copying it, instead of inserting its keys one by one.
+
+        Args:
+            other (Mapping | Iterable[tuple[Any, Any]]): The pairs to insert.
+            **kwargs: More pairs to insert.
+        """
+        if isinstance(other, Treap) and other.key is self.key and not kwargs:
+            # The root is read once, so the nodes and their count come from one version
+            # even if other is a PersistentTreap changed by another thread.
+            root = other.root
+            size = root.size if root is not None else 0
+            self.root, common = self._combine(self.root, self._copy(root), "union")
+            self.__size += size - common
+        else:
+            super().update(other, **kwargs)
+
+    def intersection_update(self, other: "Treap") -> None:
+        """
+        Keep only the keys that are also present in another Treap.
+
+        Args:
+            other (Treap): The other Treap, which is not modified.
+
+        Raises:
+            ValueError: If the key functions differ.
+        """
+        self._check_key_function(other)
+        self.root, self.__size = self._combine(
+            self.root, self._copy(other.root), "intersection"
+        )
+
+    def difference_update(self, other: "Treap") -> None:
+        """
+        Remove the keys that are present in another Treap.
+
+        Args:
+            other (Treap): The other Treap, which is not modified.
+
+        Raises:
+            ValueError: If the key functions differ.
+        """
+        self._check_key_function(other)
+        self.root, common = self._combine(
+            self.root, self._copy(other.root), "difference"
+        )
+        self.__size -= common
+
+    def union(self, other: "Treap") -> "Treap":
+        """
+        Create a Treap with the keys of both Treaps. Values of other win for common keys.
+
+        Args:
+            other (Treap): The other Treap.
+
+        Returns:
+            Treap: A new Treap.
+        """
+        treap = self.copy()
+        treap.update(other)
+        return treap
+
+    def intersection(self, other: "Treap") -> "Treap":
+        """
+        Create a Treap with the keys present in both Treaps and the values of this one.
+
+        Args:
+            other (Treap): The other Treap.
+
+        Returns:
+            Treap: A new Treap.
+        """
+        treap = self.copy()
+        treap.intersection_update(other)
+        return treap
+
+    def difference(self, other: "Treap") -> "Treap":
+        """
+        Create a Treap with the keys of this Treap that are not present in the other one.
+
+        Args:
+            other (Treap): The other Treap.
+
+        Returns:
+            Treap: A new Treap.
+        """
+        treap = self.copy()
+        treap.difference_update(other)
+        return treap
+
+    def rank(self, key: Any) -> int:
+        """
+        Count the keys less than the given key.
+
+        Args:
+            key (Any): The key, which does not have to be present.
+
+        Returns:
+            int: The number of smaller keys, which is the index of key if it is present.
+        """
+        return self._rank(self.root, self._sort_key(key))
+
+    def _rank(self, node: Node | None, sort_key: Any) -> int:
+        """
+        Count the nodes of a subtree with sort keys less than the given one.
+
+        Args:
+            node (Node | None): The root of the subtree.
+            sort_key (Any): The sort key to compare with.
+
+        Returns:
+            int: The number of nodes with smaller sort keys.
+        """
+        rank = 0
+        while node is not None:
+            if sort_key <= node.sort_key:
+                node = node.left
+            else:
+                rank += 1 + (node.left.size if node.left is not None else 0)
+                node = node.right
+        return rank
+
+    def select(self, index: int) -> Any:
+        """
+        Find the key at the given position in ascending order.
+
+        Args:
+            index (int): The position of the key. Negative positions count from the end.
+
+        Returns:
+            Any: The stored key at the position.
+
+        Raises:
+            IndexError: If the position is out of range.
+        """
+        node = self.root
+        size = node.size if node is not None else 0
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError(f"Index {index} out of range.")
+
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            if index < left_size:
+                node = node.left
+            elif index > left_size:
+                index -= left_size + 1
+                node = node.right
+            else:
+                return node.key
+        raise IndexError(f"Index {index} out of range.")
+
+    def floor(self, key: Any) -> Any:
+        """
+        Find the greatest key less than or equal to the given key.
+
+        Args:
+            key (Any): The key to search for.
+
+        Returns:
+            Any: The nearest stored key from below, never None for a missing one.
+
+        Raises:
+            KeyError: If every key is greater than the given key.
+        """
+        sort_key = self._sort_key(key)
+        found = None
+        node = self.root
+        while node is not None:
+            if sort_key < node.sort_key:
+                node = node.left
+            else:
+                found = node
+                node = node.right
+        if found is None:
+            raise KeyError(f"No key less than or equal to {key}.")
+        return found.key
+
+    def ceiling(self, key: Any) -> Any:
+        """
+        Find the least key greater than or equal to the given key.
+
+        Args:
+            key (Any): The key to search for.
+
+        Returns:
+            Any: The nearest stored key from above, never None for a missing one.
+
+        Raises:
+            KeyError: If every key is less than the given key.
+        """
+        sort_key = self._sort_key(key)
+        found = None
+        node = self.root
+        while node is not None:
+            if sort_key > node.sort_key:
+                node = node.right
+            else:
+                found = node
+                node = node.left
+        if found is None:
+            raise KeyError(f"No key greater than or equal to {key}.")
+        return found.key
+
+    def range(self, low: Any = None, high: Any = None) -> Generator[Any, None, None]:
+        """
+        Iterate over the keys in the range [low, high) in ascending order.
+
+        The stack of the in-order traversal is built along the search path of low,
+        so the first key is found in O(log n) expected time.
+
+        Args:
+            low (Any): The least key of the range. Unbounded if None.
+            high (Any): The key after the range. Unbounded if None.
+
+        Returns:
+            Generator[Any]: A generator yielding keys of the range in ascending order.
+        """
+        if low is not None:
+            low = self._sort_key(low)
+        if high is not None:
+            high = self._sort_key(high)
+        stack: list[Node] = []
+        node = self.root
+        while node is not None:
+            if low is None or low <= node.sort_key:
+                stack.append(node)
+                node = node.left
+            else:
+                node = node.right
+
+        while stack:
+            node = stack.pop()
+            if high is not None and node.sort_key >= high:
+                return
+            yield node.key
+            child = node.right
+            while child is not None:
+                stack.append(child)
+                child = child.left
+
+    def count(self, low: Any = None, high: Any = None) -> int:
+        """
+        Count the keys in the range [low, high).
+
+        Args:
+            low (Any): The least key of the range. Unbounded if None.
+            high (Any): The key after the range. Unbounded if None.
+
+        Returns:
+            int: The number of keys in the range.
+        """
+        # The root is read once, so a concurrent writer cannot mix two versions.
+        root = self.root
+        size = root.size if root is not None else 0
+        below_high = size if high is None else self._rank(root, self._sort_key(high))
+        below_low = 0 if low is None else self._rank(root, self._sort_key(low))
+        return max(0, below_high - below_low)
+
+    def range_aggregate(self, low: Any = None, high: Any = None) -> Any:
+        """
+        Fold the values of the keys in the range [low, high) with the aggregate function,
+        in ascending order of keys.
+
+        The search paths of low and high below the first node inside the range are walked once,
+        combining whole subtrees by their stored aggregates.
+
+        Args:
+            low (Any): The least key of the range. Unbounded if None.
+            high (Any): The key after the range. Unbounded if None.
+
+        Returns:
+            Any: The folded value, or None if the range is empty.
+
+        Raises:
+            ValueError: If the Treap has no aggregate function.
+        """
+        if self.aggregate is None:
+            raise ValueError("The Treap has no aggregate function.")
+
+        if low is not None:
+            low = self._sort_key(low)
+        if high is not None:
+            high = self._sort_key(high)
+        node = self.root
+        while node is not None:
+            if low is not None and node.sort_key < low:
+                node = node.right
+            elif high is not None and node.sort_key >= high:
+                node = node.left
+            else:
+                break
+        if node is None:
+            return None
+
+        # Values of the left part are collected from the greatest keys down and reversed.
+        left_parts = []
+        child = node.left
+        while child is not None:
+            if low is None or low <= child.sort_key:
+                if child.right is not None:
+                    left_parts.append(child.right.aggregate)
+                left_parts.append(child.value)
+                child = child.left
+            else:
+                child = child.right
+
+        right_parts = []
+        child = node.right
+        while child is not None:
+            if high is None or child.sort_key < high:
+                if child.left is not None:
+                    right_parts.append(child.left.aggregate)
+                right_parts.append(child.value)
+                child = child.right
+            else:
+                child = child.left
+
+        result = node.value
+        for part in left_parts:
+            result = self.aggregate(part, result)
+        for part in right_parts:
+            result = self.aggregate(result, part)
+        return result
+
+    def height(self) -> int:
+        """
+        Compute the height of the tree, which is the number of nodes on its longest path.
+
+        Returns:
+            int: The height, 0 for an empty Treap.
+        """
+        height = 0
+        stack = [(self.root, 1)]
+        while stack:
+            node, depth = stack.pop()
+            if node is not None:
+                height = max(height, depth)
+                stack.append((node.left, depth + 1))
+                stack.append((node.right, depth + 1))
+        return height
+
+    def check_invariants(self) -> dict[str, Any]:
+        """
+        Walk the whole tree and check the invariants of the Treap in O(n) time.
+
+        Returns:
+            dict[str, Any]: The number of keys reported by len ("size") and counted ("nodes"),
+            the "height", and whether the keys are "ordered", the priorities satisfy the "heap"
+            property, and the stored "subtree_sizes" and "aggregates" are consistent.
+        """
+        nodes = height = 0
+        ordered = heap = subtree_sizes = aggregates = True
+        stack: list[tuple[Node | None, int, Any, Any]] = [(self.root, 1, None, None)]
+        while stack:
+            node, depth, low, high = stack.pop()
+            if node is None:
+                continue
+            nodes += 1
+            height = max(height, depth)
+            left, right = node.left, node.right
+            ordered &= (low is None or low < node.sort_key) and (
+                high is None or node.sort_key < high
+            )
+            heap &= all(
+                child is None or child.priority <= node.priority
+                for child in (left, right)
+            )
+            subtree_sizes &= node.size == 1 + sum(
+                child.size for child in (left, right) if child is not None
+            )
+            if self.aggregate is not None:
+                aggregate = node.value
+                if left is not None:
+                    aggregate = self.aggregate(left.aggregate, aggregate)
+                if right is not None:
+                    aggregate = self.aggregate(aggregate, right.aggregate)
+                aggregates &= aggregate == node.aggregate
+            stack.append((left, depth + 1, low, node.sort_key))
+            stack.append((right, depth + 1, node.sort_key, high))
+
+        return {
+            "size": self.__size,
+            "nodes": nodes,
+            "height": height,
+            "ordered": ordered,
+            "heap": heap,
+            "subtree_sizes": subtree_sizes and (nodes == self.__size),
+            "aggregates": aggregates,
+        }
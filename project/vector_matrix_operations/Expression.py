@@ -0,0 +1,444 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Any
+
+from project.vector_matrix_operations.Matrix import Matrix, matmul_arrays
+from project.vector_matrix_operations.Vector import Vector
+
+
+def chain_order(dimensions: list[int]) -> tuple[int, list[list[int]]]:
+    """
+    Finds the order of a chain of matrix products with the fewest scalar multiplications
+    by dynamic programming over all subchains in O(k^3) time for k factors.
+
+    Parameters:
+    ----------
+    dimensions : list[int]
+        The k + 1 dimensions of the chain, where factor i has shape
+        (dimensions[i], dimensions[i + 1]).
+
+    Returns:
+    -------
+    tuple[int, list[list[int]]]
+        The number of multiplications of the best order, and the table of splits, where
+        split[i][j] is the factor after which the subchain i..j is split last.
+    """
+
+    count = len(dimensions) - 1
+    cost = [[0] * count for _ in range(count)]
+    split = [[0] * count for _ in range(count)]
+    for length in range(1, count):
+        for i in range(count - length):
+            j = i + length
+            cost[i][j], split[i][j] = min(
+                (
+                    cost[i][k]
+                    + cost[k + 1][j]
+                    + dimensions[i] * dimensions[k + 1] * dimensions[j + 1],
+                    k,
+                )
+                for k in range(i, j)
+            )
+    return (cost[0][count - 1] if count else 0), split
+
+
+class Expression(ABC):
+    """
+    A node of a lazily evaluated expression over matrices and vectors.
+
+    Operators on expressions build a tree instead of computing intermediate results. Sums and
+    products are flattened into n-ary nodes, and transposes are pushed down to the leaves, where
+    they become strided views, so no transpose is ever computed. evaluate() then multiplies every
+    chain of products in the order with the fewest scalar multiplications and accumulates every
+    sum in place into a single buffer.
+
+    Leaves refer to the arrays of their matrices and vectors without copying them, so changes
+    made before evaluate() are seen by the result.
+
+    Attributes:
+    ----------
+    shape : tuple[int, ...]
+        The shape of the result.
+    """
+
+    shape: tuple[int, ...]
+
+    def __add__(self, other: "Expression | Matrix | Vector") -> "Expression":
+        """
+        Builds the sum with another expression, matrix or vector.
+
+        Raises:
+        ------
+        ValueError
+            If the operands are not of the same shape.
+        """
+
+        return Sum(self, as_expression(other))
+
+    def __radd__(self, other: "Matrix | Vector") -> "Expression":
+        """
+        Builds the sum of a matrix or a vector with this expression.
+        """
+        return Sum(as_expression(other), self)
+
+    def __matmul__(self, other: "Expression | Matrix | Vector") -> "Expression":
+        """
+        Builds the product with another expression, matrix or vector.
+
+        Raises:
+        ------
+        ValueError
+            If the shapes are not compatible for multiplication.
+        """
+
+        return Product(self, as_expression(other))
+
+    def __rmatmul__(self, other: "Matrix | Vector") -> "Expression":
+        """
+        Builds the product of a matrix or a vector with this expression.
+        """
+        return Product(as_expression(other), self)
+
+    @abstractmethod
+    def T(self) -> "Expression":
+        """
+        Builds the transpose of the expression.
+        """
+
+    @abstractmethod
+    def _leaves(self) -> list["Leaf"]:
+        """
+        Returns the leaves of the expression.
+        """
+
+    @abstractmethod
+    def _compute(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Computes the value of the expression.
+
+        Parameters:
+        ----------
+        out : np.ndarray, optional
+            The array to store the value in. Without it, the returned array may be
+            the array of a leaf and must not be modified.
+
+        Returns:
+        -------
+        np.ndarray
+            The value, which is out if it is given.
+        """
+
+    @property
+    def dtype(self) -> np.dtype:
+        """
+        The type of the elements of the result.
+        """
+        return np.result_type(*(leaf.array for leaf in self._leaves()))
+
+    def cost(self) -> int:
+        """
+        Estimates the number of scalar multiplications of evaluate().
+        """
+        return sum(node.cost() for node in self._children())
+
+    def _children(self) -> list["Expression"]:
+        """
+        Returns the direct operands of the expression.
+        """
+        return []
+
+    def evaluate(self) -> Matrix | Vector:
+        """
+        Computes the value of the expression.
+
+        Returns:
+        -------
+        Matrix or Vector
+            A Matrix for a 2D result and a Vector for a 1D one.
+        """
+
+        array = self._compute()
+        if isinstance(self, Leaf):
+            array = array.copy()
+        if array.ndim == 1:
+            return Vector(array)
+        return Matrix(array, copy=False)
+
+    def __array__(self):
+        """
+        Evaluates the expression as a NumPy array.
+        """
+        return np.asarray(self.evaluate())
+
+
+class Leaf(Expression):
+    """
+    An expression that is the array of a matrix or a vector, or a transposed view of it.
+
+    Attributes:
+    ----------
+    array : np.ndarray
+        The array of the operand.
+    """
+
+    def __init__(self, array: np.ndarray):
+        """
+        Initializes the leaf with an array, which is not copied.
+
+        Parameters:
+        ----------
+        array : np.ndarray
+            The 1D or 2D array of a vector or a matrix.
+        """
+
+        self.array = array
+        self.shape = array.shape
+
+    def T(self) -> Expression:
+        """
+        Returns a leaf of the transposed view of the array.
+        """
+        return Leaf(self.array.T)
+
+    def _leaves(self) -> list["Leaf"]:
+        """
+        Returns the leaf itself.
+        """
+        return [self]
+
+    def _compute(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Returns the array itself, or copies it into out.
+        """
+        if out is None:
+            return self.array
+        out[...] = self.array
+        return out
+
+    def __repr__(self) -> str:
+        """
+        Shows the shape of the leaf.
+        """
+        return f"Leaf{self.shape}"
+
+
+class Sum(Expression):
+    """
+    A sum of two or more expressions of the same shape.
+
+    Attributes:
+    ----------
+    terms : list[Expression]
+        The terms, none of which is a Sum.
+    """
+
+    def __init__(self, *terms: Expression):
+        """
+        Initializes the sum, taking over the terms of nested sums.
+
+        Parameters:
+        ----------
+        *terms : Expression
+            The terms.
+
+        Raises:
+        ------
+        ValueError
+            If the terms are not of the same shape.
+        """
+
+        shapes = {term.shape for term in terms}
+        if len(shapes) != 1:
+            raise ValueError("Matrices must be of the same shape")
+        self.terms: list[Expression] = []
+        for term in terms:
+            self.terms += term.terms if isinstance(term, Sum) else [term]
+        self.shape = terms[0].shape
+
+    def T(self) -> Expression:
+        """
+        Returns the sum of the transposed terms.
+        """
+        return Sum(*(term.T() for term in self.terms))
+
+    def _leaves(self) -> list[Leaf]:
+        """
+        Returns the leaves of all terms.
+        """
+        return [leaf for term in self.terms for leaf in term._leaves()]
+
+    def _children(self) -> list[Expression]:
+        """
+        Returns the terms.
+        """
+        return self.terms
+
+    def _compute(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Accumulates the terms in place. Without out, the first computed term becomes the
+        buffer of the result, so a sum of leaves and one product allocates only the product.
+        Further computed terms share a single scratch buffer.
+        """
+
+        leaves = [term for term in self.terms if isinstance(term, Leaf)]
+        computed = [term for term in self.terms if not isinstance(term, Leaf)]
+        dtype = self.dtype
+        if computed and out is None:
+            result = computed.pop(0)._compute()
+            if result.dtype != dtype:
+                result = result.astype(dtype)
+        elif computed:
+            result = computed.pop(0)._compute(out)
+        else:
+            result = np.add(leaves[0].array, leaves[1].array, out=out, dtype=dtype)
+            leaves = leaves[2:]
+
+        scratch = None
+        for term in computed:
+            if scratch is None:
+                scratch = np.empty(self.shape, dtype=term.dtype)
+            np.add(result, term._compute(scratch), out=result)
+        for leaf in leaves:
+            np.add(result, leaf.array, out=result)
+        return result
+
+    def __repr__(self) -> str:
+        """
+        Shows the terms joined by +.
+        """
+        return "(" + " + ".join(map(repr, self.terms)) + ")"
+
+
+class Product(Expression):
+    """
+    A chain of two or more matrix products.
+
+    A vector is allowed only at an end of the chain, where it is a row or a column vector
+    as in np.matmul, and makes the result a vector.
+
+    Attributes:
+    ----------
+    factors : list[Expression]
+        The factors. A Product is a factor only if it is a vector.
+    """
+
+    def __init__(self, *factors: Expression):
+        """
+        Initializes the chain, taking over the factors of nested matrix products.
+
+        Parameters:
+        ----------
+        *factors : Expression
+            The factors from left to right.
+
+        Raises:
+        ------
+        ValueError
+            If a vector is not at an end of the chain, or the shapes are not compatible
+            for multiplication.
+        """
+
+        self.factors: list[Expression] = []
+        for factor in factors:
+            if isinstance(factor, Product) and len(factor.shape) == 2:
+                self.factors += factor.factors
+            else:
+                self.factors.append(factor)
+
+        first, last = self.factors[0].shape, self.factors[-1].shape
+        if any(len(factor.shape) == 1 for factor in self.factors[1:-1]) or (
+            len(first) == len(last) == 1
+        ):
+            raise ValueError("Vectors can only be the first or the last factor")
+        for left, right in zip(self.factors, self.factors[1:]):
+            if left.shape[-1] != right.shape[0]:
+                raise ValueError("Matrix shapes are not compatible for multiplication")
+        self.shape = first[:-1] + last[1:]
+
+    def T(self) -> Expression:
+        """
+        Returns the product of the transposed factors in reverse order. A vector is its own
+        transpose.
+        """
+        if len(self.shape) == 1:
+            return self
+        return Product(*(factor.T() for factor in reversed(self.factors)))
+
+    def _leaves(self) -> list[Leaf]:
+        """
+        Returns the leaves of all factors.
+        """
+        return [leaf for factor in self.factors for leaf in factor._leaves()]
+
+    def _children(self) -> list[Expression]:
+        """
+        Returns the factors.
+        """
+        return self.factors
+
+    def _dimensions(self) -> list[int]:
+        """
+        Returns the dimensions of the chain, with vectors at the ends as 1 x d or d x 1.
+        """
+        dimensions = [
+            self.factors[0].shape[0] if len(self.factors[0].shape) == 2 else 1
+        ]
+        dimensions += [factor.shape[0] for factor in self.factors[1:]]
+        last = self.factors[-1].shape
+        dimensions.append(last[1] if len(last) == 2 else 1)
+        return dimensions
+
+    def cost(self) -> int:
+        """
+        Adds the multiplications of the best order of the chain to those of the factors.
+        """
+        return super().cost() + chain_order(self._dimensions())[0]
+
+    def _compute(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Computes the factors and multiplies them in the order found by chain_order, writing
+        the last product into out.
+        """
+        arrays = [factor._compute() for factor in self.factors]
+        if arrays[0].ndim == 1:
+            arrays[0] = arrays[0][np.newaxis, :]
+        if arrays[-1].ndim == 1:
+            arrays[-1] = arrays[-1][:, np.newaxis]
+        _, split = chain_order(self._dimensions())
+
+        def multiply(i: int, j: int, out: np.ndarray | None = None) -> np.ndarray:
+            if i == j:
+                return arrays[i]
+            k = split[i][j]
+            return matmul_arrays(multiply(i, k), multiply(k + 1, j), out=out)
+
+        shape = self._dimensions()[0], self._dimensions()[-1]
+        result = multiply(
+            0, len(arrays) - 1, out.reshape(shape) if out is not None else None
+        )
+        return result.reshape(self.shape) if out is None else out
+
+    def __repr__(self) -> str:
+        """
+        Shows the factors joined by @.
+        """
+        return "(" + " @ ".join(map(repr, self.factors)) + ")"
+
+
+def as_expression(operand: Any) -> Expression:
+    """
+    Wraps a matrix or a vector into a leaf, and returns an expression as is.
+
+    Raises:
+    ------
+    TypeError
+        If the operand is not an expression, a matrix or a vector.
+    """
+
+    if isinstance(operand, Expression):
+        return operand
+    if isinstance(operand, Matrix):
+        return Leaf(operand.matrix)
+    if isinstance(operand, Vector):
+        return Leaf(operand.vector)
+    raise TypeError(f"Cannot use {type(operand).__name__} in a matrix expression")
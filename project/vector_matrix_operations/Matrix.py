@@ -1,11 +1,259 @@
 import numpy as np
-from typing import Iterable
+from typing import TYPE_CHECKING, Any, Iterable
+
+if TYPE_CHECKING:
+    from project.thread_pool.thread_pool import ThreadPool
+    from project.vector_matrix_operations.Expression import Expression
+
+# The side of the square tiles of the blocked multiplication. Three tiles of 64-bit
+# elements take 384 KiB and fit into the L2 cache.
+BLOCK_SIZE = 128
+
+
+def blocked_matmul(
+    a: np.ndarray,
+    b: np.ndarray,
+    block_size: int = BLOCK_SIZE,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Multiplies two 2D arrays tile by tile.
+
+    NumPy multiplies integer and object arrays without BLAS, by a loop that walks the columns
+    of b with a stride of a whole row and misses the cache for large matrices. Here b is copied
+    in column-major order, so the loop reads both operands contiguously, and the product is
+    accumulated from tiles small enough to stay in the cache.
+
+    Parameters:
+    ----------
+    a : np.ndarray
+        The left operand of shape (n, k).
+    b : np.ndarray
+        The right operand of shape (k, m).
+    block_size : int
+        The side of the tiles.
+    out : np.ndarray, optional
+        The array of shape (n, m) to store the product in. It may overlap the operands.
+
+    Returns:
+    -------
+    np.ndarray
+        The product of shape (n, m), which is out if it is given.
+    """
+
+    rows, inner = a.shape
+    columns = b.shape[1]
+    if max(rows, inner, columns) <= block_size:
+        return np.matmul(a, b, out=out)
+
+    if out is None:
+        result = np.zeros((rows, columns), dtype=np.result_type(a, b))
+    elif np.may_share_memory(out, a) or np.may_share_memory(out, b):
+        out[...] = blocked_matmul(a, b, block_size)
+        return out
+    else:
+        result = out
+        result[...] = 0
+
+    columns_of_b = np.ascontiguousarray(b.T)
+    for i in range(0, rows, block_size):
+        for j in range(0, columns, block_size):
+            _multiply_tile(
+                a,
+                columns_of_b,
+                slice(i, i + block_size),
+                slice(j, j + block_size),
+                block_size,
+                out=result[i : i + block_size, j : j + block_size],
+            )
+    return result
+
+
+def _multiply_tile(
+    a: Any,
+    columns_of_b: Any,
+    rows: slice,
+    columns: slice,
+    block_size: int,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Computes the tile a[rows] @ b[:, columns] of a product as a sum of block products over
+    the inner dimension. The operands may be SharedArrays, so it can run in a worker process.
+
+    Parameters:
+    ----------
+    a : np.ndarray or SharedArray
+        The left operand of shape (n, k).
+    columns_of_b : np.ndarray or SharedArray
+        The transpose of the right operand, of shape (m, k), whose rows are the columns of b.
+    rows, columns : slice
+        The rows and the columns of the tile in the product.
+    block_size : int
+        The side of the blocks.
+    out : np.ndarray, optional
+        The zeroed array to accumulate the tile in.
+
+    Returns:
+    -------
+    np.ndarray
+        The tile, which is out if it is given.
+    """
+
+    a, columns_of_b = np.asarray(a)[rows], np.asarray(columns_of_b)[columns]
+    if out is None:
+        out = np.zeros(
+            (a.shape[0], columns_of_b.shape[0]), dtype=np.result_type(a, columns_of_b)
+        )
+    for k in range(0, a.shape[1], block_size):
+        out += a[:, k : k + block_size] @ columns_of_b[:, k : k + block_size].T
+    return out
+
+
+def parallel_matmul(
+    a: np.ndarray,
+    b: np.ndarray,
+    pool: "ThreadPool",
+    block_size: int = BLOCK_SIZE,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Multiplies two 2D arrays tile by tile like blocked_matmul, computing the tiles of the
+    product as separate tasks of a ThreadPool.
+
+    With the "thread" backend, the tasks write their tiles straight into the result. NumPy
+    releases the GIL while it multiplies and adds integer and boolean blocks, so the threads
+    run on all cores. Object arrays hold the GIL, so they need the "process" backend, where
+    every task receives the rows of a and the columns of b for its tile. Other dtypes are
+    copied once into SharedArrays there, and only references to them are sent with the tasks.
+
+    Parameters:
+    ----------
+    a : np.ndarray
+        The left operand of shape (n, k).
+    b : np.ndarray
+        The right operand of shape (k, m).
+    pool : ThreadPool
+        The pool to run the tiles in. The call waits for the tiles, so it must not be made
+        from a task of the same pool.
+    block_size : int
+        The side of the tiles.
+    out : np.ndarray, optional
+        The array of shape (n, m) to store the product in. It may overlap the operands.
+
+    Returns:
+    -------
+    np.ndarray
+        The product of shape (n, m), which is out if it is given.
+    """
+
+    from project.thread_pool.shared_memory import SharedArray
+
+    rows, inner = a.shape
+    columns = b.shape[1]
+    if max(rows, inner, columns) <= block_size:
+        return np.matmul(a, b, out=out)
+
+    dtype = np.result_type(a, b)
+    if out is not None and (np.may_share_memory(out, a) or np.may_share_memory(out, b)):
+        out[...] = parallel_matmul(a, b, pool, block_size)
+        return out
+    result = np.zeros((rows, columns), dtype=dtype) if out is None else out
+    if out is not None and pool.backend == "thread":
+        result[...] = 0
+
+    columns_of_b = np.ascontiguousarray(b.T)
+    shared: list[SharedArray] = []
+    if pool.backend == "process" and dtype != object:
+        shared = [SharedArray(a), SharedArray(columns_of_b)]
+
+    tasks = []
+    try:
+        for i in range(0, rows, block_size):
+            for j in range(0, columns, block_size):
+                tile_rows, tile_columns = slice(i, i + block_size), slice(
+                    j, j + block_size
+                )
+                if pool.backend == "thread":
+                    task = pool.enqueue(
+                        _multiply_tile,
+                        a,
+                        columns_of_b,
+                        tile_rows,
+                        tile_columns,
+                        block_size,
+                        out=result[tile_rows, tile_columns],
+                    )
+                elif shared:
+                    task = pool.enqueue(
+                        _multiply_tile, *shared, tile_rows, tile_columns, block_size
+                    )
+                else:
+                    task = pool.enqueue(
+                        _multiply_tile,
+                        a[tile_rows],
+                        columns_of_b[tile_columns],
+                        slice(None),
+                        slice(None),
+                        block_size,
+                    )
+                tasks.append((tile_rows, tile_columns, task))
+
+        for tile_rows, tile_columns, task in tasks:
+            tile = task.result()
+            if pool.backend == "process":
+                result[tile_rows, tile_columns] = tile
+    finally:
+        for _, _, task in tasks:
+            task.cancel()
+        for array in shared:
+            array.close()
+    return result
+
+
+def matmul_arrays(
+    a: np.ndarray,
+    b: np.ndarray,
+    out: np.ndarray | None = None,
+    pool: "ThreadPool | None" = None,
+) -> np.ndarray:
+    """
+    Multiplies two arrays with the fastest kernel for their dtype. Floating-point and complex
+    arrays are multiplied by np.matmul, which calls BLAS, and other dtypes by blocked_matmul,
+    or by parallel_matmul if a pool is given.
+
+    Parameters:
+    ----------
+    a : np.ndarray
+        The left operand of shape (n, k).
+    b : np.ndarray
+        The right operand of shape (k, m).
+    out : np.ndarray, optional
+        The array of shape (n, m) to store the product in.
+    pool : ThreadPool, optional
+        The pool to multiply non-floating-point arrays in.
+
+    Returns:
+    -------
+    np.ndarray
+        The product, which is out if it is given.
+    """
+
+    if np.result_type(a, b).kind in "fc":
+        return np.matmul(a, b, out=out)
+    if pool is not None:
+        return parallel_matmul(a, b, pool, out=out)
+    return blocked_matmul(a, b, out=out)
 
 
 class Matrix:
     """
     A class to represent a mathematical matrix and provide basic matrix operations.
 
+    Operations run on whole arrays in NumPy. T() returns a view sharing the elements of the
+    matrix, and the in-place operators += and @= write into the existing array, so a chain like
+    `result = a @ b; result += c; result @= d` allocates a single result buffer.
+
     Attributes:
     ----------
     matrix : np.ndarray
@@ -28,14 +276,27 @@ class Matrix:
     __add__(other: "Matrix") -> "Matrix"
         Returns the result of matrix addition with another matrix.
 
+    __iadd__(other: "Matrix") -> "Matrix"
+        Adds another matrix in place.
+
     __matmul__(other: "Matrix") -> "Matrix"
         Returns the result of matrix multiplication with another matrix.
 
+    __imatmul__(other: "Matrix") -> "Matrix"
+        Multiplies by another matrix in place.
+
+    add(other: "Matrix", out: "Matrix" | None) -> "Matrix"
+        Adds another matrix, optionally storing the result in an existing matrix.
+
+    matmul(other: "Matrix", out: "Matrix" | None, pool: ThreadPool | None) -> "Matrix"
+        Multiplies with another matrix, optionally storing the result in an existing matrix
+        and splitting the work across a ThreadPool.
+
     T() -> "Matrix"
-        Returns the transpose of the matrix.
+        Returns the transpose of the matrix as a view.
     """
 
-    def __init__(self, object: Iterable[Iterable[float | int]]):
+    def __init__(self, object: Iterable[Iterable[float | int]], copy: bool = True):
         """
         Initializes the Matrix object with the given elements.
 
@@ -43,9 +304,11 @@ class Matrix:
         ----------
         object : Iterable[Iterable[float | int]]
             A 2D iterable (list of lists or array-like) to form the matrix.
+        copy : bool
+            Whether to copy an array passed as object. If False, the matrix is a view of it.
         """
 
-        self.matrix = np.array(object)
+        self.matrix = np.array(object) if copy else np.asarray(object)
 
     def __array__(self):
         """
@@ -125,20 +388,88 @@ class Matrix:
             If matrices are not of the same shape.
         """
 
+        if not isinstance(other, Matrix):
+            # Lets other operands, such as SparseMatrix, implement __radd__.
+            return NotImplemented
+        return self.add(other)
+
+    def __iadd__(self, other: "Matrix") -> "Matrix":
+        """
+        Adds another matrix to the current matrix in place, without allocating a result.
+        Views of the matrix, such as its transpose, see the change. If the elements of the sum
+        cannot be stored in the current matrix, such as floats in an integer matrix, a new
+        matrix is returned.
+
+        Parameters:
+        ----------
+        other : Matrix
+            The matrix to be added.
+
+        Returns:
+        -------
+        Matrix
+            The current matrix, or a new one if its dtype cannot hold the sum.
+
+        Raises:
+        ------
+        ValueError
+            If matrices are not of the same shape.
+        """
+
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        if not self._can_hold(other):
+            return self.add(other)
+        return self.add(other, out=self)
+
+    def _can_hold(self, other: "Matrix") -> bool:
+        """
+        Checks whether results of operations with another matrix can be written into the
+        array of the current matrix without losing their kind, as NumPy does for out.
+        """
+        return np.can_cast(
+            np.result_type(self.matrix, other.matrix), self.matrix.dtype, "same_kind"
+        )
+
+    def add(self, other: "Matrix", out: "Matrix | None" = None) -> "Matrix":
+        """
+        Adds another matrix to the current matrix.
+
+        Parameters:
+        ----------
+        other : Matrix
+            The matrix to be added.
+        out : Matrix, optional
+            The matrix to store the result in. It may be one of the operands.
+
+        Returns:
+        -------
+        Matrix
+            The resulting matrix, which is out if it is given.
+
+        Raises:
+        ------
+        ValueError
+            If matrices are not of the same shape.
+        """
+
         if self.matrix.shape != other.matrix.shape:
             raise ValueError("Matrices must be of the same shape")
 
-        res = np.zeros(shape=self.matrix.shape)
-        for i in range(self.matrix.shape[0]):
-            for j in range(self.matrix.shape[1]):
-                res[i][j] = self.matrix[i][j] + other.matrix[i][j]
+        if out is None:
+            return Matrix(np.add(self.matrix, other.matrix), copy=False)
 
-        return Matrix(res)
+        np.add(self.matrix, other.matrix, out=out.matrix)
+        return out
 
     def __matmul__(self, other: "Matrix") -> "Matrix":
         """
         Multiplies the current matrix with another matrix.
 
+        Floating-point and complex matrices are multiplied by np.matmul, which calls BLAS.
+        Other dtypes, such as integers or Python objects, are multiplied by blocked_matmul.
+        A VectorBatch on the right is multiplied row by row.
+
         Parameters:
         ----------
         other : Matrix
@@ -155,34 +486,113 @@ class Matrix:
             If the matrix shapes are not compatible for multiplication
         """
 
+        if not isinstance(other, Matrix):
+            # Lets other operands, such as VectorBatch or SparseMatrix, implement __rmatmul__.
+            return NotImplemented
+        return self.matmul(other)
+
+    def __imatmul__(self, other: "Matrix") -> "Matrix":
+        """
+        Multiplies the current matrix by another matrix in place. The product is written into
+        the array of the current matrix if it has the same shape, that is, if other is square,
+        and its dtype can hold the product. Otherwise, a new matrix is returned.
+
+        Parameters:
+        ----------
+        other : Matrix
+            The matrix to multiply with.
+
+        Returns:
+        -------
+        Matrix
+            The current matrix, or a new one if the shape or the dtype of the product differs.
+
+        Raises:
+        ------
+        ValueError
+            If the matrix shapes are not compatible for multiplication
+        """
+
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        if other.matrix.shape[0] != other.matrix.shape[1] or not self._can_hold(other):
+            return self.matmul(other)
+        return self.matmul(other, out=self)
+
+    def matmul(
+        self,
+        other: "Matrix",
+        out: "Matrix | None" = None,
+        pool: "ThreadPool | None" = None,
+    ) -> "Matrix":
+        """
+        Multiplies the current matrix with another matrix.
+
+        Parameters:
+        ----------
+        other : Matrix
+            The matrix to multiply with.
+        out : Matrix, optional
+            The matrix to store the result in. It may be one of the operands.
+        pool : ThreadPool, optional
+            The pool to split the product of integer and object matrices across, as
+            in parallel_matmul. Floating-point products already run on all cores in BLAS.
+
+        Returns:
+        -------
+        Matrix
+            The resulting matrix, which is out if it is given.
+
+        Raises:
+        ------
+        ValueError
+            If the matrix shapes are not compatible for multiplication,
+            or if out does not have the shape of the product.
+        """
+
         if self.matrix.shape[1] != other.matrix.shape[0]:
             raise ValueError("Matrix shapes are not compatible for multiplication")
 
-        res = np.zeros(shape=(self.matrix.shape[0], other.matrix.shape[1]))
+        shape = (self.matrix.shape[0], other.matrix.shape[1])
+        if out is not None and out.matrix.shape != shape:
+            raise ValueError("The output matrix must have the shape of the product")
 
-        for i in range(self.matrix.shape[0]):
-            for j in range(other.matrix.shape[1]):
-                res[i][j] = sum(
-                    [
-                        self.matrix[i][k] * other.matrix[k][j]
-                        for k in range(self.matrix.shape[1])
-                    ]
-                )
-
-        return Matrix(res)
+        result = matmul_arrays(
+            self.matrix,
+            other.matrix,
+            out=out.matrix if out is not None else None,
+            pool=pool,
+        )
+        return out if out is not None else Matrix(result, copy=False)
 
     def T(self) -> "Matrix":
         """
-        Returns the transpose of the current matrix.
+        Returns the transpose of the current matrix in O(1) time.
+
+        The transpose is a strided view of the same elements, so changes of either matrix,
+        including in-place operators, are visible in the other one. Use Matrix(m.T().matrix) for
+        an independent copy.
 
         Returns:
         -------
         Matrix
             The transposed matrix.
         """
-        res = np.zeros(shape=(self.matrix.shape[1], self.matrix.shape[0]))
-        for i in range(self.matrix.shape[1]):
-            for j in range(self.matrix.shape[0]):
-                res[i][j] = self.matrix[j][i]
 
-        return Matrix(res)
+        return Matrix(self.matrix.T, copy=False)
+
+    def lazy(self) -> "Expression":
+        """
+        Starts a lazy expression with the matrix as an operand. Operators on the result
+        build an expression tree, which is optimized and computed by evaluate().
+
+        Returns:
+        -------
+        Expression
+            A leaf of an expression referring to the matrix without copying it.
+        """
+
+        # Imported here, since the expression module depends on this one.
+        from project.vector_matrix_operations.Expression import Leaf
+
+        return Leaf(self.matrix)
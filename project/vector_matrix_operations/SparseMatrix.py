@@ -0,0 +1,578 @@
+import numpy as np
+from typing import Any, Iterable
+
+from project.vector_matrix_operations.Matrix import Matrix
+
+# Matrices with at most this fraction of nonzero elements are stored sparse by make_matrix,
+# and sparse results denser than this are returned as a dense Matrix. Around this density,
+# sparse products stop being faster than BLAS on dense ones (see benchmarks).
+DENSITY_THRESHOLD = 0.01
+# The largest number of intermediate products materialized at once by a multiplication.
+CHUNK_ELEMENTS = 1 << 22
+
+
+def _sum_duplicates(
+    keys: np.ndarray, values: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sorts values by their row-major positions, sums the values at equal positions
+    and drops the zero sums.
+
+    Parameters:
+    ----------
+    keys : np.ndarray
+        The position row * columns + column of every value.
+    values : np.ndarray
+        The values.
+
+    Returns:
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The sorted unique positions and their nonzero sums.
+    """
+
+    order = np.argsort(keys, kind="stable")
+    keys, values = keys[order], values[order]
+    if len(keys):
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        keys, values = keys[starts], np.add.reduceat(values, starts)
+        nonzero = values != 0
+        keys, values = keys[nonzero], values[nonzero]
+    return keys, values
+
+
+def _row_chunks(indptr: np.ndarray, costs: np.ndarray) -> list[tuple[int, int]]:
+    """
+    Splits the rows into contiguous ranges whose total cost is about CHUNK_ELEMENTS.
+
+    Parameters:
+    ----------
+    indptr : np.ndarray
+        The row pointers of a CSR matrix.
+    costs : np.ndarray
+        The number of intermediate products of every stored element.
+
+    Returns:
+    -------
+    list[tuple[int, int]]
+        The (start, stop) ranges of rows.
+    """
+
+    rows = len(indptr) - 1
+    totals = np.concatenate(([0], np.cumsum(costs)))[indptr]
+    chunks = []
+    start = 0
+    while start < rows:
+        limit = totals[start] + CHUNK_ELEMENTS
+        stop = max(start + 1, int(np.searchsorted(totals, limit, side="right")) - 1)
+        stop = min(stop, rows)
+        chunks.append((start, stop))
+        start = stop
+    return chunks
+
+
+class SparseMatrix:
+    """
+    A class to represent a sparse matrix in the compressed sparse row (CSR) format.
+
+    Only the nonzero elements are stored: data holds their values row by row, indices their
+    column indices, and indptr[i]:indptr[i + 1] is the slice of both arrays belonging to row i.
+    Column indices are sorted within every row and no zeros are stored, so every matrix has a
+    single representation. A matrix with n rows and z nonzeros takes O(n + z) memory, and all
+    operations are vectorized over the stored elements.
+
+    The transpose in CSR format is the original matrix in the compressed sparse column format,
+    so T() is the conversion between the two and takes O(n + z) time.
+
+    Attributes:
+    ----------
+    data : np.ndarray
+        The nonzero values in row-major order.
+    indices : np.ndarray
+        The column index of every nonzero value.
+    indptr : np.ndarray
+        The offsets of the rows in data and indices, of length n + 1.
+    shape : tuple[int, int]
+        The number of rows and columns.
+
+    Methods:
+    -------
+    __array__()
+        Converts the matrix to a dense NumPy array.
+
+    __getitem__(indices: tuple) -> float
+        Allows access to matrix elements using mat[i, j].
+
+    __add__(other: "SparseMatrix" | Matrix) -> "SparseMatrix" | Matrix
+        Returns the sum with a sparse or a dense matrix.
+
+    __matmul__(other: "SparseMatrix" | Matrix) -> "SparseMatrix" | Matrix
+        Returns the product with a sparse or a dense matrix.
+
+    T() -> "SparseMatrix"
+        Returns the transpose of the matrix.
+
+    from_dense(object) -> "SparseMatrix"
+        Creates a sparse matrix from the nonzero elements of a dense one.
+    """
+
+    def __init__(
+        self,
+        data: Iterable[Any],
+        indices: Iterable[int],
+        indptr: Iterable[int],
+        shape: tuple[int, int],
+    ):
+        """
+        Initializes the SparseMatrix object from its CSR arrays.
+
+        Parameters:
+        ----------
+        data : Iterable
+            The values in row-major order. Zeros among them are dropped.
+        indices : Iterable[int]
+            The column index of every value, sorted within every row.
+        indptr : Iterable[int]
+            The offsets of the rows in data and indices, of length n + 1.
+        shape : tuple[int, int]
+            The number of rows and columns.
+
+        Raises:
+        ------
+        ValueError
+            If the arrays do not describe a matrix of the given shape in canonical form.
+        """
+
+        self.data = np.asarray(data)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.shape = (int(shape[0]), int(shape[1]))
+
+        rows, columns = self.shape
+        if (
+            len(self.indptr) != rows + 1
+            or self.indptr[0] != 0
+            or self.indptr[-1] != len(self.data)
+            or len(self.indices) != len(self.data)
+            or np.any(np.diff(self.indptr) < 0)
+        ):
+            raise ValueError("The row pointers do not match the shape and the data")
+        if len(self.indices) and (
+            self.indices.min() < 0 or self.indices.max() >= columns
+        ):
+            raise ValueError("Column indices are out of range")
+        # Within a row, columns must increase, so the only allowed decreases are row starts.
+        decreasing = np.flatnonzero(np.diff(self.indices) <= 0) + 1
+        if not np.all(np.isin(decreasing, self.indptr)):
+            raise ValueError(
+                "Column indices must be sorted and unique within every row"
+            )
+
+        # Stored zeros would count towards nnz and the density, so they are dropped.
+        nonzero = np.asarray(self.data != 0, dtype=bool)
+        if not nonzero.all():
+            kept = np.concatenate(([0], np.cumsum(nonzero)))
+            self.data, self.indices = self.data[nonzero], self.indices[nonzero]
+            self.indptr = kept[self.indptr]
+
+    @classmethod
+    def _from_coordinates(
+        cls,
+        rows: np.ndarray,
+        columns: np.ndarray,
+        values: np.ndarray,
+        shape: tuple[int, int],
+    ) -> "SparseMatrix":
+        """
+        Creates a matrix from coordinates in any order, summing values of repeated coordinates
+        and dropping zeros.
+
+        Parameters:
+        ----------
+        rows : np.ndarray
+            The row index of every value.
+        columns : np.ndarray
+            The column index of every value.
+        values : np.ndarray
+            The values.
+        shape : tuple[int, int]
+            The number of rows and columns.
+
+        Returns:
+        -------
+        SparseMatrix
+            The matrix in canonical form.
+        """
+
+        keys, values = _sum_duplicates(rows * shape[1] + columns, values)
+        return cls._from_keys(keys, values, shape)
+
+    @classmethod
+    def _from_keys(
+        cls, keys: np.ndarray, values: np.ndarray, shape: tuple[int, int]
+    ) -> "SparseMatrix":
+        """
+        Creates a matrix from the sorted unique row-major positions of nonzero values.
+        """
+
+        matrix = cls.__new__(cls)
+        matrix.data = values
+        matrix.indices = keys % shape[1] if shape[1] else keys
+        matrix.indptr = np.searchsorted(
+            keys, np.arange(shape[0] + 1, dtype=np.int64) * shape[1]
+        ).astype(np.int64)
+        matrix.shape = shape
+        return matrix
+
+    @classmethod
+    def from_dense(cls, object: Iterable[Iterable[Any]]) -> "SparseMatrix":
+        """
+        Creates a sparse matrix from the nonzero elements of a dense one.
+
+        Parameters:
+        ----------
+        object : Iterable[Iterable]
+            A 2D iterable (list of lists, Matrix or array-like).
+
+        Returns:
+        -------
+        SparseMatrix
+            The sparse matrix.
+        """
+
+        array = np.asarray(object)
+        if array.ndim != 2:
+            raise ValueError("A matrix must be a 2D array")
+        rows, columns = np.nonzero(array)
+        indptr = np.concatenate(([0], np.cumsum(np.count_nonzero(array, axis=1))))
+        return cls(array[rows, columns], columns, indptr, array.shape)
+
+    @property
+    def nnz(self) -> int:
+        """
+        The number of stored nonzero elements.
+        """
+        return len(self.data)
+
+    @property
+    def density(self) -> float:
+        """
+        The fraction of nonzero elements.
+        """
+        size = self.shape[0] * self.shape[1]
+        return self.nnz / size if size else 0.0
+
+    @property
+    def dtype(self) -> np.dtype:
+        """
+        The type of the elements.
+        """
+        return self.data.dtype
+
+    def _rows(self) -> np.ndarray:
+        """
+        Returns the row index of every stored element.
+        """
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def to_dense(self) -> np.ndarray:
+        """
+        Converts the matrix to a dense NumPy array.
+
+        Returns:
+        -------
+        np.ndarray
+            The dense array.
+        """
+
+        result = np.zeros(self.shape, dtype=self.dtype)
+        result[self._rows(), self.indices] = self.data
+        return result
+
+    def __array__(self):
+        """
+        Allows the SparseMatrix object to be treated as a dense NumPy array.
+
+        Returns:
+        -------
+        np.ndarray
+            The dense array.
+        """
+        return self.to_dense()
+
+    def __repr__(self) -> str:
+        """
+        Provides a detailed string representation of the SparseMatrix object for debugging.
+
+        Returns:
+        -------
+        string
+            The string representation for debugging.
+        """
+
+        return (
+            f"SparseMatrix({self.data.tolist()}, {self.indices.tolist()}, "
+            f"{self.indptr.tolist()}, {self.shape})"
+        )
+
+    def __getitem__(self, indices: tuple) -> Any:
+        """
+        Allows access to matrix elements using mat[i, j] in O(log k) time for a row of k nonzeros.
+
+        Parameters:
+        ----------
+        indices : tuple
+            A tuple representing the indices (i, j) to access the matrix.
+
+        Returns:
+        -------
+        float
+            The value at the specified index, which is zero if it is not stored.
+
+        Raises:
+        ------
+        IndexError
+            If the indices are out of range.
+        """
+
+        row, column = indices
+        rows, columns = self.shape
+        if not (-rows <= row < rows and -columns <= column < columns):
+            raise IndexError(f"Index {indices} is out of range for shape {self.shape}")
+        row, column = row % rows, column % columns
+
+        start, stop = self.indptr[row], self.indptr[row + 1]
+        position = start + np.searchsorted(self.indices[start:stop], column)
+        if position < stop and self.indices[position] == column:
+            return self.data[position]
+        return self.dtype.type(0)
+
+    def _compact(self) -> "SparseMatrix | Matrix":
+        """
+        Returns the matrix itself, or a dense Matrix if it is denser than DENSITY_THRESHOLD.
+        """
+
+        if self.density > DENSITY_THRESHOLD:
+            return Matrix(self.to_dense(), copy=False)
+        return self
+
+    def __add__(self, other: "SparseMatrix | Matrix") -> "SparseMatrix | Matrix":
+        """
+        Adds the current matrix to another matrix.
+
+        The sum of two sparse matrices is sparse unless it is denser than DENSITY_THRESHOLD.
+        The sum with a dense Matrix is dense.
+
+        Parameters:
+        ----------
+        other : SparseMatrix or Matrix
+            The matrix to be added.
+
+        Returns:
+        -------
+        SparseMatrix or Matrix
+            The resulting matrix after addition.
+
+        Raises:
+        ------
+        ValueError
+            If matrices are not of the same shape.
+        """
+
+        if not isinstance(other, (SparseMatrix, Matrix)):
+            return NotImplemented
+        other_shape = other.matrix.shape if isinstance(other, Matrix) else other.shape
+        if self.shape != other_shape:
+            raise ValueError("Matrices must be of the same shape")
+
+        if isinstance(other, Matrix):
+            result = other.matrix.astype(np.result_type(self.data, other.matrix))
+            result[self._rows(), self.indices] += self.data
+            return Matrix(result, copy=False)
+
+        return SparseMatrix._from_coordinates(
+            np.concatenate((self._rows(), other._rows())),
+            np.concatenate((self.indices, other.indices)),
+            np.concatenate((self.data, other.data)),
+            self.shape,
+        )._compact()
+
+    def __radd__(self, other: Matrix) -> "SparseMatrix | Matrix":
+        """
+        Adds a dense matrix to the current matrix.
+        """
+        return self.__add__(other)
+
+    def _multiply_dense(self, other: np.ndarray) -> np.ndarray:
+        """
+        Multiplies the matrix with a dense 2D array.
+
+        Row i of the product is the sum of the rows of other selected by the column indices
+        of row i, weighted by its values. The weighted rows are summed by np.add.reduceat,
+        in chunks of rows that keep the intermediate products below CHUNK_ELEMENTS.
+        """
+
+        columns = other.shape[1]
+        result = np.zeros(
+            (self.shape[0], columns), dtype=np.result_type(self.data, other)
+        )
+        lengths = np.diff(self.indptr)
+        costs = np.full(self.nnz, max(columns, 1))
+        for start, stop in _row_chunks(self.indptr, costs):
+            low, high = self.indptr[start], self.indptr[stop]
+            if low == high:
+                continue
+            products = self.data[low:high, np.newaxis] * other[self.indices[low:high]]
+            nonempty = np.flatnonzero(lengths[start:stop]) + start
+            result[nonempty] = np.add.reduceat(products, self.indptr[nonempty] - low)
+        return result
+
+    def _multiply_sparse(self, other: "SparseMatrix") -> "SparseMatrix":
+        """
+        Multiplies the matrix with another sparse matrix.
+
+        Every stored element a[i, k] is paired with every stored element b[k, j] of row k of
+        other, and the products are summed per (i, j). The pairs are enumerated by index
+        arithmetic on the row pointers of other, in chunks of rows of the current matrix.
+        Every chunk is summed before the next one, so the memory is bounded by the chunk
+        size and the size of the product.
+        """
+
+        shape = (self.shape[0], other.shape[1])
+        counts = np.diff(other.indptr)[self.indices]
+        rows = self._rows()
+        keys_of = [np.zeros(0, np.int64)]
+        values_of = [np.zeros(0, np.result_type(self.data, other.data))]
+        for start, stop in _row_chunks(self.indptr, counts):
+            low, high = self.indptr[start], self.indptr[stop]
+            repeats = counts[low:high]
+            total = int(repeats.sum())
+            if total == 0:
+                continue
+            # The position of every pair in the data of other: the start of row k
+            # plus the index of the pair among the pairs of the same element a[i, k].
+            firsts = np.cumsum(repeats) - repeats
+            positions = np.repeat(
+                other.indptr[self.indices[low:high]] - firsts, repeats
+            ) + np.arange(total)
+            keys, values = _sum_duplicates(
+                np.repeat(rows[low:high], repeats) * shape[1]
+                + other.indices[positions],
+                np.repeat(self.data[low:high], repeats) * other.data[positions],
+            )
+            keys_of.append(keys)
+            values_of.append(values)
+
+        # The chunks cover increasing ranges of rows, so their keys are already sorted.
+        return SparseMatrix._from_keys(
+            np.concatenate(keys_of), np.concatenate(values_of), shape
+        )
+
+    def __matmul__(self, other: "SparseMatrix | Matrix") -> "SparseMatrix | Matrix":
+        """
+        Multiplies the current matrix with another matrix.
+
+        The product of two sparse matrices is sparse unless it is denser than
+        DENSITY_THRESHOLD. The product with a dense Matrix is dense.
+
+        Parameters:
+        ----------
+        other : SparseMatrix or Matrix
+            The matrix to multiply with.
+
+        Returns:
+        -------
+        SparseMatrix or Matrix
+            The resulting matrix after multiplication.
+
+        Raises:
+        ------
+        ValueError
+            If the matrix shapes are not compatible for multiplication
+        """
+
+        if not isinstance(other, (SparseMatrix, Matrix)):
+            return NotImplemented
+        other_shape = other.matrix.shape if isinstance(other, Matrix) else other.shape
+        if self.shape[1] != other_shape[0]:
+            raise ValueError("Matrix shapes are not compatible for multiplication")
+
+        if isinstance(other, Matrix):
+            return Matrix(self._multiply_dense(other.matrix), copy=False)
+        return self._multiply_sparse(other)._compact()
+
+    def __rmatmul__(self, other: Matrix) -> Matrix:
+        """
+        Multiplies a dense matrix with the current matrix as (S^T @ D^T)^T.
+
+        Parameters:
+        ----------
+        other : Matrix
+            The matrix on the left.
+
+        Returns:
+        -------
+        Matrix
+            The dense product.
+
+        Raises:
+        ------
+        ValueError
+            If the matrix shapes are not compatible for multiplication
+        """
+
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        if other.matrix.shape[1] != self.shape[0]:
+            raise ValueError("Matrix shapes are not compatible for multiplication")
+
+        return Matrix(self.T()._multiply_dense(other.matrix.T).T, copy=False)
+
+    def T(self) -> "SparseMatrix":
+        """
+        Returns the transpose of the current matrix in O(n + z) time.
+
+        A stable sort of the elements by column lists them row by row in the transpose,
+        and keeps the rows of the original matrix, which become the columns, sorted.
+
+        Returns:
+        -------
+        SparseMatrix
+            The transposed matrix.
+        """
+
+        order = np.argsort(self.indices, kind="stable")
+        transposed = SparseMatrix.__new__(SparseMatrix)
+        transposed.data = self.data[order]
+        transposed.indices = self._rows()[order]
+        transposed.indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.indices, minlength=self.shape[1])))
+        ).astype(np.int64)
+        transposed.shape = (self.shape[1], self.shape[0])
+        return transposed
+
+
+def make_matrix(
+    object: Iterable[Iterable[Any]], density_threshold: float = DENSITY_THRESHOLD
+) -> Matrix | SparseMatrix:
+    """
+    Creates a dense or a sparse matrix, whichever suits the density of the elements.
+
+    Parameters:
+    ----------
+    object : Iterable[Iterable]
+        A 2D iterable (list of lists, Matrix or array-like).
+    density_threshold : float
+        The largest fraction of nonzero elements for which a sparse matrix is created.
+
+    Returns:
+    -------
+    Matrix or SparseMatrix
+        A SparseMatrix if at most density_threshold of the elements are nonzero,
+        a Matrix otherwise.
+    """
+
+    array = np.asarray(object)
+    if array.size and np.count_nonzero(array) / array.size <= density_threshold:
+        return SparseMatrix.from_dense(array)
+    return Matrix(array)
@@ -1,16 +1,23 @@
 import numpy as np
 from math import acos, sqrt
-from typing import Iterable
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from project.vector_matrix_operations.Expression import Expression
 
 
 class Vector:
     """
     A class to represent a mathematical vector and provide basic vector operations.
 
+    Products and norms are computed by np.dot, which runs in BLAS for float vectors.
+    The norm is cached after the first call. The array is read-only, so any change goes
+    through __setitem__ or an assignment of vector, both of which drop the cached norm.
+
     Attributes:
     ----------
     vector : np.ndarray
-        The array representing the vector.
+        The read-only array representing the vector.
 
     Methods:
     -------
@@ -20,6 +27,9 @@ class Vector:
     __getitem__(index: int) -> float
         Returns the element at the specified index.
 
+    __setitem__(index: int, value: float) -> None
+        Sets the element at the specified index.
+
     __len__() -> int
         Returns the length of the vector.
 
@@ -43,7 +53,25 @@ class Vector:
             An iterable of numbers to form the vector.
         """
 
-        self.vector = np.array(object=object)
+        # The setter copies the elements into a new array, so they are not copied here.
+        self.vector = object
+
+    @property
+    def vector(self) -> np.ndarray:
+        """
+        The read-only array representing the vector.
+        """
+        return self._vector
+
+    @vector.setter
+    def vector(self, array: Iterable[float | int]) -> None:
+        """
+        Replaces the elements of the vector and drops the cached norm.
+        The array is copied, so later changes of the argument do not affect the vector.
+        """
+        self._vector = np.array(array)
+        self._vector.flags.writeable = False
+        self._norm: float | None = None
 
     def __array__(self):
         """
@@ -73,6 +101,25 @@ class Vector:
 
         return self.vector[index]
 
+    def __setitem__(self, index: int, value: float) -> None:
+        """
+        Sets the element at the specified index and drops the cached norm.
+
+        Parameters:
+        ----------
+        index : int
+            The index of the element to set.
+        value : float
+            The new element.
+        """
+
+        self._vector.flags.writeable = True
+        try:
+            self._vector[index] = value
+        finally:
+            self._vector.flags.writeable = False
+        self._norm = None
+
     def __len__(self) -> int:
         """
         Returns the dimensionality (number of elements) of the vector.
@@ -108,7 +155,7 @@ class Vector:
         if len(self.vector) != len(other.vector):
             raise ValueError("Vectors must be of the same length.")
 
-        return sum([x * y for x, y in zip(self.vector, other.vector)])
+        return np.dot(self.vector, other.vector)
 
     def __xor__(self, other: "Vector") -> float:
         """
@@ -136,14 +183,18 @@ class Vector:
         if len(self.vector) != len(other.vector):
             raise ValueError("Vectors must be of the same length.")
 
-        if (self.norm() * other.norm()) == 0:
+        norms = self.norm() * other.norm()
+        if norms == 0:
             raise ZeroDivisionError("None of the vectors must have a zero magnitude")
 
-        return acos((self * other) / (self.norm() * other.norm()))
+        # Rounding can push the cosine of (anti)parallel vectors slightly out of [-1, 1].
+        cosine = float(self * other) / norms
+        return acos(min(1.0, max(-1.0, cosine)))
 
     def norm(self) -> float:
         """
         Calculates and returns the norm (magnitude) of the vector. By default, this is the Euclidean norm (L2 norm).
+        The norm is computed once and cached until the vector is changed.
 
         Returns:
         -------
@@ -151,4 +202,22 @@ class Vector:
             The norm (magnitude) of the vector.
         """
 
-        return sqrt(self * self)
+        if self._norm is None:
+            self._norm = sqrt(np.dot(self.vector, self.vector))
+        return self._norm
+
+    def lazy(self) -> "Expression":
+        """
+        Starts a lazy expression with the vector as an operand. Operators on the result
+        build an expression tree, which is optimized and computed by evaluate().
+
+        Returns:
+        -------
+        Expression
+            A leaf of an expression referring to the vector without copying it.
+        """
+
+        # Imported here, since the expression module depends on this one.
+        from project.vector_matrix_operations.Expression import Leaf
+
+        return Leaf(self.vector)
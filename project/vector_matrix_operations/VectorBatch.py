@@ -0,0 +1,320 @@
+import numpy as np
+from typing import Iterable
+
+from project.vector_matrix_operations.Matrix import Matrix, matmul_arrays
+from project.vector_matrix_operations.Vector import Vector
+
+
+class VectorBatch:
+    """
+    A class to represent a stack of vectors of the same length and operate on all of them at once.
+
+    The vectors are the rows of an (n, d) array. Every operation is a single NumPy call over the
+    whole stack instead of a Python loop over Vector objects, and products of float vectors run
+    in BLAS. As in Vector, the array is read-only and the norms are cached.
+
+    Attributes:
+    ----------
+    vectors : np.ndarray
+        The read-only (n, d) array whose rows are the vectors.
+
+    Methods:
+    -------
+    __array__()
+        Allows the VectorBatch object to be treated as a NumPy array directly.
+
+    __getitem__(index: int) -> Vector
+        Returns the vector at the specified index.
+
+    __len__() -> int
+        Returns the number of vectors.
+
+    __mul__(other: "VectorBatch" | Vector) -> np.ndarray
+        Returns the rowwise dot products with another batch or with a single vector.
+
+    __xor__(other: "VectorBatch" | Vector) -> np.ndarray
+        Returns the rowwise angles (in radians) with another batch or with a single vector.
+
+    __rmatmul__(matrix: Matrix) -> "VectorBatch"
+        Returns the products of a matrix with every vector.
+
+    norms() -> np.ndarray
+        Returns the norms of all vectors.
+
+    pairwise_dot(other: "VectorBatch") -> np.ndarray
+        Returns the dot products of all pairs of vectors of two batches.
+
+    pairwise_angles(other: "VectorBatch") -> np.ndarray
+        Returns the angles between all pairs of vectors of two batches.
+    """
+
+    def __init__(self, object: Iterable[Iterable[float | int]], copy: bool = True):
+        """
+        Initializes the VectorBatch object with the given vectors.
+
+        Parameters:
+        ----------
+        object : Iterable[Iterable[float | int]]
+            A 2D iterable (list of lists, list of Vectors or array-like) with one vector per row.
+        copy : bool
+            Whether to copy an array passed as object. If False, the batch keeps a read-only
+            view of the array, which stays writeable for the caller. The array must not be
+            changed then, since the batch caches its norms.
+
+        Raises:
+        ------
+        ValueError
+            If the vectors do not form a 2D array.
+        """
+
+        self._set_vectors(np.array(object) if copy else np.asarray(object).view())
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        The read-only (n, d) array whose rows are the vectors.
+        """
+        return self._vectors
+
+    @vectors.setter
+    def vectors(self, array: np.ndarray) -> None:
+        """
+        Replaces the vectors and drops the cached norms.
+        The array is copied, so later changes of the argument do not affect the batch.
+        """
+        self._set_vectors(np.array(array))
+
+    def _set_vectors(self, array: np.ndarray) -> None:
+        """
+        Stores an array owned by the batch as the vectors and drops the cached norms.
+        """
+        if array.ndim != 2:
+            raise ValueError("Vectors must form a 2D array.")
+        array.flags.writeable = False
+        self._vectors = array
+        self._norms: np.ndarray | None = None
+
+    def __array__(self):
+        """
+        Allows the VectorBatch object to be treated as a NumPy array directly.
+
+        Returns:
+        -------
+        np.ndarray
+            The (n, d) array of the vectors.
+        """
+        return self.vectors
+
+    def __getitem__(self, index: int) -> Vector:
+        """
+        Returns the vector at the specified index.
+
+        Parameters:
+        ----------
+        index : int
+            The index of the vector to return.
+
+        Returns:
+        -------
+        Vector
+            A copy of the vector at the specified index.
+        """
+
+        return Vector(self.vectors[index])
+
+    def __len__(self) -> int:
+        """
+        Returns the number of vectors in the batch.
+
+        Returns:
+        -------
+        int
+            The number of vectors.
+        """
+
+        return len(self.vectors)
+
+    def _rows(self, other: "VectorBatch | Vector") -> np.ndarray:
+        """
+        Returns the array of other to be combined row by row with the vectors,
+        which is a single row for a Vector.
+
+        Raises:
+        ------
+        ValueError
+            If the shapes do not match.
+        """
+
+        array = np.asarray(other)
+        if array.shape[-1] != self.vectors.shape[1]:
+            raise ValueError("Vectors must be of the same length.")
+        if array.ndim == 2 and len(array) != len(self.vectors):
+            raise ValueError("Batches must have the same number of vectors.")
+        return array
+
+    def __mul__(self, other: "VectorBatch | Vector") -> np.ndarray:
+        """
+        Calculates the dot product of every vector with the vector at the same index in another
+        batch, or with a single vector.
+
+        Parameters:
+        ----------
+        other : VectorBatch or Vector
+            A batch of the same shape, or a vector of the same length.
+
+        Returns:
+        -------
+        np.ndarray
+            The n dot products.
+
+        Raises:
+        ------
+        ValueError
+            If the shapes do not match.
+        """
+
+        array = self._rows(other)
+        if array.ndim == 1:
+            return np.matmul(self.vectors, array)
+        return np.einsum("ij,ij->i", self.vectors, array)
+
+    def __xor__(self, other: "VectorBatch | Vector") -> np.ndarray:
+        """
+        Calculates the angle (in radians) between every vector and the vector at the same index
+        in another batch, or a single vector.
+
+        Parameters:
+        ----------
+        other : VectorBatch or Vector
+            A batch of the same shape, or a vector of the same length.
+
+        Returns:
+        -------
+        np.ndarray
+            The n angles.
+
+        Raises:
+        ------
+        ValueError
+            If the shapes do not match.
+
+        ZeroDivisionError
+            If one of the vectors has zero magnitude.
+        """
+
+        other_norms = other.norms() if isinstance(other, VectorBatch) else other.norm()
+        return _angles(self * other, self.norms() * other_norms)
+
+    def __rmatmul__(self, matrix: Matrix) -> "VectorBatch":
+        """
+        Multiplies a matrix with every vector of the batch by a single matrix product.
+
+        Parameters:
+        ----------
+        matrix : Matrix
+            A matrix of shape (m, d).
+
+        Returns:
+        -------
+        VectorBatch
+            The batch of the n products of length m.
+
+        Raises:
+        ------
+        ValueError
+            If the matrix shape is not compatible with the length of the vectors.
+        """
+
+        if not isinstance(matrix, Matrix):
+            return NotImplemented
+        if matrix.matrix.shape[1] != self.vectors.shape[1]:
+            raise ValueError("Matrix shapes are not compatible for multiplication")
+
+        # The rows of V @ M^T are the products M v for every row v of V.
+        return VectorBatch(matmul_arrays(self.vectors, matrix.matrix.T), copy=False)
+
+    def norms(self) -> np.ndarray:
+        """
+        Calculates the Euclidean norms of all vectors. They are computed once and cached until
+        the vectors are replaced.
+
+        Returns:
+        -------
+        np.ndarray
+            The read-only array of the n norms.
+        """
+
+        if self._norms is None:
+            norms = np.sqrt(np.einsum("ij,ij->i", self.vectors, self.vectors))
+            norms.flags.writeable = False
+            self._norms = norms
+        return self._norms
+
+    def pairwise_dot(self, other: "VectorBatch") -> np.ndarray:
+        """
+        Calculates the dot products of all pairs of a vector of this batch and a vector
+        of another batch by a single matrix product.
+
+        Parameters:
+        ----------
+        other : VectorBatch
+            A batch of m vectors of the same length.
+
+        Returns:
+        -------
+        np.ndarray
+            The (n, m) array of the dot products.
+
+        Raises:
+        ------
+        ValueError
+            If the vectors are not of the same length.
+        """
+
+        if other.vectors.shape[1] != self.vectors.shape[1]:
+            raise ValueError("Vectors must be of the same length.")
+        return matmul_arrays(self.vectors, other.vectors.T)
+
+    def pairwise_angles(self, other: "VectorBatch") -> np.ndarray:
+        """
+        Calculates the angles (in radians) between all pairs of a vector of this batch
+        and a vector of another batch.
+
+        Parameters:
+        ----------
+        other : VectorBatch
+            A batch of m vectors of the same length.
+
+        Returns:
+        -------
+        np.ndarray
+            The (n, m) array of the angles.
+
+        Raises:
+        ------
+        ValueError
+            If the vectors are not of the same length.
+
+        ZeroDivisionError
+            If one of the vectors has zero magnitude.
+        """
+
+        products = self.pairwise_dot(other)
+        return _angles(products, np.outer(self.norms(), other.norms()))
+
+
+def _angles(products: np.ndarray, norms: np.ndarray) -> np.ndarray:
+    """
+    Computes angles from dot products and products of norms.
+
+    Raises:
+    ------
+    ZeroDivisionError
+        If one of the vectors has zero magnitude.
+    """
+
+    if not np.all(norms):
+        raise ZeroDivisionError("None of the vectors must have a zero magnitude")
+
+    # Rounding can push the cosines of (anti)parallel vectors slightly out of [-1, 1].
+    return np.arccos(np.clip(products / norms, -1.0, 1.0))
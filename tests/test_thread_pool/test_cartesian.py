@@ -1,5 +1,21 @@
 import pytest
-from project.thread_pool.parallel_cartesian_sum import parallel_cartesian_sum
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from operator import add
+import project.thread_pool.parallel_cartesian_sum as parallel_cartesian_sum_module
+from project.thread_pool.parallel_cartesian_sum import (
+    _product_range,
+    cartesian_count_if,
+    cartesian_max,
+    cartesian_min,
+    cartesian_reduce,
+    cartesian_sum,
+    get_default_executor,
+    parallel_cartesian_sum,
+    set_default_workers,
+    warm_up,
+)
+from project.thread_pool.thread_pool import ThreadPool
 
 
 @pytest.mark.parametrize(
@@ -17,3 +33,84 @@ def test_parallel_cartesian_sum(expected_sum, list_of_sets):
 def test_assert_parallel_cartesian_sum(list_of_sets):
     with pytest.raises(ValueError):
         parallel_cartesian_sum(list_of_sets)
+
+
+@pytest.mark.parametrize(
+    "list_of_sets",
+    [[{22}, {11}], [{1, 2}, {3, 4}], [{-5, 0, 7}, {1}, {2, 3, 9, 10}], []],
+)
+def test_cartesian_sum_matches_enumeration(list_of_sets):
+    expected = sum(sum(combination) for combination in product(*list_of_sets))
+    assert cartesian_sum(list_of_sets) == expected
+    assert parallel_cartesian_sum(list_of_sets, reducer=sum) == expected
+
+
+def test_cartesian_sum_huge_product():
+    sets = [set(range(10)) for _ in range(9)]
+    assert parallel_cartesian_sum(sets) == 9 * 45 * 10**8
+
+
+def test_parallel_cartesian_sum_reducer():
+    assert parallel_cartesian_sum([{1, 2}, {3, 4}], reducer=max) == 3 + 4 + 3 + 4
+
+
+def is_even(combination):
+    return sum(combination) % 2 == 0
+
+
+@pytest.mark.parametrize("sizes", [[3], [2, 3], [3, 1, 4], [2, 2, 2, 2]])
+def test_product_range(sizes):
+    sets = [tuple(range(10 * i, 10 * i + size)) for i, size in enumerate(sizes)]
+    full = list(product(*sets))
+
+    for start in range(len(full) + 1):
+        for stop in range(start, len(full) + 1):
+            assert list(_product_range(sets, start, stop)) == full[start:stop]
+
+
+@pytest.mark.parametrize("chunks", [1, 3, 100])
+def test_cartesian_reduce_order(chunks):
+    sets = [(1, 2, 3), (4, 5), (6, 7, 8, 9)]
+    expected = "".join(repr(combination) for combination in product(*sets))
+
+    assert cartesian_reduce(sets, add, repr, chunks=chunks) == expected
+    with ThreadPool(2) as pool:
+        assert cartesian_reduce(sets, add, repr, chunks, pool) == expected
+    with ProcessPoolExecutor(2) as executor:
+        assert cartesian_reduce(sets, add, repr, chunks, executor) == expected
+
+
+def test_default_executor(monkeypatch):
+    monkeypatch.setattr(parallel_cartesian_sum_module, "SERIAL_THRESHOLD", 0)
+    set_default_workers(2)
+    warm_up()
+    executor = get_default_executor()
+
+    assert parallel_cartesian_sum([{1, 2}, {3, 4}], reducer=sum) == 20
+    assert get_default_executor() is executor
+
+    set_default_workers(None)
+    assert get_default_executor() is not executor
+
+
+def test_cartesian_reductions():
+    sets = [{1, 5, -3}, {2, 8}, {0, 4, 7}]
+    sums = [sum(combination) for combination in product(*sets)]
+
+    assert cartesian_max(sets) == max(sums)
+    assert cartesian_min(sets) == min(sums)
+    assert cartesian_max(sets, min) == max(map(min, product(*sets)))
+    assert cartesian_count_if(sets, is_even) == sum(s % 2 == 0 for s in sums)
+
+
+def test_cartesian_reductions_beyond_int64():
+    # Values outside int64 are reduced exactly by enumeration instead of NumPy.
+    assert cartesian_max([{2**70, 1}, {3}]) == 2**70 + 3
+    result = cartesian_reduce([{2**63, -1}, {3}], add)
+    assert isinstance(result, int) and result == 2**63 + 3 + 2
+    assert cartesian_min([[-(2**63)], [-5]]) == -(2**63) - 5
+
+
+def test_cartesian_reduce_empty_set():
+    with pytest.raises(ValueError):
+        cartesian_reduce([{1}, set()], add)
@@ -0,0 +1,59 @@
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from project.thread_pool.chunked_map import MAX_CHUNKSIZE, chunked_map, tune_chunksize
+from project.thread_pool.thread_pool import ThreadPool
+
+
+def square(x):
+    return x * x
+
+
+@pytest.mark.parametrize("chunksize", [None, 1, 7, 1000])
+def test_chunked_map_ordered(chunksize):
+    expected = [square(x) for x in range(100)]
+
+    with ThreadPool(3) as pool:
+        assert list(chunked_map(square, range(100), pool, chunksize)) == expected
+    with ProcessPoolExecutor(2) as executor:
+        assert list(chunked_map(square, range(100), executor, chunksize)) == expected
+
+
+def test_chunked_map_unordered():
+    with ThreadPool(3) as pool:
+        results = chunked_map(square, range(100), pool, chunksize=3, ordered=False)
+        assert sorted(results) == [square(x) for x in range(100)]
+
+
+def test_chunked_map_empty():
+    with ThreadPool(1) as pool:
+        assert list(chunked_map(square, [], pool)) == []
+        assert list(chunked_map(square, [], pool, chunksize=4)) == []
+
+
+def test_chunked_map_is_lazy():
+    consumed = count()
+
+    def items():
+        for x in range(10**6):
+            next(consumed)
+            yield x
+
+    with ThreadPool(2) as pool:
+        results = chunked_map(square, items(), pool, chunksize=10, prefetch=2)
+        assert [next(results) for _ in range(5)] == [0, 1, 4, 9, 16]
+
+    assert next(consumed) <= 31
+
+
+def test_chunked_map_exception():
+    with ThreadPool(2) as pool:
+        with pytest.raises(ZeroDivisionError):
+            list(chunked_map(lambda x: 1 / x, [3, 2, 1, 0], pool, chunksize=1))
+
+
+@pytest.mark.parametrize(
+    "cost, expected", [(0, MAX_CHUNKSIZE), (1.0, 1), (0.001, 20), (1e-9, MAX_CHUNKSIZE)]
+)
+def test_tune_chunksize(cost, expected):
+    assert tune_chunksize(cost, target=0.02) == expected
@@ -0,0 +1,107 @@
+import pytest
+import threading
+from queue import Full
+from project.thread_pool.metrics import Histogram, ThreadPoolMetrics
+from project.thread_pool.thread_pool import ThreadPool
+
+
+def failing_task():
+    raise ValueError("failure")
+
+
+def test_histogram():
+    histogram = Histogram()
+    for value in [0.000001, 0.00001, 0.0001, 0.001]:
+        histogram.record(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4
+    assert snapshot["max"] == 0.001
+    assert histogram.percentile(25) <= 0.000002
+    assert 0.0005 < histogram.percentile(100) <= 0.001
+
+
+def test_counters_and_histograms():
+    with ThreadPool(2, metrics=ThreadPoolMetrics()) as pool:
+        for _ in range(10):
+            pool.enqueue(lambda: None)
+
+    snapshot = pool.snapshot()
+    assert snapshot["submitted"] == 10
+    assert snapshot["started"] == 10
+    assert snapshot["completed"] == 10
+    assert snapshot["running"] == 0
+    assert snapshot["queue_depth"] == 0
+    assert snapshot["run_time"]["count"] == 10
+    assert snapshot["wait_time"]["count"] == 10
+    assert 0 <= snapshot["utilization"] <= 1
+
+
+def test_sampling():
+    with ThreadPool(1, metrics=ThreadPoolMetrics(sample_rate=0.25)) as pool:
+        for _ in range(20):
+            pool.enqueue(lambda: None)
+
+    snapshot = pool.snapshot()
+    assert snapshot["completed"] == 20
+    assert snapshot["run_time"]["count"] == 5
+
+
+def test_rejected_counter():
+    release = threading.Event()
+    metrics = ThreadPoolMetrics()
+    pool = ThreadPool(0, max_queue_size=1, overflow_policy="reject", metrics=metrics)
+
+    pool.enqueue(release.wait)
+    with pytest.raises(Full):
+        pool.enqueue(release.wait)
+
+    assert pool.snapshot()["rejected"] == 1
+    assert pool.snapshot()["queue_depth"] == 1
+    pool.dispose(cancel_pending=True)
+
+
+def test_hooks():
+    events = []
+    metrics = ThreadPoolMetrics(
+        on_task_start=lambda task: events.append(("start", task.args)),
+        on_task_finish=lambda task, run_time, error: events.append(
+            ("finish", task.args, run_time is not None, error)
+        ),
+    )
+
+    with ThreadPool(1, metrics=metrics) as pool:
+        pool.enqueue(print, end="")
+        pool.enqueue(max, 1, 2)
+
+    assert events == [
+        ("start", ()),
+        ("finish", (), True, None),
+        ("start", (1, 2)),
+        ("finish", (1, 2), True, None),
+    ]
+
+
+def test_failed_counter():
+    errors = []
+    metrics = ThreadPoolMetrics(
+        on_task_finish=lambda task, run_time, error: errors.append(error)
+    )
+    pool = ThreadPool(1, metrics=metrics)
+    pool.enqueue(failing_task)
+
+    pool.dispose()
+
+    assert pool.snapshot()["failed"] == 1
+    assert isinstance(errors[0], ValueError)
+
+
+def test_invalid_sample_rate():
+    with pytest.raises(ValueError):
+        ThreadPoolMetrics(sample_rate=0)
+
+
+def test_snapshot_without_metrics():
+    with ThreadPool(1) as pool:
+        with pytest.raises(RuntimeError):
+            pool.snapshot()
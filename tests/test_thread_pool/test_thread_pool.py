@@ -1,7 +1,12 @@
+import asyncio
 import pytest
+import sys
 import time
 import threading
-from queue import Queue
+import numpy as np
+from concurrent.futures import CancelledError
+from queue import Queue, Full
+from project.thread_pool.shared_memory import SharedArray
 from project.thread_pool.thread_pool import ThreadPool
 
 
@@ -10,6 +15,10 @@ def simple_task(results, task_num, delay=0.25):
     results.put(f"Task {task_num} completed")
 
 
+def double_in_place(shared):
+    shared.array *= 2
+
+
 def test_num_threads():
     num_threads = 4
     pool = ThreadPool(num_threads)
@@ -70,3 +79,300 @@ def test_enqueue_tasks():
         len(completed_tasks) == n
     ), f"Expected {n} tasks completed, got {len(completed_tasks)}"
     assert all(f"Task {i} completed" in completed_tasks for i in range(n))
+
+
+def test_enqueue_with_arguments():
+    pool = ThreadPool(2)
+    results = Queue()
+
+    for i in range(4):
+        pool.enqueue(simple_task, results, i, delay=0)
+
+    pool.dispose()
+
+    assert sorted(results.get() for _ in range(4)) == [
+        f"Task {i} completed" for i in range(4)
+    ]
+
+
+def test_bounded_queue_reject():
+    pool = ThreadPool(1, max_queue_size=1, overflow_policy="reject")
+    started = threading.Event()
+    release = threading.Event()
+
+    pool.enqueue(lambda: (started.set(), release.wait()))
+    started.wait()
+    pool.enqueue(lambda: None)
+
+    with pytest.raises(Full):
+        pool.enqueue(lambda: None)
+
+    release.set()
+    pool.dispose()
+
+
+def test_bounded_queue_timeout():
+    pool = ThreadPool(
+        1, max_queue_size=1, overflow_policy="timeout", enqueue_timeout=0.1
+    )
+    started = threading.Event()
+    release = threading.Event()
+
+    pool.enqueue(lambda: (started.set(), release.wait()))
+    started.wait()
+    pool.enqueue(lambda: None)
+
+    start_time = time.time()
+    with pytest.raises(Full):
+        pool.enqueue(lambda: None)
+    assert time.time() - start_time >= 0.1
+
+    release.set()
+    pool.dispose()
+
+
+def test_bounded_queue_block():
+    pool = ThreadPool(2, max_queue_size=1)
+    results = Queue()
+
+    for i in range(6):
+        pool.enqueue(simple_task, results, i, delay=0.01)
+        assert len(pool.tasks) <= 1
+
+    pool.dispose()
+    assert results.qsize() == 6
+
+
+def test_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        ThreadPool(1, overflow_policy="drop")
+
+
+def test_dispose_cancel_pending():
+    pool = ThreadPool(1)
+    results = Queue()
+    started = threading.Event()
+    release = threading.Event()
+
+    pool.enqueue(lambda: (started.set(), release.wait()))
+    started.wait()
+    pending = [pool.enqueue(simple_task, results, i, delay=0) for i in range(5)]
+
+    release.set()
+    assert pool.dispose(cancel_pending=True)
+    assert all(task.cancelled() for task in pending)
+    assert results.empty()
+
+
+def test_dispose_timeout():
+    pool = ThreadPool(1)
+    release = threading.Event()
+    pool.enqueue(release.wait)
+
+    start_time = time.time()
+    assert not pool.dispose(timeout=0.1)
+    assert time.time() - start_time < 0.5
+
+    release.set()
+    assert pool.dispose()
+
+
+def test_dispose_without_wait():
+    pool = ThreadPool(2)
+    release = threading.Event()
+    pool.enqueue(release.wait)
+
+    assert not pool.dispose(wait=False)
+    release.set()
+    assert pool.dispose()
+
+
+def test_cancel_task():
+    pool = ThreadPool(1)
+    results = Queue()
+    started = threading.Event()
+    release = threading.Event()
+
+    running = pool.enqueue(lambda: (started.set(), release.wait()))
+    started.wait()
+    task = pool.enqueue(simple_task, results, 0, delay=0)
+
+    assert task.cancel()
+    assert task.cancelled() and task.done()
+    assert not running.cancel()
+
+    release.set()
+    pool.dispose()
+    assert results.empty()
+    assert running.done() and not running.cancelled()
+
+
+def test_context_manager():
+    results = Queue()
+
+    with ThreadPool(2) as pool:
+        for i in range(4):
+            pool.enqueue(simple_task, results, i, delay=0.01)
+
+    assert not pool.is_active
+    assert all(not thread.is_alive() for thread in pool.threads)
+    assert results.qsize() == 4
+
+
+def test_task_result():
+    with ThreadPool(2) as pool:
+        task = pool.enqueue(pow, 2, 10)
+        failing = pool.enqueue(divmod, 1, 0)
+
+        assert task.result() == 1024
+        with pytest.raises(ZeroDivisionError):
+            failing.result()
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_task_base_exception(backend):
+    with ThreadPool(1, backend=backend) as pool:
+        exiting = pool.enqueue(sys.exit, 3)
+        with pytest.raises(SystemExit):
+            exiting.result(timeout=30)
+        # The worker survives the exception and runs the next task.
+        assert pool.enqueue(pow, 2, 10).result(timeout=30) == 1024
+
+
+def test_task_result_timeout():
+    release = threading.Event()
+
+    with ThreadPool(1) as pool:
+        task = pool.enqueue(release.wait)
+        with pytest.raises(TimeoutError):
+            task.result(timeout=0.05)
+        release.set()
+        assert task.result() is True
+
+
+def test_cancelled_task_result():
+    pool = ThreadPool(0)
+    task = pool.enqueue(pow, 2, 10)
+    pool.dispose(cancel_pending=True)
+
+    with pytest.raises(CancelledError):
+        task.result()
+
+
+def test_add_done_callback():
+    done = Queue()
+
+    with ThreadPool(1) as pool:
+        task = pool.enqueue(pow, 2, 3)
+        task.add_done_callback(lambda task: done.put(task.value))
+
+    task.add_done_callback(lambda task: done.put(-task.value))
+    assert [done.get(), done.get()] == [8, -8]
+
+
+@pytest.mark.parametrize("batch_size", [1, 16])
+def test_process_backend(batch_size):
+    with ThreadPool(2, backend="process", batch_size=batch_size) as pool:
+        tasks = [pool.enqueue(pow, i, 2) for i in range(50)]
+        failing = pool.enqueue(divmod, 1, 0)
+
+        assert [task.result() for task in tasks] == [i**2 for i in range(50)]
+        with pytest.raises(ZeroDivisionError):
+            failing.result()
+
+
+def test_process_backend_shared_array():
+    with SharedArray(np.arange(10)) as shared:
+        with ThreadPool(2, backend="process") as pool:
+            assert pool.enqueue(np.sum, shared).result() == 45
+            pool.enqueue(double_in_place, shared).result()
+
+        assert np.array_equal(shared.array, np.arange(10) * 2)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        ThreadPool(1, backend="fiber")
+
+
+def test_async_run():
+    async def main(pool):
+        return await pool.run(pow, 2, 10), await pool.run(
+            sorted, [3, 1, 2], reverse=True
+        )
+
+    with ThreadPool(2) as pool:
+        assert asyncio.run(main(pool)) == (1024, [3, 2, 1])
+
+
+def test_async_run_cancelled_while_enqueueing():
+    started = threading.Event()
+    release = threading.Event()
+    ran = []
+
+    async def main(pool):
+        blocked = asyncio.ensure_future(pool.run(ran.append, "cancelled-task-ran"))
+        await asyncio.sleep(0.05)
+        blocked.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await blocked
+        release.set()
+
+    with ThreadPool(1, max_queue_size=1) as pool:
+        pool.enqueue(lambda: (started.set(), release.wait()))
+        started.wait()
+        pool.enqueue(pow, 0, 0)
+        asyncio.run(main(pool))
+    assert ran == []
+
+
+def test_async_run_exception():
+    with ThreadPool(1) as pool:
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(pool.run(divmod, 1, 0))
+
+
+def test_async_run_full_queue():
+    started = threading.Event()
+    release = threading.Event()
+
+    async def main(pool):
+        blocked = asyncio.ensure_future(pool.run(pow, 2, 3))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+        release.set()
+        return await blocked
+
+    with ThreadPool(1, max_queue_size=1) as pool:
+        pool.enqueue(lambda: (started.set(), release.wait()))
+        started.wait()
+        pool.enqueue(pow, 0, 0)
+        assert asyncio.run(main(pool)) == 8
+
+
+def test_async_map():
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def square(x):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return x * x
+
+    with ThreadPool(4) as pool:
+        results = asyncio.run(pool.map_async(square, iter(range(20)), limit=2))
+
+    assert results == [x * x for x in range(20)]
+    assert max_in_flight <= 2
+
+
+def test_async_map_exception():
+    with ThreadPool(2) as pool:
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(pool.map_async(lambda x: 1 / x, [1, 2, 0, 3]))
@@ -0,0 +1,80 @@
+import pytest
+import numpy as np
+from functools import reduce
+from itertools import product
+from operator import add, mul
+from project.thread_pool.vectorized_cartesian import (
+    cartesian_blocks,
+    safe_dtype,
+    vectorized_cartesian_count_if,
+    vectorized_cartesian_reduce,
+)
+
+SETS = [[1, -2, 3], [4, 5], [-6, 7, 8, 9], [10]]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 5, 8, 24, 1000])
+def test_blocks_order(block_size):
+    arrays = [np.array(set) for set in SETS]
+    values = np.concatenate(
+        [block.copy() for block in cartesian_blocks(arrays, np.add, block_size)]
+    )
+    expected = [sum(combination) for combination in product(*SETS)]
+
+    assert values.tolist() == expected
+    assert all(
+        len(block) <= block_size
+        for block in cartesian_blocks(arrays, np.add, block_size)
+    )
+
+
+@pytest.mark.parametrize(
+    "reduction, combiner", [(np.add, add), (np.maximum, max), (np.minimum, min)]
+)
+@pytest.mark.parametrize("function, operation", [(np.add, add), (np.multiply, mul)])
+@pytest.mark.parametrize("block_size", [1, 7, 1 << 20])
+def test_reduce(reduction, combiner, function, operation, block_size):
+    expected = reduce(
+        combiner, (reduce(operation, combination) for combination in product(*SETS))
+    )
+    result = vectorized_cartesian_reduce(SETS, reduction, function, block_size)
+    assert result == expected
+
+
+def test_overflow_safety():
+    sets = [[2**62, 2**62 - 1], [2**62, 1]]
+    expected = sum(sum(combination) for combination in product(*sets))
+
+    assert safe_dtype([np.array(set) for set in sets], np.add, np.add, 4) == object
+    assert vectorized_cartesian_reduce(sets) == expected
+
+
+def test_sum_of_blocks_does_not_overflow():
+    sets = [[2**40] * 4, list(range(2**10))]
+    expected = sum(sum(combination) for combination in product(*sets))
+    assert vectorized_cartesian_reduce(sets, block_size=64) == expected
+
+
+def test_floats():
+    sets = [[0.5, 1.5], [0.25]]
+    assert vectorized_cartesian_reduce(sets, np.maximum) == 1.75
+
+
+def test_count_if():
+    expected = sum(sum(combination) % 2 == 0 for combination in product(*SETS))
+    assert (
+        vectorized_cartesian_count_if(
+            SETS, lambda values: values % 2 == 0, block_size=5
+        )
+        == expected
+    )
+
+
+def test_empty_set():
+    with pytest.raises(ValueError):
+        vectorized_cartesian_reduce([[1], []])
+
+
+def test_unknown_function_requires_dtype():
+    with pytest.raises(ValueError):
+        vectorized_cartesian_reduce(SETS, function=np.subtract)
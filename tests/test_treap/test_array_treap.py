@@ -0,0 +1,94 @@
+import itertools
+import random
+import sys
+import pytest
+from project.treap.array_treap import NIL, ArrayTreap
+
+
+@pytest.fixture
+def sample_treap():
+    treap = ArrayTreap()
+    for key, value in [(5, "a"), (3, "b"), (8, "c"), (1, "d"), (4, "e")]:
+        treap[key] = value
+    return treap
+
+
+def test_mapping_operations(sample_treap):
+    assert sample_treap[4] == "e"
+    assert 8 in sample_treap and 7 not in sample_treap
+    sample_treap[5] = "z"
+    assert sample_treap[5] == "z"
+    assert len(sample_treap) == 5
+    del sample_treap[3]
+    assert list(sample_treap) == [1, 4, 5, 8]
+    assert list(reversed(sample_treap)) == [8, 5, 4, 1]
+    assert len(sample_treap) == 4
+
+
+def test_missing_key(sample_treap):
+    with pytest.raises(KeyError):
+        sample_treap[10]
+    with pytest.raises(KeyError):
+        del sample_treap[10]
+
+
+def test_free_list_reuses_slots(sample_treap):
+    del sample_treap[3]
+    del sample_treap[8]
+    assert sample_treap.free != NIL
+    sample_treap[10] = "f"
+    sample_treap[11] = "g"
+    sample_treap[12] = "h"
+    assert sample_treap.free == NIL
+    assert len(sample_treap.node_keys) == 6
+    assert list(sample_treap) == [1, 4, 5, 10, 11, 12]
+
+
+def test_key_out_of_range_keeps_free_slot(sample_treap):
+    del sample_treap[3]
+    with pytest.raises(OverflowError):
+        sample_treap[2**64] = "x"
+    assert sample_treap.free != NIL and len(sample_treap) == 4
+    sample_treap[10] = "f"
+    assert len(sample_treap.node_keys) == 5
+    assert list(sample_treap) == [1, 4, 5, 8, 10]
+
+
+def test_random_operations_match_dict():
+    rng = random.Random(39)
+    treap = ArrayTreap()
+    expected = {}
+    for _ in range(3000):
+        key = rng.randrange(500)
+        if key in expected and rng.random() < 0.5:
+            del treap[key]
+            del expected[key]
+        else:
+            treap[key] = key * 2
+            expected[key] = key * 2
+    assert list(treap) == sorted(expected)
+    assert dict(treap.items()) == expected
+    assert len(treap) == len(expected)
+
+
+def test_degenerate_treap_without_recursion():
+    priorities = itertools.count()
+    size = sys.getrecursionlimit() * 2
+    treap = ArrayTreap()
+    treap._priority = lambda key: next(priorities)
+    for key in range(size):
+        treap[key] = key
+    assert list(treap) == list(range(size))
+    for key in range(0, size, 2):
+        del treap[key]
+    assert list(reversed(treap)) == list(range(size - 1, 0, -2))
+    assert treap.height() == size // 2
+
+
+@pytest.mark.parametrize("priorities", ["random", "hash"])
+def test_height(priorities):
+    treap = ArrayTreap(priorities, seed=2)
+    for key in range(10000):
+        treap[key] = key
+    assert 14 <= treap.height() < 60
+    assert ArrayTreap().height() == 0
@@ -0,0 +1,145 @@
+import operator
+import random
+from threading import Event, Thread
+import pytest
+from project.treap.persistent_treap import PersistentTreap
+from project.treap.treap import Treap
+
+
+def nodes(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is not None:
+            yield node
+            stack += [node.left, node.right]
+
+
+def fields(node):
+    return node.key, node.value, node.left, node.right, node.size
+
+
+def assert_valid(treap):
+    invariants = treap.check_invariants()
+    assert invariants["nodes"] == len(treap)
+    assert invariants["ordered"] and invariants["heap"]
+    assert invariants["subtree_sizes"] and invariants["aggregates"]
+
+
+def test_random_operations_match_dict():
+    rng = random.Random(41)
+    treap = PersistentTreap(operator.add, seed=41)
+    expected = {}
+    for _ in range(3000):
+        key = rng.randrange(500)
+        if key in expected and rng.random() < 0.5:
+            del treap[key]
+            del expected[key]
+        else:
+            treap[key] = key * 2
+            expected[key] = key * 2
+    assert_valid(treap)
+    assert dict(treap.items()) == expected
+    assert treap.range_aggregate() == sum(expected.values())
+    with pytest.raises(KeyError):
+        del treap[1000]
+
+
+def test_updates_do_not_modify_published_nodes():
+    treap = PersistentTreap.from_sorted((key, key) for key in range(200))
+    # The nodes are kept alive, so their ids are not reused.
+    before = {id(node): (node, fields(node)) for node in nodes(treap.root)}
+    treap[50] = "changed"
+    treap[1000] = 1000
+    del treap[10]
+    treap.update(Treap.from_sorted([(5, "x"), (500, "y")]))
+    treap.difference_update(Treap.from_sorted([(20, None)]))
+    treap.merge(PersistentTreap.from_sorted([(2000, 0)]))
+    treap.split(1500)
+    for node, published in before.values():
+        assert fields(node) == published
+    assert_valid(treap)
+
+
+def test_merging_into_a_plain_treap_keeps_snapshots():
+    treap = Treap.from_sorted((key, key) for key in range(5))
+    persistent = PersistentTreap.from_sorted((key, key) for key in range(10, 20))
+    snapshot = persistent.snapshot()
+    treap.merge(persistent)
+    assert len(persistent) == 0
+    assert list(treap) == [*range(5), *range(10, 20)]
+
+    treap[15] = "changed"
+    del treap[12]
+    treap[100] = 100
+    assert_valid(snapshot)
+    assert dict(snapshot.items()) == {key: key for key in range(10, 20)}
+
+
+def test_snapshot_isolation():
+    treap = PersistentTreap.from_sorted((key, key) for key in range(10))
+    snapshot = treap.snapshot()
+    iterator = iter(treap)
+    assert next(iterator) == 0
+
+    del treap[5]
+    treap[20] = 20
+    snapshot[30] = 30
+
+    assert list(iterator) == list(range(1, 10))
+    assert list(snapshot) == list(range(10)) + [30]
+    assert list(treap) == [0, 1, 2, 3, 4, 6, 7, 8, 9, 20]
+    assert len(snapshot) == 11 and len(treap) == 10
+
+
+def test_concurrent_readers_see_consistent_versions():
+    size = 100
+    treap = PersistentTreap.from_sorted((key, 10) for key in range(size))
+    stop = Event()
+    errors = []
+
+    def writer():
+        rng = random.Random(0)
+        while not stop.is_set():
+            source, target = sorted(rng.sample(range(size), 2))
+            # The lock makes the read-modify-write atomic among writers, and both
+            # changes are published at once, so readers never see a different total.
+            with treap.lock:
+                treap.update(
+                    Treap.from_sorted(
+                        [(source, treap[source] - 1), (target, treap[target] + 1)]
+                    )
+                )
+
+    def reader():
+        for _ in range(200):
+            snapshot = treap.snapshot()
+            keys = list(snapshot)
+            if keys != list(range(size)) or sum(snapshot.values()) != 10 * size:
+                errors.append(keys)
+
+    writers = [Thread(target=writer) for _ in range(2)]
+    readers = [Thread(target=reader) for _ in range(4)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    stop.set()
+    for thread in writers:
+        thread.join()
+
+    assert errors == []
+    assert sum(treap.values()) == 10 * size
+    assert_valid(treap)
+
+
+def test_key_function():
+    treap = PersistentTreap(key=str.lower)
+    treap["B"] = 1
+    treap["a"] = 2
+    snapshot = treap.snapshot()
+    treap["b"] = 3
+    del treap["A"]
+    assert list(treap.items()) == [("B", 3)]
+    assert list(snapshot.items()) == [("a", 2), ("B", 1)]
+    assert snapshot.key is str.lower
@@ -0,0 +1,113 @@
+import io
+import operator
+import pytest
+from project.treap.persistent_treap import PersistentTreap
+from project.treap.storage import MappedTreap, dump, load
+from project.treap.treap import Treap
+
+
+def shape(treap):
+    return [
+        (node.key, node.value, node.priority) for node in treap._nodes(treap.root)
+    ] + [treap.height()]
+
+
+@pytest.fixture
+def treap():
+    treap = Treap(seed=42)
+    for key in [5, -3, 8, 1, 2**62, 4]:
+        treap[key] = {"key": key, "tags": [str(key)]}
+    return treap
+
+
+@pytest.fixture
+def dump_path(tmp_path, treap):
+    path = tmp_path / "treap.bin"
+    with open(path, "wb") as file:
+        dump(treap, file)
+    return path
+
+
+def test_round_trip_keeps_shape(treap, dump_path):
+    with open(dump_path, "rb") as file:
+        loaded = load(file)
+    assert shape(loaded) == shape(treap)
+    assert loaded.check_invariants()["subtree_sizes"]
+    assert len(loaded) == 6
+
+
+def test_load_options(dump_path):
+    with open(dump_path, "rb") as file:
+        loaded = load(file, PersistentTreap, aggregate=lambda a, b: a)
+    assert isinstance(loaded, PersistentTreap)
+    assert loaded.range_aggregate() == {"key": -3, "tags": ["-3"]}
+
+
+def test_empty_round_trip():
+    buffer = io.BytesIO()
+    dump(Treap(), buffer)
+    buffer.seek(0)
+    assert len(load(buffer)) == 0
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"TRP", b"XXXX" + bytes(12), b"TRP\x00" + bytes([9, 0, 0, 0]) + bytes(8)],
+)
+def test_load_invalid(data):
+    with pytest.raises(ValueError):
+        load(io.BytesIO(data))
+
+
+@pytest.mark.parametrize("size", [-1, 40])
+def test_load_truncated(dump_path, size):
+    data = dump_path.read_bytes()
+    with pytest.raises(ValueError, match="truncated"):
+        load(io.BytesIO(data[:size]))
+    dump_path.write_bytes(data[:size])
+    with pytest.raises(ValueError, match="truncated"):
+        MappedTreap(str(dump_path))
+
+
+def test_dump_key_out_of_range():
+    treap = Treap()
+    treap[2**64] = None
+    with pytest.raises(OverflowError):
+        dump(treap, io.BytesIO())
+
+
+def test_dump_unsupported_keys():
+    treap = Treap()
+    treap["a"] = 1
+    buffer = io.BytesIO()
+    with pytest.raises(TypeError, match="integer keys"):
+        dump(treap, buffer)
+    assert buffer.getvalue() == b""
+    with pytest.raises(ValueError, match="key function"):
+        dump(Treap(key=abs), io.BytesIO())
+
+
+def test_mapped_treap(treap, dump_path):
+    with MappedTreap(str(dump_path)) as mapped:
+        assert len(mapped) == 6
+        assert list(mapped) == list(treap)
+        assert list(reversed(mapped)) == list(reversed(treap))
+        assert mapped[8] == {"key": 8, "tags": ["8"]}
+        assert 2**62 in mapped and 7 not in mapped
+        with pytest.raises(KeyError):
+            mapped[7]
+        assert dict(mapped.items()) == dict(treap.items())
+        assert mapped.rank(5) == treap.rank(5)
+        assert mapped.select(-1) == 2**62
+        assert list(mapped.range(0, 8)) == list(treap.range(0, 8))
+        assert shape(mapped.to_treap(aggregate=operator.or_)) == shape(treap)
+
+
+def test_mapped_treap_invalid(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        MappedTreap(str(path))
+    path.write_bytes(b"not a treap dump")
+    with pytest.raises(ValueError):
+        MappedTreap(str(path))
@@ -1,3 +1,8 @@
+import functools
+import itertools
+import operator
+import random
+import sys
 import pytest
 from project.treap.treap import Treap
 
@@ -114,3 +119,402 @@ def test_iteration(sample_treap):
 
 def test_reversed_iteration(sample_treap):
     assert list(reversed(sample_treap)) == [8, 5, 4, 3, 1]
+
+
+def test_random_operations_match_dict():
+    rng = random.Random(36)
+    treap = Treap()
+    expected = {}
+    for _ in range(3000):
+        key = rng.randrange(500)
+        if key in expected and rng.random() < 0.5:
+            del treap[key]
+            del expected[key]
+        else:
+            treap[key] = key * 2
+            expected[key] = key * 2
+    assert list(treap) == sorted(expected)
+    assert list(reversed(treap)) == sorted(expected, reverse=True)
+    assert all(treap[key] == value for key, value in expected.items())
+
+
+def test_degenerate_treap_without_recursion():
+    # Increasing priorities for increasing keys make every new node the root,
+    # so the treap is a path deeper than the recursion limit.
+    priorities = itertools.count()
+    size = sys.getrecursionlimit() * 2
+    treap = Treap()
+    treap._priority = lambda key: next(priorities)
+    for key in range(size):
+        treap[key] = key
+
+    assert list(treap) == list(range(size))
+    assert list(reversed(treap)) == list(range(size - 1, -1, -1))
+    for key in range(0, size, 2):
+        del treap[key]
+    assert list(treap) == list(range(1, size, 2))
+
+
+def subtree(node):
+    keys = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is not None:
+            keys.add(node.key)
+            stack += [node.left, node.right]
+    return keys
+
+
+def assert_valid(treap):
+    stack = [(treap.root, None, None)]
+    count = 0
+    while stack:
+        node, low, high = stack.pop()
+        if node is None:
+            continue
+        count += 1
+        assert node.size == 1 + sum(
+            child.size for child in (node.left, node.right) if child is not None
+        )
+        if treap.aggregate is not None:
+            values = [
+                treap[key] for key in treap.range(low, high) if key in subtree(node)
+            ]
+            assert node.aggregate == functools.reduce(treap.aggregate, values)
+        assert low is None or low < node.key
+        assert high is None or node.key < high
+        for child in (node.left, node.right):
+            assert child is None or child.priority <= node.priority
+        stack.append((node.left, low, node.key))
+        stack.append((node.right, node.key, high))
+    assert count == len(treap)
+
+
+def make_treap(keys, tag):
+    treap = Treap()
+    for key in keys:
+        treap[key] = (tag, key)
+    return treap
+
+
+def test_from_sorted():
+    treap = Treap.from_sorted((key, str(key)) for key in range(1000))
+    assert_valid(treap)
+    assert list(treap) == list(range(1000))
+    assert treap[500] == "500"
+    assert len(Treap.from_sorted([])) == 0
+
+
+def test_from_sorted_unsorted():
+    with pytest.raises(ValueError):
+        Treap.from_sorted([(1, "a"), (3, "b"), (3, "c")])
+
+
+@pytest.mark.parametrize("key", [0, 1, 5, 50, 99, 100, 200])
+def test_split(key):
+    treap = make_treap(range(100), "a")
+    greater = treap.split(key)
+    assert_valid(treap)
+    assert_valid(greater)
+    assert list(treap) == list(range(min(key, 100)))
+    assert list(greater) == list(range(min(key, 100), 100))
+
+
+def test_merge(sample_treap):
+    other = make_treap([10, 20, 30], "b")
+    sample_treap.merge(other)
+    assert_valid(sample_treap)
+    assert list(sample_treap) == [1, 3, 4, 5, 8, 10, 20, 30]
+    assert len(other) == 0 and other.root is None
+
+
+def test_merge_overlapping(sample_treap):
+    with pytest.raises(ValueError):
+        sample_treap.merge(make_treap([8, 20], "b"))
+    assert list(sample_treap) == [1, 3, 4, 5, 8]
+
+
+def test_copy(sample_treap):
+    copy = sample_treap.copy()
+    copy[100] = "z"
+    assert list(sample_treap) == [1, 3, 4, 5, 8]
+    assert list(copy) == [1, 3, 4, 5, 8, 100]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_set_operations(seed):
+    rng = random.Random(seed)
+    first = set(rng.sample(range(1000), rng.randrange(400)))
+    second = set(rng.sample(range(1000), rng.randrange(400)))
+    a, b = make_treap(first, "a"), make_treap(second, "b")
+
+    union = a.union(b)
+    intersection = a.intersection(b)
+    difference = a.difference(b)
+    for result in (union, intersection, difference):
+        assert_valid(result)
+    assert list(union) == sorted(first | second)
+    assert list(intersection) == sorted(first & second)
+    assert list(difference) == sorted(first - second)
+    assert all(union[key] == ("b", key) for key in second)
+    assert all(intersection[key] == ("a", key) for key in intersection)
+
+    assert list(a) == sorted(first) and list(b) == sorted(second)
+    assert_valid(a)
+    assert_valid(b)
+
+
+def test_update_from_treap(sample_treap):
+    sample_treap.update(make_treap([4, 9], "b"))
+    assert_valid(sample_treap)
+    assert list(sample_treap) == [1, 3, 4, 5, 8, 9]
+    assert sample_treap[4] == ("b", 4)
+
+
+def test_update_from_mapping(sample_treap):
+    sample_treap.update({2: "x"})
+    sample_treap.update([(6, "y")])
+    assert list(sample_treap) == [1, 2, 3, 4, 5, 6, 8]
+
+
+@pytest.fixture
+def ordered_treap():
+    rng = random.Random(38)
+    keys = rng.sample(range(0, 400, 2), 120)
+    treap = Treap(aggregate=operator.add)
+    for key in keys:
+        treap[key] = str(key) + ","
+    return treap, sorted(keys)
+
+
+def test_rank_and_select(ordered_treap):
+    treap, keys = ordered_treap
+    for index, key in enumerate(keys):
+        assert treap.rank(key) == index
+        assert treap.rank(key + 1) == index + 1
+        assert treap.select(index) == key
+    assert treap.select(-1) == keys[-1]
+    with pytest.raises(IndexError):
+        treap.select(len(keys))
+    with pytest.raises(IndexError):
+        Treap().select(0)
+
+
+@pytest.mark.parametrize("key", [-5, 0, 1, 101, 398, 1000])
+def test_floor_and_ceiling(ordered_treap, key):
+    treap, keys = ordered_treap
+    below = [k for k in keys if k <= key]
+    above = [k for k in keys if k >= key]
+    if below:
+        assert treap.floor(key) == below[-1]
+    else:
+        with pytest.raises(KeyError):
+            treap.floor(key)
+    if above:
+        assert treap.ceiling(key) == above[0]
+    else:
+        with pytest.raises(KeyError):
+            treap.ceiling(key)
+
+
+@pytest.mark.parametrize(
+    "low, high", [(None, None), (10, 100), (11, 11), (100, 10), (None, 51), (333, None)]
+)
+def test_range_queries(ordered_treap, low, high):
+    treap, keys = ordered_treap
+    expected = [
+        k for k in keys if (low is None or low <= k) and (high is None or k < high)
+    ]
+    assert list(treap.range(low, high)) == expected
+    assert treap.count(low, high) == len(expected)
+    assert treap.range_aggregate(low, high) == (
+        "".join(treap[k] for k in expected) or None
+    )
+
+
+def test_aggregates_after_updates(ordered_treap):
+    treap, keys = ordered_treap
+    for key in keys[::3]:
+        del treap[key]
+    assert_valid(treap)
+
+    greater = treap.split(200)
+    assert_valid(treap)
+    assert_valid(greater)
+    treap.merge(greater)
+    assert_valid(treap)
+
+    other = Treap.from_sorted(((k, "x") for k in range(0, 400, 3)), operator.add)
+    assert_valid(other)
+    treap.update(other)
+    assert_valid(treap)
+    treap.difference_update(Treap.from_sorted((k, 0) for k in range(0, 400, 5)))
+    assert_valid(treap)
+    assert treap.range_aggregate() == "".join(treap[k] for k in treap)
+
+    treap[keys[1]] = "changed,"
+    assert treap.range_aggregate() == "".join(treap[k] for k in treap)
+
+
+def test_range_aggregate_without_function(sample_treap):
+    with pytest.raises(ValueError):
+        sample_treap.range_aggregate(1, 5)
+
+
+def test_merge_different_aggregates(sample_treap):
+    with pytest.raises(ValueError):
+        sample_treap.merge(Treap.from_sorted([(100, 1)], operator.add))
+
+
+def test_node_has_no_dict(sample_treap):
+    assert not hasattr(sample_treap.root, "__dict__")
+
+
+def test_len_after_overwrite(sample_treap):
+    sample_treap[5] = "z"
+    sample_treap.update({1: "y", 2: "x"})
+    assert len(sample_treap) == 6
+    assert sample_treap.check_invariants()["subtree_sizes"]
+
+
+def shape(treap):
+    return [(node.key, node.priority) for node in preorder(treap.root)]
+
+
+def preorder(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is not None:
+            yield node
+            stack += [node.right, node.left]
+
+
+def test_seeded_priorities_are_reproducible():
+    keys = random.Random(40).sample(range(10**6), 500)
+    first, second = Treap(seed=7), Treap(seed=7)
+    for key in keys:
+        first[key] = second[key] = key
+    assert shape(first) == shape(second)
+    assert shape(first) != shape(Treap.from_sorted((k, k) for k in sorted(keys)))
+
+
+def test_hash_priorities_do_not_depend_on_order():
+    keys = list(range(500))
+    ascending = Treap(priorities="hash", seed=3)
+    descending = Treap(priorities="hash", seed=3)
+    for key in keys:
+        ascending[key] = key
+    for key in reversed(keys):
+        descending[key] = key
+    built = Treap.from_sorted(((k, k) for k in keys), priorities="hash", seed=3)
+    assert shape(ascending) == shape(descending) == shape(built)
+
+
+def test_unknown_priority_mode():
+    with pytest.raises(ValueError):
+        Treap(priorities="sequential")
+
+
+@pytest.mark.parametrize("priorities", ["random", "hash"])
+def test_height_is_logarithmic(priorities):
+    treap = Treap(priorities=priorities, seed=1)
+    for key in range(10000):
+        treap[key] = key
+    invariants = treap.check_invariants()
+    assert invariants == {
+        "size": 10000,
+        "nodes": 10000,
+        "height": treap.height(),
+        "ordered": True,
+        "heap": True,
+        "subtree_sizes": True,
+        "aggregates": True,
+    }
+    # The expected height of a random treap is about 3 log2(n), about 40 here.
+    assert invariants["height"] < 60
+
+
+def test_check_invariants_detects_corruption(sample_treap):
+    root = sample_treap.root
+    root.size += 1
+    root.sort_key, root.priority = (root.left or root.right).sort_key, -1
+    invariants = sample_treap.check_invariants()
+    assert not invariants["ordered"]
+    assert not invariants["heap"]
+    assert not invariants["subtree_sizes"]
+
+
+def test_string_and_tuple_keys():
+    words = Treap()
+    for word in ["pear", "apple", "fig", "banana"]:
+        words[word] = len(word)
+    assert list(words) == ["apple", "banana", "fig", "pear"]
+    assert words.floor("c") == "banana" and words.rank("fig") == 2
+
+    points = Treap.from_sorted(((x, y), x * y) for x in range(10) for y in range(10))
+    assert points[(3, 4)] == 12
+    assert list(points.range((2, 8), (3, 2))) == [(2, 8), (2, 9), (3, 0), (3, 1)]
+    assert_valid(points)
+
+
+def test_key_function():
+    treap = Treap(key=str.lower)
+    treap["Banana"] = 1
+    treap["apple"] = 2
+    treap["BANANA"] = 3
+    assert list(treap) == ["apple", "Banana"]
+    assert treap["banana"] == 3 and "APPLE" in treap
+    assert treap.split("b").key is str.lower
+    del treap["Apple"]
+    assert len(treap) == 0
+
+    negated = Treap.from_sorted(
+        ((key, key) for key in range(9, -1, -1)), key=operator.neg
+    )
+    assert list(negated) == list(range(9, -1, -1))
+    assert list(negated.range(7, 3)) == [7, 6, 5, 4]
+    invariants = negated.check_invariants()
+    assert invariants["ordered"] and invariants["size"] == 10
+
+
+def test_key_function_calls_are_cached():
+    calls = []
+
+    def key(item):
+        calls.append(item)
+        return item
+
+    treap = Treap(key=key)
+    for item in range(100):
+        treap[item] = item
+    # Every operation calls the key function once for its argument, not once per node.
+    assert len(calls) == 100
+    treap.copy()
+    assert len(calls) == 100
+
+
+def test_combine_with_different_key_functions(sample_treap):
+    other = Treap(key=operator.neg)
+    other[4] = "x"
+    other[9] = "y"
+    with pytest.raises(ValueError):
+        sample_treap.merge(other)
+    with pytest.raises(ValueError):
+        sample_treap.intersection_update(other)
+    sample_treap.update(other)
+    assert list(sample_treap) == [1, 3, 4, 5, 8, 9]
+    assert sample_treap[4] == "x"
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_get_many(seed):
+    rng = random.Random(seed)
+    expected = {key: str(key) for key in rng.sample(range(2000), 700)}
+    treap = make_treap([], "a")
+    treap.update(expected)
+    queries = [rng.randrange(2100) for _ in range(500)]
+    assert treap.get_many(queries, "-") == [expected.get(key, "-") for key in queries]
+    assert treap.get_many([]) == []
+    assert Treap().get_many([1, 2]) == [None, None]
@@ -0,0 +1,107 @@
+import pytest
+import numpy as np
+
+from project.vector_matrix_operations.Expression import (
+    Leaf,
+    Product,
+    Sum,
+    chain_order,
+)
+from project.vector_matrix_operations.Matrix import Matrix
+from project.vector_matrix_operations.Vector import Vector
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(49)
+
+
+def test_chain_order():
+    # The textbook example from Cormen et al., whose best order is ((A1(A2A3))((A4A5)A6)).
+    cost, split = chain_order([30, 35, 15, 5, 10, 20, 25])
+    assert cost == 15125
+    assert split[0][5] == 2 and split[0][2] == 0 and split[3][5] == 4
+    assert chain_order([4, 5])[0] == 0
+
+
+def test_evaluate_matches_eager(rng):
+    a, b, c = (Matrix(rng.random((6, 6))) for _ in range(3))
+    v = Vector(rng.random(6))
+    expression = (a.lazy() @ b + c).T() @ v
+    result = expression.evaluate()
+    assert isinstance(result, Vector)
+    assert np.allclose(result, (np.asarray(a) @ b.matrix + c.matrix).T @ v.vector)
+
+
+def test_operators_build_a_tree(rng):
+    a, b, c = (Matrix(rng.random((3, 3))) for _ in range(3))
+    expression = a.lazy() @ b @ c + a + b
+    assert isinstance(expression, Sum)
+    assert len(expression.terms) == 3
+    product = expression.terms[0]
+    assert isinstance(product, Product) and len(product.factors) == 3
+    # Matrices on the left of an expression use its reflected operators.
+    assert isinstance(a @ expression, Product)
+    assert isinstance(a + expression, Sum)
+
+
+def test_transposes_are_pushed_to_views(rng):
+    a, b, c = (Matrix(rng.random((4, 5))) for _ in range(3))
+    expression = (a.lazy() @ b.T() + c.lazy() @ c.T()).T()
+    assert all(isinstance(leaf, Leaf) for leaf in expression._leaves())
+    assert all(
+        np.shares_memory(leaf.array, m)
+        for leaf, m in zip(expression._leaves(), [b, a, c, c])
+    )
+    expected = (a.matrix @ b.matrix.T + c.matrix @ c.matrix.T).T
+    assert np.allclose(expression.evaluate(), expected)
+
+
+def test_chain_is_reordered(rng):
+    a = Matrix(rng.random((500, 2)))
+    b = Matrix(rng.random((2, 500)))
+    v = Vector(rng.random(500))
+    expression = a.lazy() @ b @ v
+    # a @ (b @ v) needs 2 * 500 + 500 * 2 multiplications instead of 500 * 2 * 500 + 500 * 500.
+    assert expression.cost() == 2000
+    assert np.allclose(expression.evaluate(), a.matrix @ b.matrix @ v.vector)
+
+
+def test_vector_at_the_start(rng):
+    a = Matrix(rng.random((4, 3)))
+    v = Vector(rng.random(4))
+    result = (v.lazy() @ a).evaluate()
+    assert isinstance(result, Vector) and len(result) == 3
+    assert np.allclose(result, v.vector @ a.matrix)
+
+
+def test_sums_accumulate_in_place(rng):
+    a, b = Matrix(rng.integers(0, 9, (5, 5))), Matrix(rng.random((5, 5)))
+    expression = a.lazy() + b + a.lazy() @ b + b.lazy() @ a + a.T()
+    expected = (
+        a.matrix + b.matrix + a.matrix @ b.matrix + b.matrix @ a.matrix + a.matrix.T
+    )
+    result = expression.evaluate()
+    assert result.matrix.dtype == np.float64
+    assert np.allclose(result, expected)
+
+    # The integer product is converted once to the float type of the sum.
+    mixed = (a.lazy() @ a + b).evaluate()
+    assert np.allclose(mixed, a.matrix @ a.matrix + b.matrix)
+
+    leaves = (a.lazy() + a).evaluate()
+    assert np.array_equal(leaves, 2 * a.matrix)
+    assert not np.shares_memory(a.lazy().evaluate(), a)
+
+
+def test_invalid_shapes(rng):
+    a, b = Matrix(rng.random((2, 3))), Matrix(rng.random((3, 2)))
+    v = Vector([1, 2, 3])
+    with pytest.raises(ValueError, match="same shape"):
+        a.lazy() + b
+    with pytest.raises(ValueError, match="not compatible"):
+        a.lazy() @ a
+    with pytest.raises(ValueError, match="Vectors"):
+        v.lazy() @ v
+    with pytest.raises(TypeError):
+        a.lazy() + 1
@@ -1,8 +1,14 @@
 import pytest
 import numpy as np
+from fractions import Fraction
 from math import isclose
 
-from project.vector_matrix_operations.Matrix import Matrix
+from project.thread_pool.thread_pool import ThreadPool
+from project.vector_matrix_operations.Matrix import (
+    Matrix,
+    blocked_matmul,
+    parallel_matmul,
+)
 
 
 def test_matrix_getitem():
@@ -92,3 +98,139 @@ def test_matrix_transpose():
     result = matrix1.T()
     expected = Matrix([[1, 3], [2, 4]])
     assert np.array_equal(result, expected), "Matrix transposition is incorrect"
+
+
+@pytest.mark.parametrize("shape", [(1, 1, 1), (5, 7, 3), (16, 16, 16), (17, 9, 33)])
+def test_blocked_matmul(shape):
+    rows, inner, columns = shape
+    rng = np.random.default_rng(rows)
+    a = rng.integers(-50, 50, (rows, inner))
+    b = rng.integers(-50, 50, (inner, columns))
+    result = blocked_matmul(a, b, block_size=4)
+    assert result.dtype == np.int64
+    assert np.array_equal(result, a @ b)
+
+
+def test_integer_multiplication_is_exact():
+    big = 2**30
+    result = Matrix([[big, 1]]) @ Matrix([[big], [1]])
+    assert result[0, 0] == big * big + 1
+
+
+def test_object_matrix_multiplication():
+    mat1 = Matrix([[Fraction(1, 2), Fraction(1, 3)], [1, 2]])
+    mat2 = Matrix([[Fraction(2, 3)], [Fraction(3, 4)]])
+    result = mat1 @ mat2
+    assert result.matrix.tolist() == [[Fraction(7, 12)], [Fraction(13, 6)]]
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_parallel_matmul(backend):
+    rng = np.random.default_rng(50)
+    a = rng.integers(-50, 50, (10, 9))
+    b = rng.integers(-50, 50, (9, 7))
+    fractions = np.array([[Fraction(x, 3) for x in row] for row in a], dtype=object)
+    with ThreadPool(2, backend=backend) as pool:
+        assert np.array_equal(parallel_matmul(a, b, pool, block_size=4), a @ b)
+        result = parallel_matmul(fractions, b, pool, block_size=4)
+        assert result.dtype == object
+        assert np.array_equal(result, fractions @ b)
+
+        out = np.full((10, 7), 99)
+        assert parallel_matmul(a, b, pool, block_size=4, out=out) is out
+        assert np.array_equal(out, a @ b)
+        square = a[:9]
+        out = square.copy()
+        assert parallel_matmul(out, square, pool, block_size=4, out=out) is out
+        assert np.array_equal(out, square @ square)
+
+        product = Matrix(a).matmul(Matrix(b), pool=pool)
+        assert np.array_equal(product, a @ b)
+
+
+def test_float_matrix_multiplication():
+    rng = np.random.default_rng(45)
+    a, b = rng.random((20, 30)), rng.random((30, 10))
+    result = Matrix(a) @ Matrix(b)
+    assert np.allclose(result, a @ b)
+
+
+def test_transpose_is_a_view():
+    matrix = Matrix([[1, 2, 3], [4, 5, 6]])
+    transposed = matrix.T()
+    assert transposed.matrix.shape == (3, 2)
+    assert np.shares_memory(transposed, matrix)
+    matrix.matrix[0, 2] = 10
+    assert transposed[2, 0] == 10
+    assert np.array_equal(transposed.T(), matrix)
+
+
+def test_addition_keeps_integer_dtype():
+    result = Matrix([[1, 2]]) + Matrix([[3, 4]])
+    assert result.matrix.dtype == np.int64
+
+
+def test_inplace_addition():
+    matrix = Matrix([[1, 2], [3, 4]])
+    buffer = matrix.matrix
+    alias = matrix
+    matrix += Matrix([[10, 20], [30, 40]])
+    assert matrix is alias and matrix.matrix is buffer
+    assert np.array_equal(matrix, [[11, 22], [33, 44]])
+
+    # The operands overlap the output.
+    matrix += matrix.T()
+    assert np.array_equal(matrix, [[22, 55], [55, 88]])
+
+
+@pytest.mark.parametrize("dtype", [np.int64, np.float64, object])
+def test_inplace_multiplication(dtype):
+    rng = np.random.default_rng(46)
+    a = rng.integers(-9, 9, (200, 150)).astype(dtype)
+    b = rng.integers(-9, 9, (150, 150)).astype(dtype)
+    matrix = Matrix(a)
+    buffer = matrix.matrix
+    matrix @= Matrix(b)
+    assert matrix.matrix is buffer
+    assert np.array_equal(matrix, a @ b)
+
+    square = Matrix(b)
+    square @= square.T()
+    assert np.array_equal(square, b @ b.T)
+
+
+def test_inplace_multiplication_changing_shape():
+    matrix = Matrix([[1, 2], [3, 4]])
+    original = matrix
+    matrix @= Matrix([[1], [1]])
+    assert matrix is not original
+    assert np.array_equal(matrix, [[3], [7]])
+
+
+def test_inplace_operations_with_wider_dtype():
+    matrix = Matrix([[1, 2], [3, 4]])
+    original = matrix
+    matrix += Matrix([[0.5, 0.5], [0.5, 0.5]])
+    assert matrix is not original
+    assert np.array_equal(matrix, [[1.5, 2.5], [3.5, 4.5]])
+    assert np.array_equal(original, [[1, 2], [3, 4]])
+
+    original @= Matrix([[0.5, 0], [0, 0.5]])
+    assert np.array_equal(original, [[0.5, 1], [1.5, 2]])
+
+    # A float matrix holds integer results in place.
+    alias = matrix
+    matrix += Matrix([[1, 1], [1, 1]])
+    assert matrix is alias
+    assert np.array_equal(matrix, [[2.5, 3.5], [4.5, 5.5]])
+
+
+def test_operations_with_out():
+    a, b = Matrix([[1, 2], [3, 4]]), Matrix([[5, 6], [7, 8]])
+    out = Matrix(np.empty((2, 2), dtype=np.int64))
+    assert a.matmul(b, out=out) is out
+    assert np.array_equal(out, [[19, 22], [43, 50]])
+    assert a.add(b, out=out) is out
+    assert np.array_equal(out, [[6, 8], [10, 12]])
+    with pytest.raises(ValueError, match="shape of the product"):
+        a.matmul(b, out=Matrix([[0, 0, 0]]))
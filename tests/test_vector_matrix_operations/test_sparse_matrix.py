@@ -0,0 +1,131 @@
+import pytest
+import numpy as np
+
+import project.vector_matrix_operations.SparseMatrix as sparse_module
+from project.vector_matrix_operations.Matrix import Matrix
+from project.vector_matrix_operations.SparseMatrix import SparseMatrix, make_matrix
+
+
+def random_sparse(rng, shape, density=0.05):
+    array = rng.integers(-9, 10, shape)
+    array[rng.random(shape) >= density] = 0
+    return array
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(48)
+
+
+@pytest.fixture
+def keep_sparse(monkeypatch):
+    # Small random matrices are too dense to keep sparse results at the default threshold.
+    monkeypatch.setattr(sparse_module, "DENSITY_THRESHOLD", 0.5)
+
+
+def test_from_dense_round_trip(rng):
+    array = random_sparse(rng, (30, 40))
+    matrix = SparseMatrix.from_dense(array)
+    assert matrix.shape == (30, 40)
+    assert matrix.nnz == np.count_nonzero(array)
+    assert np.array_equal(matrix, array)
+    assert np.array_equal(SparseMatrix.from_dense(np.zeros((3, 2))), np.zeros((3, 2)))
+
+
+def test_element_access():
+    matrix = SparseMatrix([5, 7, 1], [1, 3, 0], [0, 2, 2, 3], (3, 4))
+    assert matrix[0, 1] == 5 and matrix[0, 3] == 7 and matrix[2, 0] == 1
+    assert matrix[0, 0] == 0 and matrix[1, 2] == 0
+    assert matrix[-1, -4] == 1
+    with pytest.raises(IndexError):
+        matrix[3, 0]
+
+
+def test_stored_zeros_are_dropped():
+    matrix = SparseMatrix([5, 0, 7, 0], [1, 2, 3, 0], [0, 3, 3, 4], (3, 4))
+    assert matrix.nnz == 2
+    assert matrix.indptr.tolist() == [0, 2, 2, 2]
+    assert matrix.indices.tolist() == [1, 3]
+    assert np.array_equal(matrix, SparseMatrix.from_dense(matrix.to_dense()))
+    assert np.array_equal(matrix.T().T(), matrix)
+
+
+@pytest.mark.parametrize(
+    "data, indices, indptr",
+    [
+        ([1, 2], [0, 1], [0, 1]),
+        ([1, 2], [0, 4], [0, 1, 2]),
+        ([1, 2], [1, 0], [0, 2, 2]),
+        ([1, 2], [1, 1], [0, 2, 2]),
+    ],
+)
+def test_invalid_arrays(data, indices, indptr):
+    with pytest.raises(ValueError):
+        SparseMatrix(data, indices, indptr, (2, 3))
+
+
+def test_transpose(rng):
+    array = random_sparse(rng, (25, 35))
+    transposed = SparseMatrix.from_dense(array).T()
+    assert transposed.shape == (35, 25)
+    assert np.array_equal(transposed, array.T)
+    # The transpose is canonical: rebuilding it from its arrays passes validation.
+    SparseMatrix(transposed.data, transposed.indices, transposed.indptr, (35, 25))
+
+
+def test_addition(rng, keep_sparse):
+    a, b = random_sparse(rng, (40, 30)), random_sparse(rng, (40, 30))
+    result = SparseMatrix.from_dense(a) + SparseMatrix.from_dense(b)
+    assert isinstance(result, SparseMatrix)
+    assert np.array_equal(result, a + b)
+
+    cancelled = SparseMatrix.from_dense(a) + SparseMatrix.from_dense(-a)
+    assert cancelled.nnz == 0
+
+    dense = rng.integers(0, 5, (40, 30))
+    for result in (
+        SparseMatrix.from_dense(a) + Matrix(dense),
+        Matrix(dense) + SparseMatrix.from_dense(a),
+    ):
+        assert isinstance(result, Matrix)
+        assert np.array_equal(result, a + dense)
+
+    with pytest.raises(ValueError, match="same shape"):
+        SparseMatrix.from_dense(a) + SparseMatrix.from_dense(b.T)
+
+
+@pytest.mark.parametrize("chunk", [1 << 22, 7])
+def test_multiplication(rng, monkeypatch, keep_sparse, chunk):
+    monkeypatch.setattr(sparse_module, "CHUNK_ELEMENTS", chunk)
+    a, b = random_sparse(rng, (50, 40)), random_sparse(rng, (40, 60))
+    result = SparseMatrix.from_dense(a) @ SparseMatrix.from_dense(b)
+    assert isinstance(result, SparseMatrix)
+    assert np.array_equal(result, a @ b)
+
+    dense = rng.random((40, 7))
+    result = SparseMatrix.from_dense(a) @ Matrix(dense)
+    assert isinstance(result, Matrix)
+    assert np.allclose(result, a @ dense)
+
+    dense = rng.random((9, 50))
+    result = Matrix(dense) @ SparseMatrix.from_dense(a)
+    assert isinstance(result, Matrix)
+    assert np.allclose(result, dense @ a)
+
+    with pytest.raises(ValueError, match="not compatible"):
+        SparseMatrix.from_dense(a) @ SparseMatrix.from_dense(a)
+
+
+def test_dense_results_are_converted():
+    ones = SparseMatrix.from_dense(np.eye(4))
+    column = SparseMatrix.from_dense([[1], [1], [1], [1]])
+    row = SparseMatrix.from_dense([[1, 1, 1, 1]])
+    assert isinstance(column @ row, Matrix)
+    assert np.array_equal(column @ row, np.ones((4, 4)))
+    assert isinstance(ones + ones, Matrix)
+
+
+def test_make_matrix(rng):
+    assert isinstance(make_matrix(random_sparse(rng, (100, 100), 0.005)), SparseMatrix)
+    assert isinstance(make_matrix(rng.random((10, 10))), Matrix)
+    assert isinstance(make_matrix(np.eye(10), density_threshold=0.05), Matrix)
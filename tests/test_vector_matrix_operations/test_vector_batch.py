@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+
+from project.vector_matrix_operations.Matrix import Matrix
+from project.vector_matrix_operations.Vector import Vector
+from project.vector_matrix_operations.VectorBatch import VectorBatch
+
+
+@pytest.fixture
+def batches():
+    rng = np.random.default_rng(47)
+    return VectorBatch(rng.normal(size=(50, 4))), VectorBatch(rng.normal(size=(50, 4)))
+
+
+def test_batch_initialization():
+    batch = VectorBatch([Vector([1, 2]), Vector([3, 4]), [5, 6]])
+    assert len(batch) == 3
+    assert np.array_equal(batch, [[1, 2], [3, 4], [5, 6]])
+    assert np.array_equal(batch[1], [3, 4])
+    with pytest.raises(ValueError):
+        VectorBatch([1, 2, 3])
+
+
+def test_batch_without_copy_keeps_the_array_writeable():
+    array = np.ones((3, 2))
+    batch = VectorBatch(array, copy=False)
+    assert np.shares_memory(batch.vectors, array)
+    assert array.flags.writeable and not batch.vectors.flags.writeable
+
+
+def test_rowwise_operations_match_vectors(batches):
+    a, b = batches
+    products, angles = a * b, a ^ b
+    for i in range(len(a)):
+        assert products[i] == pytest.approx(a[i] * b[i])
+        assert angles[i] == pytest.approx(a[i] ^ b[i])
+        assert a.norms()[i] == pytest.approx(a[i].norm())
+
+
+def test_operations_with_a_single_vector(batches):
+    a, _ = batches
+    vector = Vector([1.0, -2.0, 0.5, 3.0])
+    products, angles = a * vector, a ^ vector
+    for i in range(len(a)):
+        assert products[i] == pytest.approx(a[i] * vector)
+        assert angles[i] == pytest.approx(a[i] ^ vector)
+
+
+def test_pairwise_operations(batches):
+    a, b = batches
+    products = a.pairwise_dot(b)
+    angles = a.pairwise_angles(b)
+    assert products.shape == angles.shape == (50, 50)
+    assert products[3, 7] == pytest.approx(a[3] * b[7])
+    assert angles[7, 3] == pytest.approx(a[7] ^ b[3])
+    assert np.allclose(np.diag(a.pairwise_angles(a)), 0, atol=1e-7)
+
+
+def test_matrix_batch_product(batches):
+    a, _ = batches
+    matrix = Matrix(np.arange(12).reshape(3, 4))
+    result = matrix @ a
+    assert isinstance(result, VectorBatch)
+    assert np.allclose(result, (np.asarray(matrix) @ np.asarray(a).T).T)
+    with pytest.raises(ValueError):
+        Matrix([[1, 2]]) @ a
+
+
+def test_shape_mismatch(batches):
+    a, _ = batches
+    with pytest.raises(ValueError):
+        a * VectorBatch(np.ones((50, 3)))
+    with pytest.raises(ValueError):
+        a * VectorBatch(np.ones((49, 4)))
+    with pytest.raises(ValueError):
+        a.pairwise_dot(VectorBatch(np.ones((5, 3))))
+
+
+def test_zero_vector_angle():
+    batch = VectorBatch([[1, 0], [0, 0]])
+    with pytest.raises(ZeroDivisionError):
+        batch ^ Vector([1, 1])
+
+
+def test_norms_are_cached_and_invalidated():
+    batch = VectorBatch([[3, 4], [6, 8]])
+    norms = batch.norms()
+    assert norms is batch.norms()
+    assert np.array_equal(norms, [5, 10])
+    with pytest.raises(ValueError):
+        batch.vectors[0, 0] = 1
+    batch.vectors = [[0, 1]]
+    assert np.array_equal(batch.norms(), [1])
@@ -54,3 +54,29 @@ def test_zero_vector_angle():
     vec2 = Vector([1, 0, 0])
     with pytest.raises(ZeroDivisionError):
         vec1 ^ vec2
+
+
+def test_vector_norm_is_invalidated_on_mutation():
+    vec = Vector([3.0, 4.0])
+    assert vec.norm() == 5.0
+    vec[1] = 0.0
+    assert vec.norm() == 3.0
+    vec.vector = np.array([0.0, 2.0])
+    assert vec.norm() == 2.0
+
+
+def test_vector_array_is_read_only():
+    vec = Vector([1, 2, 3])
+    with pytest.raises(ValueError):
+        vec.vector[0] = 5
+    with pytest.raises(ValueError):
+        np.asarray(vec)[0] = 5
+    assert vec.norm() == pytest.approx(14**0.5)
+
+
+def test_parallel_vectors_angle():
+    # The computed cosine of these vectors rounds to slightly more than 1.
+    vec = Vector([0.7214844075832684, 0.7111917696952796, 0.9364405867994596])
+    scaled = Vector(np.asarray(vec) * 4.221069999614152)
+    assert vec ^ scaled == 0.0
+    assert isclose(vec ^ Vector(-np.asarray(vec)), np.pi, abs_tol=1e-7)